@@ -1,12 +1,16 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse, PlainTextResponse, HTMLResponse, FileResponse
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, HTMLResponse, FileResponse, Response, StreamingResponse
 from pydantic import BaseModel
+from typing import Literal
+import json
 import logging
 import os
 
 from service.curriculumService import CurriculumService
 from util.dbClient import DbClient
 from util.utils import format_curriculum_response
+from service.artifact_store import artifact_store
+from service.graph_renderer import MEDIA_TYPES
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -15,11 +19,25 @@ router = APIRouter()
 db_client = DbClient()
 db_client.connect()
 curriculum_service = CurriculumService(db_client)
+artifact_store.start_sweeper()
+
+# 내용 해시 ID 라 바뀌지 않으므로 브라우저/리버스 프록시가 오래 캐시해도 됨
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
 
 
 class QueryRequest(BaseModel):
     query: str
     required_dept_count: int = 30
+    graph_format: Literal["png", "svg", "json"] = "png"  # json: 클라이언트에서 그릴 노드/엣지 레이아웃
+    stream: bool = False  # True: NDJSON 으로 과목 목록을 먼저, 그래프 URL 은 렌더링 후 전송
+    include_graph_base64: bool = False  # True: 비스트림 응답에 그래프 data URI 도 포함 (기본은 graph_image_url 만)
+
+
+def _graph_image_url(artifact_id):
+    # 브라우저에서 접근 가능한 절대 URL 필요 (환경변수 또는 서버 IP, 임베디드 모드는 llm_agent 주소)
+    server_host = os.getenv("SERVER_HOST", "210.117.181.110")
+    base_url = os.getenv("GRAPH_IMAGE_BASE_URL", f"http://{server_host}:7996")
+    return f"{base_url}/graph-image/{artifact_id}" if artifact_id else None
 
 
 @router.get("/")
@@ -35,30 +53,19 @@ def chat_get():
 @router.post("/chat")
 async def process_query_endpoint(request: QueryRequest):
     """커리큘럼 추천 쿼리 처리 API - 텍스트 + 그래프 반환"""
+    if request.stream:
+        return StreamingResponse(
+            _stream_query(request),
+            media_type="application/x-ndjson",
+            headers={"Cache-Control": "no-cache"}
+        )
+
     try:
         # 서비스 호출
-        result = curriculum_service.process_query(request.query, request.required_dept_count)
-
-        # 응답 포맷팅
-        message_text = format_curriculum_response(result)
-
-        logger.info(f"✅ API 응답 완료: {len(message_text)}자")
-
-        # 텍스트 + 그래프 이미지 URL JSON 응답
-        # 브라우저에서 접근 가능한 절대 URL 필요 (환경변수 또는 서버 IP)
-        server_host = os.getenv("SERVER_HOST", "210.117.181.110")
-        graph_image_url = f"http://{server_host}:7996/graph-image"
-        graph_base64 = result.get("graph", "")  # "data:image/png;base64,..." 형식
-
-        # 메시지는 텍스트만 (이미지는 별도로 처리)
-        return JSONResponse(
-            status_code=200,
-            content={
-                "message": message_text,  # 텍스트만 반환
-                "graph_base64": graph_base64,  # PNG base64 이미지
-                "graph_image_url": graph_image_url  # PNG 이미지 URL
-            }
-        )
+        result = await curriculum_service.process_query_async(request.query, request.required_dept_count, request.graph_format)
+        content = build_content(request, result)
+        logger.info(f"✅ API 응답 완료: {len(content['message'])}자")
+        return JSONResponse(status_code=200, content=content)
 
     except Exception as e:
         logger.error(f"❌ API 요청 처리 오류: {e}")
@@ -68,21 +75,99 @@ async def process_query_endpoint(request: QueryRequest):
         )
 
 
-@router.get("/graph-image")
-async def get_graph_image():
-    """최근 생성된 그래프 PNG 이미지 반환"""
-    try:
-        image_path = "result/0_result_department_top1_graph.png"
+def build_content(request: QueryRequest, result: dict) -> dict:
+    """전체 결과 → /chat JSON 응답 본문 (텍스트 + 그래프 이미지 URL)"""
+    # 메시지는 텍스트만 (이미지는 별도로 처리)
+    content = {
+        "message": format_curriculum_response(result),  # 텍스트만 반환
+        "graph_format": request.graph_format,
+        "cached": result.get("cached", False)  # 로드맵 캐시 적중 여부 (호출 측 메트릭용)
+    }
+    if request.graph_format == "json":
+        content["graph_layout"] = result.get("graph")  # 노드/엣지 레이아웃
+    elif request.include_graph_base64:
+        content["graph_base64"] = result.get("graph", "")  # "data:image/png;base64,..." 또는 SVG data URI
+    content["graph_image_url"] = _graph_image_url(result.get("graph_artifact_id"))  # 요청별 결과물 URL (/graph-image/{id})
+    content["cross_department_edges"] = result.get("cross_department_edges", [])  # 학과 간 선수/보완 관계
+    return content
+
+
+async def stream_events(request: QueryRequest):
+    """courses(텍스트 + 과목 목록) → graph(결과물 URL) 이벤트 dict 순서로 yield (NDJSON 스트림/임베디드 호출 공용)"""
+    async for event_type, payload in curriculum_service.process_query_stream(
+        request.query, request.required_dept_count, request.graph_format
+    ):
+        if event_type == "courses":
+            yield {
+                "type": "courses",
+                "message": format_curriculum_response(payload),
+                "selected_departments": payload.get("selected_departments", []),
+                "recommended_courses": payload.get("recommended_courses", []),
+                "cached": payload.get("cached", False)
+            }
+        else:
+            event = {
+                "type": "graph",
+                "graph_format": request.graph_format,
+                "graph_image_url": _graph_image_url(payload.get("graph_artifact_id")),
+                "cross_department_edges": payload.get("cross_department_edges", [])
+            }
+            if request.graph_format == "json":
+                event["graph_layout"] = payload.get("graph")
+            yield event
 
-        if not os.path.exists(image_path):
-            raise HTTPException(status_code=404, detail="그래프 이미지를 찾을 수 없습니다")
 
-        return FileResponse(
-            image_path,
-            media_type="image/png",
-            headers={"Cache-Control": "no-cache"}
-        )
+async def _stream_query(request: QueryRequest):
+    """NDJSON 스트림: stream_events 를 한 줄씩, 실패 시 error 한 줄"""
+    def _line(event: dict) -> str:
+        return json.dumps(event, ensure_ascii=False) + "\n"
+
+    try:
+        async for event in stream_events(request):
+            yield _line(event)
+
+        logger.info("✅ 스트리밍 API 응답 완료")
 
     except Exception as e:
-        logger.error(f"❌ 그래프 이미지 로드 오류: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        logger.error(f"❌ 스트리밍 API 처리 오류: {e}")
+        yield _line({"type": "error", "error": str(e)})
+
+
+@router.get("/graph-image")
+async def get_graph_image():
+    """가장 최근 생성된 그래프 반환 (이전 클라이언트 호환용, 캐시 금지)"""
+    image_path = artifact_store.get_path(artifact_store.latest_id) if artifact_store.latest_id else None
+    if image_path is None:
+        raise HTTPException(status_code=404, detail="그래프 이미지를 찾을 수 없습니다")
+
+    return FileResponse(
+        image_path,
+        media_type=MEDIA_TYPES.get(artifact_store.latest_id.rsplit(".", 1)[-1], "application/octet-stream"),
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match 의 쉼표 구분 ETag 목록 중 하나라도 같으면 True (약한 비교, "*" 포함)"""
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in (candidate[2:] if candidate.startswith("W/") else candidate
+                                         for candidate in candidates)
+
+
+@router.get("/graph-image/{artifact_id}")
+async def get_graph_artifact(artifact_id: str, request: Request):
+    """요청별 그래프 결과물 반환 (내용 해시 ID, ETag + immutable 캐시)"""
+    image_path = artifact_store.get_path(artifact_id)
+    if image_path is None:
+        raise HTTPException(status_code=404, detail="그래프 이미지를 찾을 수 없습니다")
+
+    etag = f'"{artifact_id}"'
+    headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL, "ETag": etag}
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+
+    return FileResponse(
+        image_path,
+        media_type=MEDIA_TYPES.get(artifact_id.rsplit(".", 1)[-1], "application/octet-stream"),
+        headers=headers
+    )
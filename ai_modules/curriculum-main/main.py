@@ -1,11 +1,13 @@
+import asyncio
 import uvicorn
 import os
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from controller.curriculumController import router as curriculum_router
+from controller.curriculumController import router as curriculum_router, curriculum_service
 from util.logging_setup import init_logging
+from util.tracing import TraceMiddleware
 
 # 로깅 초기화
 logger = init_logging(service_name=os.getenv("SERVICE_NAME", "curriculum"))
@@ -21,8 +23,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# llm_agent 가 보낸 traceparent 이어받기 (스팬은 TRACE_EXPORT_PATH 에 기록)
+app.add_middleware(TraceMiddleware, service_name="curriculum")
+
 # 라우터 등록
 app.include_router(curriculum_router)
 
+
+@app.on_event("startup")
+async def warmup_retrievers():
+    """검색 데이터 로드/예열 - 실패해도 첫 요청에서 다시 로드하므로 서버는 계속 뜸"""
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, curriculum_service.warmup)
+    except Exception as e:
+        logger.warning(f"⚠️ 검색 데이터 예열 실패 (첫 요청에서 로드): {e}")
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=7996)
\ No newline at end of file
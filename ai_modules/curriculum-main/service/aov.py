@@ -8,11 +8,12 @@ import matplotlib as mpl
 import matplotlib.font_manager as fm
 import json
 import logging
-from util.utils import save_sorted_courses_as_json, save_merged_json
 import seaborn as sns
 from pathlib import Path
 import base64
 import io
+from service.graph_renderer import graph_renderer
+from service.artifact_store import artifact_store
 
 logger = logging.getLogger(__name__)
 
@@ -145,164 +146,90 @@ def assign_positions(G):
 
     return positions, semester_labels
 
-def visualize_graph_from_data(department_graphs, base_path, index, gt_department):
-    # 기본 학기 순서 정의
-    base_semester_order = ["1-1", "1-2", "2-1", "2-2", "3-1", "3-2", "4-1", "4-2", "5-1", "5-2"]
+def visualize_graph_from_data(department_graphs, graph_format="png", dpi=None, cross_edges=None):
+    """그래프 렌더링 → (결과, 결과물 ID)
 
-    font_name = None
+    png/svg 는 data URI 문자열, json 은 레이아웃 dict 를 돌려준다. cross_edges 는 학과 간 관계 엣지.
+    같은 그래프는 렌더러 캐시에서 바로 가져오고, 결과물은 내용 해시 ID 로 저장소에 한 번만 기록한다.
+    """
+    graph_id, content = graph_renderer.render(department_graphs, graph_format, dpi, cross_edges)
 
-    font_path = FONT_PATH
+    if graph_format == "json":
+        artifact_id = artifact_store.put(json.dumps(content, ensure_ascii=False).encode("utf-8"), "json")
+        return content, artifact_id
 
-    if font_path.exists():
-        font_prop = fm.FontProperties(fname=str(font_path))
-        font_name = font_prop.get_name()
-        plt.rcParams["font.family"] = font_name
-        plt.rcParams["axes.unicode_minus"] = False
-    else:
-        font_prop = None
-        font_name = None
+    if graph_format == "svg":
+        content = content.encode("utf-8")
+        artifact_id = artifact_store.put(content, "svg")
+        return f"data:image/svg+xml;base64,{base64.b64encode(content).decode('utf-8')}", artifact_id
 
-    combined_graph = nx.DiGraph()
-    node_department_map = {}
+    artifact_id = artifact_store.put(content, "png")
+    return f"data:image/png;base64,{base64.b64encode(content).decode('utf-8')}", artifact_id
 
-    unique_departments = set()
-    for department, G in department_graphs.items():
-        for node, node_data in G.nodes(data=True):
-            unique_departments.add(node_data.get("department", "Unknown Department"))
 
+def load_graph_artifact(artifact_id):
+    """저장된 결과물을 visualize_graph_from_data 와 같은 형태로 복원 (없으면 None)"""
+    content = artifact_store.read(artifact_id)
+    if content is None:
+        return None
 
-    # 모던한 파스텔 컬러 팔레트
-    modern_colors = [
-        '#FF6B6B',  # 산호색 빨강
-        '#4ECDC4',  # 청록색
-        '#45B7D1',  # 하늘색
-        '#FFA07A',  # 연한 주황
-        '#98D8C8',  # 민트
-        '#F7DC6F',  # 노란색
-        '#BB8FCE',  # 보라색
-        '#85C1E2',  # 파랑
-    ]
-    department_colors = {dept: modern_colors[i % len(modern_colors)] for i, dept in enumerate(unique_departments)}
+    ext = artifact_id.rsplit(".", 1)[-1]
+    if ext == "json":
+        return json.loads(content.decode("utf-8"))
+    mime = "image/svg+xml" if ext == "svg" else "image/png"
+    return f"data:{mime};base64,{base64.b64encode(content).decode('utf-8')}"
 
-    node_colors = []
 
-    for department, G in department_graphs.items():
-        for node, node_data in G.nodes(data=True):
-            course_id = node
-            course_name = node_data.get("class_name", "Unknown")
-            student_grade = node_data.get("student_grade", "Unknown")
-            semester = node_data.get("semester", "Unknown")
-            node_department = node_data.get("department", "Unknown Department")  
+class IncrementalGraphBuilder:
+    """학과별 선수과목 그래프를 점진적으로 쌓는 빌더 (과목 선택 과정 전체에서 재사용)
 
-            
-            if not combined_graph.has_node(course_id):
-                combined_graph.add_node(course_id,
-                                        class_name=course_name,
-                                        student_grade=student_grade,
-                                        semester=semester)
-                node_colors.append(department_colors.get(node_department, "gray")) 
-                node_department_map[course_id] = node_department 
-        for source, target in G.edges():
-            combined_graph.add_edge(source, target)
+    새로 추가된 과목과 그 선수과목 폐포만 확장하고, 이미 확장한 과목은
+    학과별로 기억해서 다시 조회하지 않는다 (순환 선수관계도 여기서 끊긴다).
+    """
 
-    try:
-        sorted_courses = list(nx.topological_sort(combined_graph))
-    except nx.NetworkXUnfeasible:
-        sorted_courses = []
-            
-    pos, semester_labels = assign_positions(combined_graph)
-
-
-    # 🔥 그래프 크기를 더 크게, 여백 추가
-    plt.figure(figsize=(24, 16), facecolor='white')
-    ax = plt.gca()
-    ax.set_facecolor('#F8F9FA')
-
-    # 🔥 여백 설정 (노드가 잘리지 않도록)
-    ax.margins(0.15)
-
-    # 1) 엣지 먼저 그리기 (직선으로)
-    nx.draw_networkx_edges(
-        combined_graph, pos,
-        edgelist=combined_graph.edges(),
-        arrowstyle='-|>',
-        arrowsize=25,
-        width=2.5,
-        edge_color='#90A4AE',
-        alpha=0.6,
-        connectionstyle='arc3,rad=0'  # 🔥 직선
-    )
-
-    # 2) 노드 그리기 (그림자 효과)
-    nx.draw_networkx_nodes(
-        combined_graph, pos,
-        node_shape='o',
-        node_size=5000,  # 🔥 조금 더 크게
-        node_color=[department_colors[node_department_map[n]] for n in combined_graph.nodes()],
-        edgecolors='white',
-        linewidths=5,  # 🔥 테두리 더 두껍게
-        alpha=0.95
-    )
-
-    # 3) 과목명: 노드 중앙에 (더 읽기 쉽게)
-    name_labels = {n: combined_graph.nodes[n]['class_name'] for n in combined_graph.nodes()}
-    nx.draw_networkx_labels(
-        combined_graph, pos,
-        labels=name_labels,
-        font_size=13,  # 🔥 조금 작게 (긴 과목명 대응)
-        font_weight='bold',
-        font_family=font_name,
-        font_color='#1A1A1A',
-        verticalalignment='center',
-        horizontalalignment='center'
-    )
-
-    # 범례
-    legend_patches = [
-        plt.Line2D([0], [0], marker='s', color='w',
-                markerfacecolor=department_colors[d],
-                markeredgecolor='black',
-                markersize=12, label=d)
-        for d in unique_departments
-    ]
-    plt.legend(handles=legend_patches, title="학과", loc="upper right",
-               fontsize=12, title_fontsize=14, frameon=True, fancybox=True, shadow=True)
-
-    # 제목: 학과 이름들 포함 (더 크게, 아래로 내림)
-    department_list = list(unique_departments)[:2]  # 최대 2개 학과만
-    department_names = "_".join(department_list)
-    max_y_global = max([pos[1] for pos in pos.values()]) if pos else 0
-    # 🔥 제목 크기 증가 (22 → 28), 위치 조정 (+5 → +3)
-    plt.text(len(base_semester_order) / 2 - 0.5, max_y_global + 3,
-             f"{department_names} 커리큘럼 추천 그래프",
-             fontsize=28, fontweight='heavy', ha='center', va='bottom',
-             fontfamily=font_name, color='black')  # 🔥 검은색, 더 진하게
-
-    # 학기 라벨 추가 (노드들 아래)
-    for label_text, label_pos in semester_labels.items():
-        plt.text(label_pos[0], label_pos[1], label_text,
-                fontsize=16, fontweight='bold', ha='center', va='top',
-                fontfamily=font_name, color='#212121')
-
-    plt.axis('off')
-    # 🔥 tight_layout 제거 (margins와 충돌)
-    # plt.tight_layout()
-
-    # 파일로 저장
-    save_path = os.path.join(base_path, f"{index}_{gt_department}_graph.png")
-    # 🔥 pad_inches 추가로 여백 확보
-    plt.savefig(save_path, dpi=300, bbox_inches='tight', pad_inches=0.3, facecolor='white')
-
-    # Base64 인코딩
-    buffer = io.BytesIO()
-    plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight', pad_inches=0.3, facecolor='white')
-    buffer.seek(0)
-    graph_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-
-    plt.close()
-
-    return f"data:image/png;base64,{graph_base64}"
+    def __init__(self, db_handler, logger=None, existing_visited_ids=None):
+        self.db_handler = db_handler
+        self.logger = logger or logging.getLogger(__name__)
+        self.department_graphs = {}
+        self.expanded_ids = defaultdict(set)  # 학과 → 선수과목까지 확장한 과목 ID
+        self.visited_nodes_total = set(existing_visited_ids) if existing_visited_ids is not None else set()
 
+    def add_courses(self, courses):
+        """과목 목록을 그래프에 추가하고 학과별 그래프 dict 반환"""
+        for course in courses:
+            if "department_name" in course:
+                department = course["department_name"]
+                if department not in self.department_graphs:
+                    self.department_graphs[department] = nx.DiGraph()
+                self._add_course(self.department_graphs[department], department, course)
+        return self.department_graphs
+
+    def _add_course(self, G, department, course):
+        class_id = course['class_id']
+
+        G.add_node(
+            class_id,
+            class_name=course.get('class_name', f"Unnamed Node {class_id}"),
+            department=course.get('department_name', "Unknown Department"),
+            semester=course.get('semester', "Unknown"),
+            student_grade=course.get('student_grade', "Unknown"),
+            curriculum=course.get('curriculum', "Unknown"),
+            description=course.get('description', "Unknown"),
+            prerequisites=course.get('prerequisite', "Unknown")
+        )
+        self.visited_nodes_total.add(class_id)
+        self.logger.info(f'현재과목: {course.get("class_name")}')
+
+        if not course.get("prerequisite") or class_id in self.expanded_ids[department]:
+            return
+        self.expanded_ids[department].add(class_id)
+
+        prerequisites = self.db_handler.fetch_prerequisites(class_id)
+        self.logger.info(f'fetcehd prerequisites: {prerequisites}')
+        for prereq in prerequisites:
+            G.add_edge(prereq['class_id'], class_id)
+            self.logger.info(f'선행과목: {prereq["class_name"]}')
+            self._add_course(G, department, prereq)
 
 
 def build_prereq_postreq(selected_list, db_handler, logger=None,
@@ -330,109 +257,25 @@ def build_prereq_postreq(selected_list, db_handler, logger=None,
     else:
         print("⚠️ Unexpected data format:", selected_list)
         return {}
-    
-    selected_candidates = courses.copy()
-    department_courses = defaultdict(list)
-
-    for course in courses:
-        if "department_name" in course:
-            department_courses[course["department_name"]].append(course)
-        
-    department_graphs = {}
-    class_list = []
-    class_name_list = []
-    department_list = []
-    visited_nodes_total = set(existing_visited_ids) if existing_visited_ids is not None else set()
-    logger.info(f"Visited nodes total: {len(visited_nodes_total)}")
-
-    for department, courses in department_courses.items():
-        # print(f"Building graph for {department} with {len(courses)} courses.")ㅊ
-        G = nx.DiGraph()
-       
-
-        def add_course_recursive(course):
-            class_id = course['class_id']
-            class_name = course['class_name']
-                    
-            # if class_id in visited_nodes:
-            #         return
-            # visited_nodes.add(class_id)
-            
-            G.add_node(
-                class_id,
-                class_name=course.get('class_name', f"Unnamed Node {class_id}"),
-                department=course.get('department_name', "Unknown Department"),
-                semester=course.get('semester', "Unknown"),
-                student_grade=course.get('student_grade', "Unknown"),
-                curriculum=course.get('curriculum', "Unknown"),
-                description=course.get('description', "Unknown"),
-                prerequisites=course.get('prerequisite', "Unknown")
-            )
-            class_list.append(class_id)
-            class_name_list.append(class_name)
-            department_list.append(department)
-            visited_nodes_total.add(class_id)
-            logger.info(f'현재과목: {class_name}')
-
-            if course.get("prerequisite"):
-                prerequisites = db_handler.fetch_prerequisites(course['class_id'])
-                logger.info(f'fetcehd prerequisites: {prerequisites}')
-                for prereq in prerequisites:
-                    prereq_id = prereq['class_id']
-                    prereq_name = prereq['class_name']
-                
-                    # if prereq_id not in visited_nodes:
-                    G.add_node(
-                        prereq_id,
-                        class_name=prereq.get('class_name', f"Unnamed Node {prereq_id}"),
-                        department=prereq.get('department_name', "Unknown Department"),
-                        semester=prereq.get('semester', "Unknown"),
-                        student_grade=prereq.get('student_grade', "Unknown"),
-                        curriculum=prereq.get('curriculum', "Unknown"),
-                        description=prereq.get('description', "Unknown"),
-                        prerequisites=prereq.get('prerequisites', "Unknown")
-                    )
-                    
-
-                    G.add_edge(prereq_id, class_id)
-                    # G.add_edge(class_id, prereq_id)
-                    # visited_nodes.add(class_id)
-                    
-                    class_list.append(prereq_id)
-                    class_name_list.append(prereq_name)
-                    department_list.append(department)
-                    visited_nodes_total.add(prereq_id)
-                    logger.info(f'선행과목: {prereq_name}')
-                    
-                    
-                    add_course_recursive(prereq)
-                    
-        for course in courses:
-            add_course_recursive(course)
 
-        department_graphs[department] = G 
+    builder = IncrementalGraphBuilder(db_handler, logger=logger, existing_visited_ids=existing_visited_ids)
+    builder.logger.info(f"Visited nodes total: {len(builder.visited_nodes_total)}")
+    builder.add_courses(courses)
 
-    return department_graphs, visited_nodes_total
+    return builder.department_graphs, builder.visited_nodes_total
 
 
 
-def visualize_and_sort_department_graphs(department_graphs, base_path="./graphs/", index=None, gt_department=None):
-    """그래프 시각화 및 데이터 정렬 - PNG 이미지 반환"""
+def visualize_and_sort_department_graphs(department_graphs, graph_format="png", dpi=None, cross_edges=None):
+    """그래프 시각화 + 학과별 노드/엣지 JSON - (학과별 JSON, PNG/SVG data URI 또는 JSON 레이아웃, 결과물 ID)
 
-    os.makedirs(base_path, exist_ok=True)
+    요청별 결과는 메모리로만 돌려준다 (동시 요청이 고정 경로 파일을 덮어쓰지 않도록 파일로 쓰지 않음).
+    """
+    # 그래프 이미지(또는 레이아웃) 생성 - 결과물은 내용 해시 ID 로 저장소에
+    graph_base64, artifact_id = visualize_graph_from_data(department_graphs, graph_format, dpi, cross_edges)
 
-    # PNG 그래프 이미지 생성
-    graph_base64 = visualize_graph_from_data(department_graphs, base_path, index, gt_department)
-
-    # 기존 JSON 데이터 생성 로직 유지
-    merged_data = []
     all_departments_data = {}
     for department, G in department_graphs.items():
-        try:
-            sorted_courses = list(nx.topological_sort(G))
-        except nx.NetworkXUnfeasible:
-            sorted_courses = []
-
         department_data = {
             "nodes": [],
             "edges": []
@@ -467,15 +310,7 @@ def visualize_and_sort_department_graphs(department_graphs, base_path="./graphs/
             })
             
         all_departments_data[department] = department_data
-        sorted_courses_data = save_sorted_courses_as_json(base_path, department, sorted_courses, G)
-        merged_data.extend(sorted_courses_data)
-
-    all_json_path = os.path.join(base_path, f"{index}_{gt_department}.json")
-    with open(all_json_path, "w", encoding="utf-8") as f:
-        json.dump(all_departments_data, f, indent=4, ensure_ascii=False)
-
-    save_merged_json(merged_data, base_path, index, gt_department)
 
-    # PNG base64 이미지 반환
-    return all_departments_data, graph_base64 
+    # PNG/SVG data URI 또는 JSON 레이아웃 + 결과물 ID 반환
+    return all_departments_data, graph_base64, artifact_id
 
@@ -0,0 +1,130 @@
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_DIR = os.getenv("GRAPH_ARTIFACT_DIR", str(Path(__file__).resolve().parent.parent / "result" / "artifacts"))
+ARTIFACT_TTL_SEC = int(os.getenv("GRAPH_ARTIFACT_TTL_SEC", "86400"))
+ARTIFACT_MAX_MB = int(os.getenv("GRAPH_ARTIFACT_MAX_MB", "200"))
+ARTIFACT_SWEEP_SEC = int(os.getenv("GRAPH_ARTIFACT_SWEEP_SEC", "600"))
+
+# 외부 입력(URL 경로)으로 들어오는 ID 검증용 - 디렉토리 탈출 방지
+ARTIFACT_ID_PATTERN = re.compile(r"^[0-9a-f]{64}\.(png|svg|json)$")
+
+
+class ArtifactStore:
+    """내용 해시로 주소가 정해지는 그래프 결과물 저장소
+
+    같은 내용은 같은 ID 가 되므로 파일은 한 번 쓰면 바뀌지 않는다 (동시 요청끼리 덮어쓰지 않음).
+    오래된 파일(TTL)과 용량 초과분은 백그라운드 스위퍼가 오래된 순으로 지운다.
+    """
+
+    def __init__(self, root: str = ARTIFACT_DIR, ttl_sec: int = ARTIFACT_TTL_SEC,
+                 max_bytes: int = ARTIFACT_MAX_MB * 1024 * 1024, sweep_interval: int = ARTIFACT_SWEEP_SEC):
+        self.root = root
+        self.ttl_sec = ttl_sec
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self.latest_id: Optional[str] = None
+        self._stop_event = threading.Event()
+        self._sweeper = None
+        os.makedirs(self.root, exist_ok=True)
+
+    def put(self, content: bytes, ext: str) -> str:
+        """내용 저장 후 ID (sha256.ext) 반환 - 이미 있으면 쓰지 않고 접근 시각만 갱신"""
+        artifact_id = f"{hashlib.sha256(content).hexdigest()}.{ext}"
+        path = os.path.join(self.root, artifact_id)
+
+        try:
+            os.utime(path, None)
+        except FileNotFoundError:
+            # 없으면 (스위퍼가 방금 지운 경우 포함) 새로 씀 - exists 확인과 touch 사이 경합이 없도록 utime 결과로 판단
+            # 임시 파일에 쓰고 rename → 읽는 쪽은 항상 완성된 파일만 봄
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(content)
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+        self.latest_id = artifact_id
+        return artifact_id
+
+    def get_path(self, artifact_id: str) -> Optional[str]:
+        """ID 에 해당하는 파일 경로 (잘못된 ID 거나 이미 지워졌으면 None)"""
+        if not ARTIFACT_ID_PATTERN.match(artifact_id or ""):
+            return None
+        path = os.path.join(self.root, artifact_id)
+        return path if os.path.exists(path) else None
+
+    def read(self, artifact_id: str) -> Optional[bytes]:
+        """결과물 내용 (없으면 None) - 다시 쓰인 결과물이므로 접근 시각을 갱신해 스위퍼가 지우지 않게 함"""
+        path = self.get_path(artifact_id)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+            os.utime(path, None)
+        except FileNotFoundError:
+            return None
+        return content
+
+    def sweep(self):
+        """TTL 지난 파일 삭제 후, 전체 용량이 한도를 넘으면 오래된 파일부터 삭제"""
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            # 중간에 죽은 임시 파일도 TTL 기준으로 정리
+            if now - stat.st_mtime > self.ttl_sec:
+                self._remove(path)
+            elif ARTIFACT_ID_PATTERN.match(name):
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            self._remove(path)
+            total_bytes -= size
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def start_sweeper(self):
+        if self.sweep_interval <= 0 or self._sweeper is not None:
+            return
+
+        def _sweep_loop():
+            while not self._stop_event.wait(self.sweep_interval):
+                try:
+                    self.sweep()
+                except Exception as e:
+                    logger.error(f"그래프 결과물 정리 실패: {e}")
+
+        self._sweeper = threading.Thread(target=_sweep_loop, name="artifact-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        self._stop_event.set()
+
+
+artifact_store = ArtifactStore()
@@ -0,0 +1,64 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+from datetime import datetime
+from pathlib import Path
+
+AUDIT_LOG_PATH = os.getenv(
+    "AUDIT_LOG_PATH", str(Path(__file__).resolve().parent / "result" / "audit" / "llm_audit.jsonl")
+)
+AUDIT_LOG_MAX_MB = int(os.getenv("AUDIT_LOG_MAX_MB", "50"))
+AUDIT_LOG_BACKUPS = int(os.getenv("AUDIT_LOG_BACKUPS", "5"))
+AUDIT_SAMPLE_RATE = float(os.getenv("AUDIT_SAMPLE_RATE", "1.0"))
+
+
+class AuditSink:
+    """LLM 호출 감사 로그 - 요청 경로는 큐에 넣기만 하고 백그라운드 스레드가 JSONL 에 이어 씀
+
+    파일 크기가 한도를 넘으면 .1, .2 ... 로 회전하고, sample_rate 로 기록 비율을 줄일 수 있다.
+    """
+
+    def __init__(self, path: str = AUDIT_LOG_PATH, max_bytes: int = AUDIT_LOG_MAX_MB * 1024 * 1024,
+                 backup_count: int = AUDIT_LOG_BACKUPS, sample_rate: float = AUDIT_SAMPLE_RATE):
+        self.path = path
+        self.sample_rate = sample_rate
+        self._logger = logging.getLogger(f"audit.{path}")
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False  # 서비스 로그(curriculum.log)에는 섞지 않음
+        self._listener = None
+
+        if sample_rate <= 0:
+            return
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True
+        )
+        file_handler.setFormatter(logging.Formatter("%(message)s"))
+
+        # 요청 스레드 → 큐 → 리스너 스레드 → 파일
+        records = queue.Queue(-1)
+        self._logger.addHandler(logging.handlers.QueueHandler(records))
+        self._listener = logging.handlers.QueueListener(records, file_handler)
+        self._listener.start()
+        atexit.register(self.close)
+
+    def record(self, kind: str, **fields):
+        """감사 레코드 1건 (샘플링에서 빠지면 아무것도 하지 않음)"""
+        if self._listener is None or (self.sample_rate < 1.0 and random.random() >= self.sample_rate):
+            return
+        entry = {"timestamp": datetime.now().isoformat(timespec="milliseconds"), "kind": kind, **fields}
+        self._logger.info(json.dumps(entry, ensure_ascii=False, default=str))
+
+    def close(self):
+        """남은 레코드를 모두 쓰고 리스너 종료"""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+
+audit_sink = AuditSink()
@@ -1,16 +1,35 @@
+import asyncio
 import logging
 import os
+import time
+from functools import partial
+from pathlib import Path
 from typing import Dict, Any, List, Optional
 import networkx as nx
 
-from service.open_ai import query_expansion
-from service.aov import build_prereq_postreq, visualize_and_sort_department_graphs
+from service.open_ai import query_expansion, query_expansion_async, analyze_course_relationships_async
+from service.aov import build_prereq_postreq, visualize_and_sort_department_graphs, load_graph_artifact
 from util.dbClient import DbClient
 from service.search import DepartmentRetriever, ClassRetriever
-from service.curricum_recursive import recursive_top1_selection
+from service.search.embedding_client import get_query_embedding_async, normalize
+from service.curricum_recursive import iterative_top1_selection
+from service.search.dataset_store import dataset_version
+from service.db.prereq_index import PrerequisiteIndex
+from service.roadmap_cache import roadmap_cache
+from util.tracing import start_span, with_context
 
 logger = logging.getLogger(__name__)
 
+# 서비스 루트 기준 경로 (다른 작업 디렉토리에서 임베디드로 불러도 같은 파일 사용)
+SERVICE_ROOT = Path(__file__).resolve().parent.parent
+QUERY_EXPANSION_PROMPT = str(SERVICE_ROOT / "service" / "prompt" / "query_exp_once.txt")
+DATA_PATH = str(SERVICE_ROOT / "data")
+RESULT_PATH = str(SERVICE_ROOT / "result")
+# 동시에 처리하는 커리큘럼 요청 수 (LLM/임베딩 호출과 렌더링 부하 제한)
+CURRICULUM_MAX_CONCURRENCY = int(os.getenv("CURRICULUM_MAX_CONCURRENCY", "4"))
+# 과목 선택 후 학과 간 과목 관계(선수/보완)를 LLM 으로 판정해 그래프에 추가 (판정 결과는 영구 캐시)
+CROSS_DEPARTMENT_RELATIONS = os.getenv("CURRICULUM_CROSS_DEPARTMENT_RELATIONS", "true").lower() == "true"
+
 
 class CurriculumService:
     """커리큘럼 추천 서비스 - 간소화된 버전 (FAISS 서비스 활용)"""
@@ -18,74 +37,246 @@ class CurriculumService:
     def __init__(self, db_client: DbClient):
         """서비스 초기화"""
         self.db_client = db_client
-        self.department_retriever = DepartmentRetriever(db_client)  # 학과 검색 서비스
-        self.class_retriever = ClassRetriever(db_client)  # 과목 검색 서비스
+        self.department_retriever = DepartmentRetriever(db_client, data_path=DATA_PATH)  # 학과 검색 서비스
+        self.class_retriever = ClassRetriever(db_client, data_path=DATA_PATH)  # 과목 검색 서비스
+
+        # 선수과목 인메모리 인덱스 (로드 실패 시 DB 조회로 폴백) + 주기적 갱신
+        self.prereq_index = PrerequisiteIndex(db_client)
+        self.prereq_index.load()
+        self.prereq_index.start_refresh()
+
+        self._semaphore = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # 이벤트 루프 안에서 처음 필요할 때 생성
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(CURRICULUM_MAX_CONCURRENCY)
+        return self._semaphore
+
+    def _ensure_loaded(self):
+        """학과/과목 검색 데이터 로드 (최초 1회)"""
+        if not self.department_retriever.is_loaded:
+            self.department_retriever.load_data()
+        if not self.class_retriever.is_loaded:
+            self.class_retriever.load_data()
+
+    def warmup(self):
+        """서버 시작 시 검색 데이터 로드 + 예열 (첫 요청이 로드 비용을 떠안지 않도록)"""
+        start_time = time.perf_counter()
+        self.department_retriever.warmup()
+        dept_ms = (time.perf_counter() - start_time) * 1000
+        self.class_retriever.warmup()
+        total_ms = (time.perf_counter() - start_time) * 1000
+        logger.info(
+            f"🚀 검색 데이터 예열 완료: 학과 {len(self.department_retriever.lookup_index)}개 {dept_ms:.1f}ms, "
+            f"과목 {len(self.class_retriever.lookup_index)}개 {total_ms - dept_ms:.1f}ms (총 {total_ms:.1f}ms)"
+        )
+
+    def dataset_version(self) -> str:
+        """로드맵 캐시 무효화 기준 - 검색 데이터 파일 + 선수과목 인덱스 내용"""
+        return f"{dataset_version(self.department_retriever.data_path)}:{self.prereq_index.version}"
+
+    def _cached_roadmap(self, kind: str, query: str, required_dept_count: int, graph_format: str,
+                        version: str) -> Optional[Dict[str, Any]]:
+        """캐시된 로드맵 + 저장소의 그래프 결과물 (결과물이 정리됐으면 캐시 미스)"""
+        payload = roadmap_cache.get(kind, query, required_dept_count, graph_format, version)
+        if payload is None:
+            return None
+
+        graph = load_graph_artifact(payload["graph_artifact_id"]) if payload.get("graph_artifact_id") else None
+        if graph is None:
+            roadmap_cache.invalidate(payload)
+            return None
+
+        logger.info(f"⚡ 로드맵 캐시 적중 ({kind}): {query[:50]}")
+        return {**payload, "graph": graph, "cached": True}
+
+    def _cache_roadmap(self, query: str, result: Dict[str, Any], required_dept_count: int, graph_format: str,
+                       version: str):
+        # 그래프 본문은 결과물 저장소에 있으므로 ID 만 보관
+        payload = {key: value for key, value in result.items() if key not in ("graph", "cached")}
+        roadmap_cache.put(query, payload, required_dept_count, graph_format, version)
+
+    def _select_courses(self, query_info: str, dept_results: List[Dict], already_selected_classes: List[Dict],
+                        query_emb=None) -> Dict[str, nx.DiGraph]:
+        # iterative_top1_selection으로 과목 선택 (임베딩/점수 계산 1회, 전체 최대 28과목)
+        department_graphs = iterative_top1_selection(
+            client=None,
+            db_handler=self.prereq_index,
+            query=query_info,
+            selected_dept_list=dept_results,
+            class_retriever=self.class_retriever,
+            graph_path=RESULT_PATH,
+            gt_department=None,
+            already_selected_classes=already_selected_classes,
+            graph_visited_ids=set(),
+            max_total_courses=28,
+            query_emb=query_emb
+        )
+
+        # department_graphs는 dict of DiGraph
+        # {"학과1": DiGraph, "학과2": DiGraph, ...}
+        # 만약 빈 dict이거나 그래프가 없으면 기본 구조 생성
+        if not department_graphs or not isinstance(department_graphs, dict):
+            logger.warning("⚠️ department_graphs가 비어있거나 잘못된 형식입니다.")
+            department_graphs = {"통합커리큘럼": nx.DiGraph()}
+        return department_graphs
+
+    def _build_result(self, query_info: str, dept_results: List[Dict], already_selected_classes: List[Dict],
+                      department_graphs: Dict[str, nx.DiGraph], graph_format: str,
+                      cross_edges: Optional[List[Dict]] = None) -> Dict[str, Any]:
+        # 그래프 시각화 (png/svg: data URI, json: 레이아웃 dict) - 학과 간 관계 엣지 포함
+        all_results_json, graph_base64, graph_artifact_id = visualize_and_sort_department_graphs(
+            department_graphs, graph_format=graph_format, cross_edges=cross_edges
+        )
+
+        logger.info(f"✅ 그래프 생성 완료 ({graph_format}) - 길이: {len(graph_base64) if graph_base64 else 0}")
+
+        return {
+            "expanded_query": query_info,
+            "all_results_json": all_results_json,
+            "graph": graph_base64,
+            "graph_format": graph_format,
+            "graph_artifact_id": graph_artifact_id,
+            "cross_department_edges": cross_edges or [],
+            **self._build_course_list(query_info, dept_results, already_selected_classes)
+        }
+
+    def _build_course_list(self, query_info: str, dept_results: List[Dict],
+                           already_selected_classes: List[Dict]) -> Dict[str, Any]:
+        # 선택된 과목 리스트를 JSON 포맷으로 변환
+        recommended_courses = []
+        for course in already_selected_classes:
+            recommended_courses.append({
+                "class_id": course.get("class_id"),
+                "name": course.get("class_name"),
+                "department": course.get("department_name"),
+                "score": round(course.get("score", 0.0), 2),
+                "student_grade": course.get("student_grade"),
+                "semester": course.get("semester"),
+                "description": course.get("description", "")
+            })
 
-    def process_query(self, query: str, required_dept_count: int = 30) -> Dict[str, Any]:
-        """쿼리 처리 - recursive_top1_selection 기반"""
+        return {
+            "expanded_query": query_info,
+            "selected_departments": [d.get("department_name") for d in dept_results] if dept_results else [],
+            "recommended_courses": recommended_courses
+        }
+
+    def process_query(self, query: str, required_dept_count: int = 30, graph_format: str = "png") -> Dict[str, Any]:
+        """쿼리 처리 - iterative_top1_selection 기반"""
         logger.info(f"쿼리 처리: {query}...")
 
         try:
-            # 1. 쿼리 확장
-            query_info = query_expansion(None, query, "service/prompt/query_exp_once.txt")
+            # 0. 같은 쿼리의 로드맵이 캐시에 있으면 바로 반환
+            version = self.dataset_version()
+            cached = self._cached_roadmap("query", query, required_dept_count, graph_format, version)
+            if cached is not None:
+                return cached
+
+            # 1. 쿼리 확장 (확장 결과가 같은 로드맵이 있으면 검색/그래프 생략)
+            query_info = query_expansion(None, query, QUERY_EXPANSION_PROMPT)
+            cached = self._cached_roadmap("expanded", query_info, required_dept_count, graph_format, version)
+            if cached is not None:
+                self._cache_roadmap(query, cached, required_dept_count, graph_format, version)
+                return cached
 
             # 2. 학과 검색
             dept_results = self.department_retriever.search_department(query_info, count=required_dept_count)
-            
-            # 3. recursive_top1_selection으로 과목 선택 (전체 최대 30과목)
-            # already_selected_classes를 초기화하고 추적
+
+            # 3. 과목 선택 + 선수과목 그래프
             already_selected_classes = []
-            graph_visited_ids = set()
-
-            department_graphs = recursive_top1_selection(
-                client=None,
-                db_handler=self.db_client,
-                query=query_info,
-                selected_dept_list=dept_results,
-                class_retriever=self.class_retriever,
-                graph_path="result",
-                gt_department=None,
-                already_selected_classes=already_selected_classes,
-                graph_visited_ids=graph_visited_ids,
-                max_total_courses=28,
-                depth=0
-            )
-
-            # 4. department_graphs는 dict of DiGraph
-            # {"학과1": DiGraph, "학과2": DiGraph, ...}
-            # 만약 빈 dict이거나 그래프가 없으면 기본 구조 생성
-            if not department_graphs or not isinstance(department_graphs, dict):
-                logger.warning("⚠️ department_graphs가 비어있거나 잘못된 형식입니다.")
-                department_graphs = {"통합커리큘럼": nx.DiGraph()}
-
-            # 5. 그래프 시각화
-            all_results_json, graph_base64 = visualize_and_sort_department_graphs(
-                department_graphs, "result", 0, "result_department_top1"
-            )
-
-            logger.info(f"✅ 이미지 생성 완료 - base64 길이: {len(graph_base64) if graph_base64 else 0}자")
-
-            # 선택된 과목 리스트를 JSON 포맷으로 변환
-            recommended_courses = []
-            for course in already_selected_classes:
-                recommended_courses.append({
-                    "class_id": course.get("class_id"),
-                    "name": course.get("class_name"),
-                    "department": course.get("department_name"),
-                    "score": round(course.get("score", 0.0), 2),
-                    "student_grade": course.get("student_grade"),
-                    "semester": course.get("semester"),
-                    "description": course.get("description", "")
-                })
-
-            return {
-                "expanded_query": query_info,
-                "all_results_json": all_results_json,
-                "graph": graph_base64,
-                "selected_departments": [d.get("department_name") for d in dept_results] if dept_results else [],
-                "recommended_courses": recommended_courses
-            }
+            department_graphs = self._select_courses(query_info, dept_results, already_selected_classes)
+
+            # 4. 그래프 시각화 + 응답 구성
+            result = self._build_result(query_info, dept_results, already_selected_classes, department_graphs, graph_format)
+            self._cache_roadmap(query, result, required_dept_count, graph_format, version)
+            return result
 
         except Exception as e:
             logger.error(f"쿼리 처리 실패: {e}")
             raise
+
+    async def process_query_async(self, query: str, required_dept_count: int = 30, graph_format: str = "png") -> Dict[str, Any]:
+        """비동기 쿼리 처리 - process_query_stream 의 최종 결과만 반환"""
+        result = None
+        async for event_type, payload in self.process_query_stream(query, required_dept_count, graph_format):
+            if event_type == "graph":
+                result = payload
+        return result
+
+    async def process_query_stream(self, query: str, required_dept_count: int = 30, graph_format: str = "png"):
+        """단계별 비동기 쿼리 처리 - ("courses", 과목 목록) 을 먼저, 렌더링이 끝나면 ("graph", 전체 결과) 를 yield
+
+        LLM/임베딩은 비동기 호출, CPU/DB 작업은 executor, 동시 처리 수는 세마포어로 제한.
+        단계별 스팬은 yield 를 감싸지 않음 (소비 측 컨텍스트가 바뀌어도 스팬 종료가 꼬이지 않도록).
+        """
+        loop = asyncio.get_running_loop()
+
+        # 0. 캐시 적중이면 동시 처리 제한을 기다리지 않고 바로 반환
+        version = self.dataset_version()
+        cached = await loop.run_in_executor(
+            None, self._cached_roadmap, "query", query, required_dept_count, graph_format, version
+        )
+        if cached is not None:
+            yield "courses", cached
+            yield "graph", cached
+            return
+
+        async with self._get_semaphore():
+            logger.info(f"쿼리 처리(async): {query}...")
+
+            try:
+                # 1. 쿼리 확장 ‖ 검색 데이터 로드 (서로 독립적, 로드는 최초 요청에서만 실제로 일어남)
+                with start_span("curriculum.expand_query"):
+                    query_info, _ = await asyncio.gather(
+                        query_expansion_async(query, QUERY_EXPANSION_PROMPT),
+                        loop.run_in_executor(None, with_context(self._ensure_loaded))
+                    )
+
+                # 확장 결과가 같은 로드맵이 있으면 검색/그래프 생략
+                cached = await loop.run_in_executor(
+                    None, self._cached_roadmap, "expanded", query_info, required_dept_count, graph_format, version
+                )
+                if cached is not None:
+                    self._cache_roadmap(query, cached, required_dept_count, graph_format, version)
+                    yield "courses", cached
+                    yield "graph", cached
+                    return
+
+                # 2. 확장 쿼리 임베딩 1회 → 학과 검색과 과목 점수 계산이 같이 사용
+                query_emb = normalize(await get_query_embedding_async(query_info))
+
+                # 3. 학과 검색 (FAISS 는 executor, LLM 학과 선택은 비동기)
+                with start_span("curriculum.search_departments"):
+                    dept_results = await self.department_retriever.search_department_async(
+                        query_info, query_emb, count=required_dept_count
+                    )
+
+                # 4. 과목 선택 + 선수과목 그래프 (CPU 작업) → 과목 목록 먼저 전달
+                already_selected_classes = []
+                with start_span("curriculum.select_courses", departments=len(dept_results)):
+                    department_graphs = await loop.run_in_executor(None, with_context(
+                        partial(self._select_courses, query_info, dept_results, already_selected_classes, query_emb)
+                    ))
+                yield "courses", self._build_course_list(query_info, dept_results, already_selected_classes)
+
+                # 5. 학과 간 과목 관계 (임베딩 필터 → 캐시 → 남은 쌍만 배치 LLM)
+                cross_edges = []
+                if CROSS_DEPARTMENT_RELATIONS and len(department_graphs) > 1:
+                    with start_span("curriculum.cross_department_relations"):
+                        relations = await analyze_course_relationships_async(department_graphs, self.class_retriever)
+                    cross_edges = relations["new_edges"]
+
+                # 6. 그래프 시각화 + 응답 구성 (PNG 렌더링은 프로세스 풀)
+                with start_span("curriculum.render_graph", graph_format=graph_format):
+                    result = await loop.run_in_executor(None, with_context(partial(
+                        self._build_result, query_info, dept_results, already_selected_classes, department_graphs,
+                        graph_format, cross_edges
+                    )))
+                self._cache_roadmap(query, result, required_dept_count, graph_format, version)
+                yield "graph", result
+
+            except Exception as e:
+                logger.error(f"쿼리 처리 실패: {e}")
+                raise
@@ -1,14 +1,19 @@
-
+import heapq
 import logging
-from service.aov import build_prereq_postreq
+from service.aov import IncrementalGraphBuilder
 
 logger = logging.getLogger(__name__)
 
-def recursive_top1_selection(client, db_handler, query, selected_dept_list,
-                            class_retriever, graph_path, gt_department,
-                            already_selected_classes=None, graph_visited_ids=None,
-                            max_total_courses=28, depth=0):
-    """재귀적으로 과목을 선택하는 함수 (전체 최대 28과목)"""
+def iterative_top1_selection(client, db_handler, query, selected_dept_list,
+                             class_retriever, graph_path, gt_department,
+                             already_selected_classes=None, graph_visited_ids=None,
+                             max_total_courses=28, query_emb=None):
+    """한 번의 임베딩/점수 계산으로 과목을 선택하는 함수 (전체 최대 28과목)
+
+    기존 재귀 방식과 같은 규칙: 매 라운드 남은 후보 중 최고점 과목과,
+    다른 학과의 최고점 과목을 하나 더 골라 최대 2개씩 추가한다.
+    학과별 정렬 목록의 맨 앞 과목들을 힙으로 관리해서 라운드마다 재검색하지 않는다.
+    """
 
     # Initialize parameters
     if already_selected_classes is None or not isinstance(already_selected_classes, list):
@@ -17,14 +22,6 @@ def recursive_top1_selection(client, db_handler, query, selected_dept_list,
     if graph_visited_ids is None or not isinstance(graph_visited_ids, set):
         graph_visited_ids = set()
 
-    # 종료 조건 1: 전체 과목 수가 30개 이상이면 종료
-    if len(already_selected_classes) >= max_total_courses:
-        logger.info(f"✅ 전체 과목 수 {len(already_selected_classes)}개 달성. 검색 종료.")
-        G, _ = build_prereq_postreq(already_selected_classes, db_handler,
-                                    logger=logger, existing_visited_ids=graph_visited_ids)
-        logger.info(f"최종 선택된 과목 수: {len(already_selected_classes)}")
-        return G
-
     # Track visited nodes (안전하게 처리)
     visited_ids = set()
     for c in already_selected_classes:
@@ -34,67 +31,88 @@ def recursive_top1_selection(client, db_handler, query, selected_dept_list,
                 visited_ids.add(class_id)
         elif isinstance(c, (int, str)):
             visited_ids.add(c)
-    graph_visited_ids.update(visited_ids)
 
-    # 모든 학과에서 검색 (제한 없음)
-    candidate_dict = class_retriever.search_class_by_departments(
-        query, selected_dept_list, exclude_class_ids=list(visited_ids)
+    # 선택 과정 전체에서 유지하는 그래프 빌더 (새로 추가된 과목만 확장)
+    graph_visited_ids.update(visited_ids)
+    graph_builder = IncrementalGraphBuilder(db_handler, logger=logger, existing_visited_ids=graph_visited_ids)
+    graph_builder.add_courses([c for c in already_selected_classes if isinstance(c, dict)])
+
+    # 쿼리 임베딩과 점수 계산은 한 번만 (정규화된 임베딩을 받으면 그대로 사용)
+    if query_emb is None:
+        query_emb = class_retriever.embed_query(query)
+    candidate_dict = class_retriever.score_classes_by_departments(
+        query_emb, selected_dept_list, exclude_class_ids=visited_ids
     )
 
-    candidate_list = []
-    for dept_name, dept_results in candidate_dict.items():
-        if isinstance(dept_results, list) and dept_results:
-            candidate_list.extend(dept_results)
-
-    # 종료 조건 2: 후보가 없으면 종료
-    if not candidate_list:
-        logger.info("더 이상 후보 과목이 없음. 검색 종료.")
-        G, _ = build_prereq_postreq(already_selected_classes, db_handler,
-                                    logger=logger, existing_visited_ids=graph_visited_ids)
-        logger.info(f"최종 선택된 과목 수: {len(already_selected_classes)}")
-        return G
-
-    # Sort by score descending
-    candidate_list = sorted(candidate_list, key=lambda x: x["score"], reverse=True)
-
-    # 다양한 학과에서 최대 2개 선택
-    selected_candidates = []
-    seen_departments = set()
-
-    for candidate in candidate_list:
-        dept_name = candidate["department_name"]
+    # 학과별 (이미 점수순 정렬된) 후보 목록의 현재 맨 앞 과목만 힙에 둠 → 힙에는 학과당 하나
+    # 동점이면 학과 순서 → 학과 내 순서 (기존 안정 정렬과 동일)
+    dept_candidates = [
+        dept_results for dept_results in candidate_dict.values()
+        if isinstance(dept_results, list) and dept_results
+    ]
+    positions = [0] * len(dept_candidates)
+    heap = [(-dept_results[0]["score"], dept_order) for dept_order, dept_results in enumerate(dept_candidates)]
+    heapq.heapify(heap)
+
+    def push_next(dept_order):
+        positions[dept_order] += 1
+        dept_results = dept_candidates[dept_order]
+        if positions[dept_order] < len(dept_results):
+            heapq.heappush(heap, (-dept_results[positions[dept_order]]["score"], dept_order))
+
+    def pop_best():
+        # 이전 라운드에서 선택된 과목 ID 는 건너뜀 (다른 학과에 중복 등록된 과목)
+        while heap:
+            _, dept_order = heapq.heappop(heap)
+            candidate = dept_candidates[dept_order][positions[dept_order]]
+            if candidate.get("class_id") in visited_ids:
+                push_next(dept_order)
+                continue
+            return dept_order, candidate
+        return None, None
+
+    while len(already_selected_classes) < max_total_courses:
+        # 다양한 학과에서 최대 2개 선택 (첫 학과는 힙에서 빠져 있으므로 두 번째는 자동으로 다른 학과)
+        first_dept, first = pop_best()
+        if first is None:
+            logger.info("더 이상 후보 과목이 없음. 검색 종료.")
+            break
 
-        if dept_name not in seen_departments:
-            selected_candidates.append(candidate)
-            seen_departments.add(dept_name)
+        selected_candidates = [first]
+        second_dept, second = pop_best()
+        if second is not None:
+            selected_candidates.append(second)
 
-        if len(selected_candidates) >= 2:
-            break
+        push_next(first_dept)
+        if second is not None:
+            push_next(second_dept)
 
-    # Add selected candidates
-    for candidate in selected_candidates:
-        candidate_id = candidate.get("class_id")
-        dept_name = candidate["department_name"]
+        # Add selected candidates
+        for candidate in selected_candidates:
+            already_selected_classes.append(candidate)
 
-        if candidate_id in visited_ids:
-            logger.info(f"Candidate {candidate_id} already selected. Skipping.")
-            continue
+            logger.info(f"✅ 선택: {candidate.get('class_id')} ({candidate['department_name']}) - "
+                       f"전체 {len(already_selected_classes)}/{max_total_courses}과목 | "
+                       f"점수: {candidate.get('score', 0):.3f}")
 
-        already_selected_classes.append(candidate)
+        visited_ids.update(candidate.get("class_id") for candidate in selected_candidates)
+        graph_builder.add_courses(selected_candidates)
+    else:
+        logger.info(f"✅ 전체 과목 수 {len(already_selected_classes)}개 달성. 검색 종료.")
 
-        logger.info(f"✅ 선택: {candidate_id} ({dept_name}) - "
-                   f"전체 {len(already_selected_classes)}/{max_total_courses}과목 | "
-                   f"점수: {candidate.get('score', 0):.3f}")
+    graph_visited_ids.update(graph_builder.visited_nodes_total)
+    logger.info(f"최종 선택된 과목 수: {len(already_selected_classes)}")
+    return graph_builder.department_graphs
 
-    # Update graph
-    G, new_visited = build_prereq_postreq(already_selected_classes, db_handler,
-                                          logger=logger, existing_visited_ids=graph_visited_ids)
-    graph_visited_ids.update(new_visited)
 
-    # Recursive call
-    return recursive_top1_selection(
+def recursive_top1_selection(client, db_handler, query, selected_dept_list,
+                            class_retriever, graph_path, gt_department,
+                            already_selected_classes=None, graph_visited_ids=None,
+                            max_total_courses=28, depth=0):
+    """기존 호출부 호환용 - iterative_top1_selection 과 같은 결과"""
+    return iterative_top1_selection(
         client, db_handler, query, selected_dept_list,
         class_retriever, graph_path, gt_department,
         already_selected_classes, graph_visited_ids,
-        max_total_courses, depth + 1
-    )
\ No newline at end of file
+        max_total_courses
+    )
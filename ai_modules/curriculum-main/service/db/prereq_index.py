@@ -0,0 +1,213 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import defaultdict, deque
+from typing import Dict, List, NamedTuple, Set, Optional
+
+from util.dbClient import DbClient
+
+logger = logging.getLogger(__name__)
+
+# 전체 과목 + 학과 + 단과대 (서버 시작/주기적 갱신 때 한 번만 조회)
+ALL_CLASSES_QUERY = """
+SELECT
+    c.id AS class_id,
+    c.name AS class_name,
+    c.student_grade,
+    c.semester,
+    c.description,
+    c.language,
+    c.prerequisite AS prerequisite,
+    c.department_id,
+    jd.name AS department_name,
+    jco.name AS college_name
+FROM jbnu_class c
+JOIN jbnu_department jd ON c.department_id = jd.id
+JOIN jbnu_college jco ON jd.college_id = jco.id
+"""
+
+
+def _grade_id_key(row):
+    # ORDER BY student_grade, id 와 같은 순서 (NULL 은 MySQL 처럼 앞으로)
+    grade = row.get("student_grade")
+    return (grade is not None, grade if grade is not None else 0, row.get("class_id"))
+
+
+class IndexSnapshot(NamedTuple):
+    """한 번 로드한 인덱스 전체 - 만든 뒤에는 바꾸지 않고 통째로 교체"""
+    classes: Dict[int, Dict]
+    prerequisites: Dict[int, List[int]]
+    postrequisites: Dict[int, List[int]]
+    postreq_by_name: Dict[tuple, List[int]]
+    version: str
+
+
+class PrerequisiteIndex:
+    """선수과목 인메모리 인덱스 - DbClient.fetch_prerequisites 대체
+
+    jbnu_class/jbnu_department/jbnu_college 를 한 번에 읽어서
+    prerequisite 문자열을 과목 ID 기준 인접 리스트(선수 → 후수 역방향 포함)로 만든다.
+    인덱스가 없으면 (DB 장애 등) 기존 DB 조회로 폴백한다.
+    """
+
+    def __init__(self, db_client: Optional[DbClient] = None, refresh_interval: Optional[int] = None):
+        self.db_client = db_client
+        self.refresh_interval = refresh_interval if refresh_interval is not None else int(
+            os.getenv("PREREQ_INDEX_REFRESH_SEC", "3600")
+        )
+        # 조회는 시작할 때 스냅샷 참조를 한 번만 읽음 → 갱신 중에도 한 조회 안에서는 같은 인덱스만 봄
+        self._snapshot: Optional[IndexSnapshot] = None
+        # 폴백 DB 조회는 요청 스레드들이 같은 커넥션을 쓰므로 직렬화
+        self._db_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._refresh_thread = None
+
+    def load(self, db_client: Optional[DbClient] = None) -> bool:
+        """DB 에서 전체 과목을 읽어 인덱스를 새로 만든 뒤 한 번에 교체"""
+        client = db_client or self.db_client
+        if client is None:
+            return False
+
+        if client is self.db_client:
+            # 요청 처리용 공유 커넥션이면 폴백 조회와 겹치지 않게 (pymysql 커넥션은 스레드 안전하지 않음)
+            with self._db_lock:
+                rows = self._query_all(client)
+        else:
+            rows = self._query_all(client)
+        if not rows:
+            logger.warning("⚠️ 선수과목 인덱스 로드 실패 - DB 조회 폴백 사용")
+            return False
+
+        classes = {row["class_id"]: row for row in rows}
+
+        # (학과 ID, 과목명) → 과목 ID 목록 (FIND_IN_SET(TRIM(name), REPLACE(prerequisite, ' ', '')) 규칙)
+        by_dept_name = defaultdict(list)
+        for row in rows:
+            by_dept_name[(row["department_id"], (row["class_name"] or "").strip())].append(row["class_id"])
+
+        prerequisites = {}
+        postrequisites = defaultdict(list)
+        postreq_by_name = defaultdict(list)
+        for row in rows:
+            prerequisite = row.get("prerequisite")
+            if not prerequisite:
+                continue
+
+            tokens = {token for token in prerequisite.replace(" ", "").split(",") if token}
+            prereq_ids = set()
+            for token in tokens:
+                prereq_ids.update(by_dept_name.get((row["department_id"], token), ()))
+            prereq_ids.discard(row["class_id"])
+
+            ordered = sorted(prereq_ids, key=lambda class_id: _grade_id_key(classes[class_id]))
+            prerequisites[row["class_id"]] = ordered
+            for prereq_id in ordered:
+                postrequisites[prereq_id].append(row["class_id"])
+
+            # fetch_postrequisites(학과명, 과목명) 용: 쉼표 주변 공백만 무시
+            for token in {token.strip() for token in prerequisite.split(",") if token.strip()}:
+                postreq_by_name[(row["department_name"], token)].append(row["class_id"])
+
+        for key in postrequisites:
+            postrequisites[key].sort(key=lambda class_id: _grade_id_key(classes[class_id]))
+        for key in postreq_by_name:
+            postreq_by_name[key].sort(key=lambda class_id: _grade_id_key(classes[class_id]))
+
+        version = hashlib.sha1(
+            repr(sorted((class_id, row.get("prerequisite") or "") for class_id, row in classes.items())).encode("utf-8")
+        ).hexdigest()[:12]
+        # 대입 한 번으로 교체 - 조회 중인 요청은 자기가 읽은 이전 스냅샷을 끝까지 사용
+        self._snapshot = IndexSnapshot(classes, prerequisites, dict(postrequisites), dict(postreq_by_name), version)
+
+        logger.info(f"✅ 선수과목 인덱스 로드: 과목 {len(classes)}개, 선수관계 {sum(len(v) for v in prerequisites.values())}개")
+        return True
+
+    @staticmethod
+    def _query_all(client: DbClient):
+        if not client.connection:
+            client.connect()
+        return client.execute_query(ALL_CLASSES_QUERY) if client.connection else None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._snapshot is not None
+
+    @property
+    def version(self) -> str:
+        """인덱스 내용 지문 (로드 전에는 DB 직접 조회이므로 "db")"""
+        snapshot = self._snapshot
+        return snapshot.version if snapshot else "db"
+
+    @staticmethod
+    def _row(snapshot: IndexSnapshot, class_id: int) -> Dict:
+        row = dict(snapshot.classes[class_id])
+        row.pop("department_id", None)
+        return row
+
+    def fetch_prerequisites(self, class_id) -> List[Dict]:
+        """과목의 직접 선수과목 (DbClient.fetch_prerequisites 와 같은 행 형식/순서)"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            if self.db_client is None:
+                return []
+            with self._db_lock:
+                return self.db_client.fetch_prerequisites(class_id)
+        return [self._row(snapshot, prereq_id) for prereq_id in snapshot.prerequisites.get(class_id, [])]
+
+    def fetch_postrequisites(self, department_name, class_name) -> List[Dict]:
+        """학과 내에서 해당 과목을 선수과목으로 갖는 과목 목록"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            if self.db_client is None:
+                return []
+            with self._db_lock:
+                return self.db_client.fetch_postrequisites(department_name, class_name)
+        return [
+            dict(snapshot.classes[class_id])
+            for class_id in snapshot.postreq_by_name.get((department_name, class_name), [])
+        ]
+
+    def prerequisite_closure(self, class_id) -> Set[int]:
+        """선수과목 전이 폐포 (해당 과목 제외)"""
+        snapshot = self._snapshot
+        return self._closure(snapshot.prerequisites if snapshot else {}, class_id)
+
+    def postrequisite_closure(self, class_id) -> Set[int]:
+        """후수과목 전이 폐포 (해당 과목 제외)"""
+        snapshot = self._snapshot
+        return self._closure(snapshot.postrequisites if snapshot else {}, class_id)
+
+    @staticmethod
+    def _closure(edges: Dict[int, List[int]], class_id) -> Set[int]:
+        closure = set()
+        queue = deque(edges.get(class_id, []))
+        while queue:
+            next_id = queue.popleft()
+            if next_id in closure:
+                continue
+            closure.add(next_id)
+            queue.extend(edges.get(next_id, []))
+        closure.discard(class_id)
+        return closure
+
+    def start_refresh(self):
+        """주기적 갱신 스레드 시작 (요청 처리용 커넥션과 겹치지 않도록 별도 DbClient 사용)"""
+        if self.refresh_interval <= 0 or self._refresh_thread is not None:
+            return
+
+        def _refresh_loop():
+            while not self._stop_event.wait(self.refresh_interval):
+                refresh_client = DbClient()
+                try:
+                    self.load(refresh_client)
+                except Exception as e:
+                    logger.error(f"선수과목 인덱스 갱신 실패: {e}")
+                finally:
+                    refresh_client.close()
+
+        self._refresh_thread = threading.Thread(target=_refresh_loop, name="prereq-index-refresh", daemon=True)
+        self._refresh_thread.start()
+
+    def stop_refresh(self):
+        self._stop_event.set()
@@ -0,0 +1,361 @@
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from html import escape
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+import networkx as nx
+
+logger = logging.getLogger(__name__)
+
+GRAPH_PNG_DPI = int(os.getenv("GRAPH_PNG_DPI", "300"))
+GRAPH_RENDER_WORKERS = int(os.getenv("GRAPH_RENDER_WORKERS", "2"))
+GRAPH_RENDER_CACHE_SIZE = int(os.getenv("GRAPH_RENDER_CACHE_SIZE", "64"))
+# 워커 시작 방식 - 이미 스레드(결과물 정리, 선수과목 갱신, 감사 로그)가 도는 프로세스를 fork 하면
+# 다른 스레드가 잡고 있던 락(로깅 핸들러, DB 클라이언트)이 자식에서 풀리지 않아 멈출 수 있음
+GRAPH_RENDER_START_METHOD = os.getenv("GRAPH_RENDER_START_METHOD", "forkserver")
+
+RENDER_FORMATS = ("png", "svg", "json")
+MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml", "json": "application/json"}
+
+BASE_SEMESTER_ORDER = ["1-1", "1-2", "2-1", "2-2", "3-1", "3-2", "4-1", "4-2", "5-1", "5-2"]
+
+# 모던한 파스텔 컬러 팔레트
+MODERN_COLORS = [
+    '#FF6B6B',  # 산호색 빨강
+    '#4ECDC4',  # 청록색
+    '#45B7D1',  # 하늘색
+    '#FFA07A',  # 연한 주황
+    '#98D8C8',  # 민트
+    '#F7DC6F',  # 노란색
+    '#BB8FCE',  # 보라색
+    '#85C1E2',  # 파랑
+]
+
+
+def build_render_payload(department_graphs: Dict[str, nx.DiGraph],
+                         cross_edges: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """학과별 그래프 (+ 학과 간 엣지) → 렌더링용 순수 데이터 (프로세스 풀로 넘길 수 있고 해시 가능)"""
+    nodes = OrderedDict()
+    edges = []
+    departments = []
+
+    for department, G in department_graphs.items():
+        for node, node_data in G.nodes(data=True):
+            node_department = node_data.get("department", "Unknown Department")
+            if node_department not in departments:
+                departments.append(node_department)
+            if node not in nodes:
+                nodes[node] = {
+                    "id": node,
+                    "class_name": node_data.get("class_name", "Unknown"),
+                    "student_grade": node_data.get("student_grade", "Unknown"),
+                    "semester": node_data.get("semester", "Unknown"),
+                    "department": node_department
+                }
+        for source, target in G.edges():
+            edges.append([source, target])
+
+    # 학과 간 관계 엣지 (양 끝 과목이 그래프에 있는 것만)
+    for edge in cross_edges or []:
+        if edge["from"] in nodes and edge["to"] in nodes:
+            edges.append([edge["from"], edge["to"]])
+
+    return {"nodes": list(nodes.values()), "edges": edges, "departments": departments}
+
+
+def graph_hash(payload: Dict[str, Any]) -> str:
+    """그래프 내용 해시 (같은 그래프 → 같은 ID)"""
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _combined_graph(payload: Dict[str, Any]) -> nx.DiGraph:
+    combined_graph = nx.DiGraph()
+    for node in payload["nodes"]:
+        combined_graph.add_node(node["id"], class_name=node["class_name"],
+                                student_grade=node["student_grade"], semester=node["semester"])
+    for source, target in payload["edges"]:
+        combined_graph.add_edge(source, target)
+    return combined_graph
+
+
+def compute_layout(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """클라이언트 그리기용 JSON 레이아웃 (노드 좌표/색상, 엣지, 학기 라벨)"""
+    from service.aov import assign_positions
+
+    combined_graph = _combined_graph(payload)
+    pos, semester_labels = assign_positions(combined_graph)
+    department_colors = {dept: MODERN_COLORS[i % len(MODERN_COLORS)] for i, dept in enumerate(payload["departments"])}
+
+    return {
+        "nodes": [
+            {
+                **node,
+                "x": pos[node["id"]][0],
+                "y": pos[node["id"]][1],
+                "color": department_colors.get(node["department"], "gray")
+            }
+            for node in payload["nodes"] if node["id"] in pos
+        ],
+        "edges": [{"from": source, "to": target} for source, target in combined_graph.edges()],
+        "semester_labels": [{"label": label, "x": x, "y": y} for label, (x, y) in semester_labels.items()],
+        "departments": [{"name": dept, "color": color} for dept, color in department_colors.items()]
+    }
+
+
+def render_svg(layout: Dict[str, Any]) -> str:
+    """matplotlib 없이 레이아웃에서 바로 만드는 가벼운 SVG"""
+    scale_x, scale_y, radius, margin = 220, 70, 48, 120
+    nodes = layout["nodes"]
+    if not nodes:
+        return '<svg xmlns="http://www.w3.org/2000/svg" width="200" height="100"></svg>'
+
+    xs = [n["x"] for n in nodes] + [l["x"] for l in layout["semester_labels"]]
+    ys = [n["y"] for n in nodes] + [l["y"] for l in layout["semester_labels"]]
+    min_x, max_x, min_y, max_y = min(xs), max(xs), min(ys), max(ys)
+    width = (max_x - min_x) * scale_x + margin * 2
+    height = (max_y - min_y) * scale_y + margin * 2
+
+    def to_px(x, y):
+        # y 축은 matplotlib 과 같게 위쪽이 큰 값
+        return (x - min_x) * scale_x + margin, (max_y - y) * scale_y + margin
+
+    node_px = {n["id"]: to_px(n["x"], n["y"]) for n in nodes}
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" height="{height:.0f}" '
+        f'viewBox="0 0 {width:.0f} {height:.0f}" font-family="NanumGothic, sans-serif">',
+        '<defs><marker id="arrow" viewBox="0 0 10 10" refX="10" refY="5" markerWidth="8" markerHeight="8" '
+        'orient="auto-start-reverse"><path d="M 0 0 L 10 5 L 0 10 z" fill="#90A4AE"/></marker></defs>',
+        f'<rect width="100%" height="100%" fill="#F8F9FA"/>'
+    ]
+
+    for edge in layout["edges"]:
+        if edge["from"] not in node_px or edge["to"] not in node_px:
+            continue
+        (x1, y1), (x2, y2) = node_px[edge["from"]], node_px[edge["to"]]
+        length = max(((x2 - x1) ** 2 + (y2 - y1) ** 2) ** 0.5, 1e-6)
+        # 원 테두리에서 시작/끝나도록 반지름만큼 당김
+        dx, dy = (x2 - x1) / length * radius, (y2 - y1) / length * radius
+        parts.append(f'<line x1="{x1 + dx:.1f}" y1="{y1 + dy:.1f}" x2="{x2 - dx:.1f}" y2="{y2 - dy:.1f}" '
+                     f'stroke="#90A4AE" stroke-width="2.5" stroke-opacity="0.6" marker-end="url(#arrow)"/>')
+
+    for node in nodes:
+        x, y = node_px[node["id"]]
+        parts.append(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="{radius}" fill="{node["color"]}" '
+                     f'stroke="white" stroke-width="5" fill-opacity="0.95"/>')
+        parts.append(f'<text x="{x:.1f}" y="{y:.1f}" font-size="13" font-weight="bold" fill="#1A1A1A" '
+                     f'text-anchor="middle" dominant-baseline="middle">{escape(str(node["class_name"]))}</text>')
+
+    for label in layout["semester_labels"]:
+        x, y = to_px(label["x"], label["y"])
+        parts.append(f'<text x="{x:.1f}" y="{y:.1f}" font-size="16" font-weight="bold" fill="#212121" '
+                     f'text-anchor="middle" dominant-baseline="hanging">{escape(label["label"])}</text>')
+
+    for i, dept in enumerate(layout["departments"]):
+        y = 24 + i * 22
+        parts.append(f'<rect x="{width - 220:.0f}" y="{y - 12}" width="14" height="14" fill="{dept["color"]}" stroke="black"/>')
+        parts.append(f'<text x="{width - 198:.0f}" y="{y}" font-size="14">{escape(dept["name"])}</text>')
+
+    parts.append('</svg>')
+    return "".join(parts)
+
+
+def render_png(payload: Dict[str, Any], dpi: int = GRAPH_PNG_DPI) -> bytes:
+    """matplotlib PNG 렌더링 (프로세스 풀 워커에서 실행)"""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from service.aov import assign_positions, FONT_PATH, fm
+
+    font_name = None
+    if FONT_PATH.exists():
+        font_prop = fm.FontProperties(fname=str(FONT_PATH))
+        font_name = font_prop.get_name()
+        plt.rcParams["font.family"] = font_name
+        plt.rcParams["axes.unicode_minus"] = False
+
+    combined_graph = _combined_graph(payload)
+    node_department_map = {node["id"]: node["department"] for node in payload["nodes"]}
+    unique_departments = payload["departments"]
+    department_colors = {dept: MODERN_COLORS[i % len(MODERN_COLORS)] for i, dept in enumerate(unique_departments)}
+
+    pos, semester_labels = assign_positions(combined_graph)
+
+    # 🔥 그래프 크기를 더 크게, 여백 추가
+    plt.figure(figsize=(24, 16), facecolor='white')
+    ax = plt.gca()
+    ax.set_facecolor('#F8F9FA')
+
+    # 🔥 여백 설정 (노드가 잘리지 않도록)
+    ax.margins(0.15)
+
+    # 1) 엣지 먼저 그리기 (직선으로)
+    nx.draw_networkx_edges(
+        combined_graph, pos,
+        edgelist=combined_graph.edges(),
+        arrowstyle='-|>',
+        arrowsize=25,
+        width=2.5,
+        edge_color='#90A4AE',
+        alpha=0.6,
+        connectionstyle='arc3,rad=0'  # 🔥 직선
+    )
+
+    # 2) 노드 그리기 (그림자 효과)
+    nx.draw_networkx_nodes(
+        combined_graph, pos,
+        node_shape='o',
+        node_size=5000,
+        node_color=[department_colors.get(node_department_map.get(n), "gray") for n in combined_graph.nodes()],
+        edgecolors='white',
+        linewidths=5,
+        alpha=0.95
+    )
+
+    # 3) 과목명: 노드 중앙에 (더 읽기 쉽게)
+    name_labels = {n: combined_graph.nodes[n].get('class_name', 'Unknown') for n in combined_graph.nodes()}
+    nx.draw_networkx_labels(
+        combined_graph, pos,
+        labels=name_labels,
+        font_size=13,
+        font_weight='bold',
+        font_family=font_name,
+        font_color='#1A1A1A',
+        verticalalignment='center',
+        horizontalalignment='center'
+    )
+
+    # 범례
+    legend_patches = [
+        plt.Line2D([0], [0], marker='s', color='w',
+                markerfacecolor=department_colors[d],
+                markeredgecolor='black',
+                markersize=12, label=d)
+        for d in unique_departments
+    ]
+    plt.legend(handles=legend_patches, title="학과", loc="upper right",
+               fontsize=12, title_fontsize=14, frameon=True, fancybox=True, shadow=True)
+
+    # 제목: 학과 이름들 포함 (최대 2개 학과)
+    department_names = "_".join(unique_departments[:2])
+    max_y_global = max([p[1] for p in pos.values()]) if pos else 0
+    plt.text(len(BASE_SEMESTER_ORDER) / 2 - 0.5, max_y_global + 3,
+             f"{department_names} 커리큘럼 추천 그래프",
+             fontsize=28, fontweight='heavy', ha='center', va='bottom',
+             fontfamily=font_name, color='black')
+
+    # 학기 라벨 추가 (노드들 아래)
+    for label_text, label_pos in semester_labels.items():
+        plt.text(label_pos[0], label_pos[1], label_text,
+                fontsize=16, fontweight='bold', ha='center', va='top',
+                fontfamily=font_name, color='#212121')
+
+    plt.axis('off')
+
+    # 한 번만 렌더링해서 bytes 로 반환 (파일 저장/base64 는 호출부에서)
+    buffer = io.BytesIO()
+    plt.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight', pad_inches=0.3, facecolor='white')
+    plt.close()
+    return buffer.getvalue()
+
+
+def _render(payload: Dict[str, Any], fmt: str, dpi: int) -> Union[bytes, str, Dict[str, Any]]:
+    # 프로세스 풀 워커 진입점 - forkserver/spawn 워커가 이름으로 불러오므로 모듈 최상위에 둔다
+    if fmt == "png":
+        return render_png(payload, dpi)
+    layout = compute_layout(payload)
+    if fmt == "svg":
+        return render_svg(layout)
+    return layout
+
+
+class GraphRenderer:
+    """그래프 렌더러 - 그래프 내용 해시로 결과를 캐시하고 PNG 는 프로세스 풀에서 렌더링"""
+
+    def __init__(self, max_workers: int = GRAPH_RENDER_WORKERS, cache_size: int = GRAPH_RENDER_CACHE_SIZE):
+        self.max_workers = max_workers
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.max_workers <= 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context(GRAPH_RENDER_START_METHOD)
+                )
+            return self._executor
+
+    def _cache_get(self, key):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        return None
+
+    def _cache_put(self, key, content):
+        with self._lock:
+            self._cache[key] = content
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _prepare(self, department_graphs, fmt: str, dpi: Optional[int], cross_edges=None):
+        if fmt not in RENDER_FORMATS:
+            raise ValueError(f"지원하지 않는 그래프 형식: {fmt}")
+        dpi = dpi or GRAPH_PNG_DPI
+        payload = build_render_payload(department_graphs, cross_edges)
+        graph_id = graph_hash(payload)
+        key = (graph_id, fmt, dpi if fmt == "png" else None)
+        return payload, graph_id, key, dpi
+
+    def render(self, department_graphs, fmt: str = "png", dpi: Optional[int] = None,
+               cross_edges=None) -> Tuple[str, Any]:
+        """(그래프 해시, 렌더링 결과) 반환 - png: bytes, svg: str, json: dict"""
+        payload, graph_id, key, dpi = self._prepare(department_graphs, fmt, dpi, cross_edges)
+
+        content = self._cache_get(key)
+        if content is not None:
+            logger.info(f"✅ 그래프 렌더링 캐시 적중: {graph_id[:12]} ({fmt})")
+            return graph_id, content
+
+        executor = self._get_executor() if fmt == "png" else None
+        try:
+            content = executor.submit(_render, payload, fmt, dpi).result() if executor else _render(payload, fmt, dpi)
+        except BrokenProcessPool:
+            logger.warning("⚠️ 렌더링 프로세스 풀 오류 - 현재 프로세스에서 렌더링")
+            with self._lock:
+                self._executor = None
+            content = _render(payload, fmt, dpi)
+
+        self._cache_put(key, content)
+        return graph_id, content
+
+    async def render_async(self, department_graphs, fmt: str = "png", dpi: Optional[int] = None,
+                           cross_edges=None) -> Tuple[str, Any]:
+        """이벤트 루프를 막지 않는 렌더링 (PNG 는 프로세스 풀, 나머지는 스레드)"""
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.render, department_graphs, fmt, dpi, cross_edges
+        )
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+
+graph_renderer = GraphRenderer()
@@ -1,24 +1,39 @@
 import os
 import json
+import asyncio
 import logging
+from functools import lru_cache
+import numpy as np
 import networkx as nx
-from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Literal, Tuple
+from pydantic import BaseModel, Field
 from langchain_openai import ChatOpenAI
 from langchain.schema import SystemMessage, HumanMessage
 
+from service.relation_cache import relation_cache
+from service.audit_log import audit_sink
+from util.tracing import start_span
+
 logger = logging.getLogger(__name__)
 
-# 디렉토리 설정
+# 디렉토리 설정 (LLM 입출력 기록은 audit_sink 의 회전 JSONL 로 이동)
 BASE_DIR = Path(__file__).resolve().parent
 RESULT_DIR = BASE_DIR / "result"
-QUERY_DIR = RESULT_DIR / "query_datetime"
-SELECT_DIR = RESULT_DIR / "selected_by_llm"
 
-# 디렉토리 생성
-QUERY_DIR.mkdir(parents=True, exist_ok=True)
-SELECT_DIR.mkdir(parents=True, exist_ok=True)
+# 학과 간 과목 관계 분석 설정
+RELATION_SIM_THRESHOLD = float(os.getenv("COURSE_RELATION_SIM_THRESHOLD", "0.3"))  # 임베딩 유사도 하한
+RELATION_BATCH_SIZE = int(os.getenv("COURSE_RELATION_BATCH_SIZE", "20"))            # LLM 호출 1회당 쌍 수
+RELATION_MAX_CONCURRENCY = int(os.getenv("COURSE_RELATION_MAX_CONCURRENCY", "4"))   # 동시 LLM 호출 수
+
+
+class CourseRelationVerdict(BaseModel):
+    pair_id: int = Field(description="과목 쌍 번호")
+    relation: Literal["Prerequisite", "Complementary", "Unrelated"] = Field(description="과목1 → 과목2 관계")
+
+
+class CourseRelationBatch(BaseModel):
+    verdicts: List[CourseRelationVerdict]
 
 
 def load_txt(file_path: str) -> str:
@@ -27,8 +42,9 @@ def load_txt(file_path: str) -> str:
         return f.read()
 
 
+@lru_cache(maxsize=None)
 def get_llm_client(model: str = "gpt-4o-mini", temperature: float = 0.1, max_tokens: int = None) -> ChatOpenAI:
-    """LangChain LLM 클라이언트 생성"""
+    """LangChain LLM 클라이언트 생성 (같은 설정이면 재사용 - 커넥션 풀 공유)"""
     kwargs = {
         "model": model,
         "temperature": temperature,
@@ -39,37 +55,41 @@ def get_llm_client(model: str = "gpt-4o-mini", temperature: float = 0.1, max_tok
     return ChatOpenAI(**kwargs)
 
 
-def query_expansion(client, query: str, load_path: str) -> str:
-    """쿼리 확장"""
+def _query_expansion_messages(query: str, load_path: str) -> list:
     prompt_template = load_txt(load_path)
     formatted_prompt = prompt_template.replace("{input_query}", query)
 
-    llm = get_llm_client("gpt-4o-mini")
-
-    messages = [
+    return [
         SystemMessage(content="당신은 교육 전문가입니다. 사용자의 쿼리를 확장하여 더 나은 검색 결과를 제공하세요."),
         HumanMessage(content=formatted_prompt)
     ]
 
-    response = llm.invoke(messages)
-    response_text = response.content
 
-    # 결과 저장
-    timestamp = datetime.now().strftime("%Y-%m-%d %H-%M-%S")
-    save_path = QUERY_DIR / f"{timestamp}.json"
-    with open(save_path, "w", encoding="utf-8") as f:
-        json.dump({"query": query, "response": response_text}, f, ensure_ascii=False, indent=2)
+def query_expansion(client, query: str, load_path: str) -> str:
+    """쿼리 확장"""
+    llm = get_llm_client("gpt-4o-mini")
+
+    with start_span("llm.query_expansion", kind="client", model=llm.model_name):
+        response = llm.invoke(_query_expansion_messages(query, load_path))
+    response_text = response.content
 
+    audit_sink.record("query_expansion", query=query, response=response_text)
     return response_text
 
 
-def llm_select_departments(query: str, candidate_depts: List[Dict], target_count: int) -> List[Dict]:
-    """LLM을 사용한 학과 선택"""
-    if len(candidate_depts) <= target_count:
-        return candidate_depts
+async def query_expansion_async(query: str, load_path: str) -> str:
+    """쿼리 확장 (비동기)"""
+    llm = get_llm_client("gpt-4o-mini")
 
-    llm = get_llm_client()
+    with start_span("llm.query_expansion", kind="client", model=llm.model_name):
+        response = await llm.ainvoke(_query_expansion_messages(query, load_path))
+    response_text = response.content
+
+    audit_sink.record("query_expansion", query=query, response=response_text)
+    return response_text
 
+
+def _select_departments_messages(query: str, candidate_depts: List[Dict], target_count: int) -> list:
     dept_info = "\n".join([
         f"{i+1}. {dept['department_name']} (점수: {dept['score']:.3f})"
         for i, dept in enumerate(candidate_depts)
@@ -93,25 +113,57 @@ def llm_select_departments(query: str, candidate_depts: List[Dict], target_count
 위 후보 중에서 쿼리와 가장 관련성이 높은 {target_count}개 학과를 선택해주세요.
 """
 
+    return [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=user_prompt)
+    ]
+
+
+def _parse_selected_departments(response_text: str, candidate_depts: List[Dict], target_count: int) -> List[Dict]:
+    result = json.loads(response_text)
+    selected_names = result.get("selected_departments", [])
+
+    # 선택된 학과 정보 반환
+    selected_depts = []
+    for name in selected_names:
+        for dept in candidate_depts:
+            if dept["department_name"] == name:
+                selected_depts.append(dept)
+                break
+
+    return selected_depts[:target_count]
+
+
+def llm_select_departments(query: str, candidate_depts: List[Dict], target_count: int) -> List[Dict]:
+    """LLM을 사용한 학과 선택"""
+    if len(candidate_depts) <= target_count:
+        return candidate_depts
+
+    llm = get_llm_client()
+
     try:
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=user_prompt)
-        ]
+        with start_span("llm.select_departments", kind="client", model=llm.model_name,
+                        candidates=len(candidate_depts)):
+            response = llm.invoke(_select_departments_messages(query, candidate_depts, target_count))
+        return _parse_selected_departments(response.content, candidate_depts, target_count)
+
+    except Exception as e:
+        logger.warning(f"LLM 학과 선택 실패, 상위 점수 기준으로 선택: {e}")
+        return candidate_depts[:target_count]
 
-        response = llm.invoke(messages)
-        result = json.loads(response.content)
-        selected_names = result.get("selected_departments", [])
 
-        # 선택된 학과 정보 반환
-        selected_depts = []
-        for name in selected_names:
-            for dept in candidate_depts:
-                if dept["department_name"] == name:
-                    selected_depts.append(dept)
-                    break
+async def llm_select_departments_async(query: str, candidate_depts: List[Dict], target_count: int) -> List[Dict]:
+    """LLM을 사용한 학과 선택 (비동기)"""
+    if len(candidate_depts) <= target_count:
+        return candidate_depts
 
-        return selected_depts[:target_count]
+    llm = get_llm_client()
+
+    try:
+        with start_span("llm.select_departments", kind="client", model=llm.model_name,
+                        candidates=len(candidate_depts)):
+            response = await llm.ainvoke(_select_departments_messages(query, candidate_depts, target_count))
+        return _parse_selected_departments(response.content, candidate_depts, target_count)
 
     except Exception as e:
         logger.warning(f"LLM 학과 선택 실패, 상위 점수 기준으로 선택: {e}")
@@ -187,8 +239,7 @@ def get_course_relationship(course1: Dict, course2: Dict, query: str = None) ->
         return "Unrelated"
 
 
-def analyze_course_relationships(query: str, department_graphs: Dict) -> Dict:
-    """학과 간 과목 관계 분석"""
+def _merge_department_graphs(department_graphs: Dict) -> nx.DiGraph:
     merged_graph = nx.DiGraph()
 
     # 모든 학과 그래프 병합
@@ -197,11 +248,14 @@ def analyze_course_relationships(query: str, department_graphs: Dict) -> Dict:
             merged_graph.add_node(node, **data)
         for source, target in graph.edges():
             merged_graph.add_edge(source, target)
+    return merged_graph
 
+
+def _candidate_course_pairs(merged_graph: nx.DiGraph) -> List[Tuple[Any, Any]]:
+    """서로 다른 학과 + 연속 학기인 (선행, 후행) 과목 쌍"""
     all_courses = list(merged_graph.nodes(data=True))
-    new_edges = []
+    pairs = []
 
-    # 서로 다른 학과의 과목들만 비교
     for i in range(len(all_courses)):
         for j in range(i + 1, len(all_courses)):
             course1_id, course1_data = all_courses[i]
@@ -222,15 +276,135 @@ def analyze_course_relationships(query: str, department_graphs: Dict) -> Dict:
             if not is_consecutive_semester(course1_data, course2_data):
                 continue
 
-            # 관계 분석
-            relation = get_course_relationship(course1_data, course2_data, query)
+            pairs.append((course1_id, course2_id))
+    return pairs
+
+
+def _prefilter_pairs_by_embedding(pairs: List[Tuple[Any, Any]], class_retriever,
+                                  threshold: float = RELATION_SIM_THRESHOLD) -> List[Tuple[Any, Any]]:
+    """과목 설명 임베딩 코사인 유사도가 임계값 미만인 쌍은 LLM 에 보내지 않음"""
+    if class_retriever is None or not getattr(class_retriever, "is_loaded", False) or not pairs:
+        return pairs
+
+    # 과목 ID → 임베딩 행 (정규화된 임베딩이므로 내적 = 코사인 유사도)
+    rows = {}
+    for pair in pairs:
+        for class_id in pair:
+            if class_id not in rows and class_retriever.class_id_rows.get(class_id):
+                rows[class_id] = class_retriever.class_id_rows[class_id][0]
 
-            if relation in ["Prerequisite", "Complementary"]:
-                new_edges.append({"from": course1_id, "to": course2_id})
-                merged_graph.add_edge(course1_id, course2_id)
+    # 임베딩이 없는 과목이 낀 쌍은 판단 근거가 없으므로 그대로 LLM 에 보냄
+    embedded = [pair for pair in pairs if pair[0] in rows and pair[1] in rows]
+    kept = [pair for pair in pairs if pair[0] not in rows or pair[1] not in rows]
+    if embedded:
+        emb_a = class_retriever.embeddings[[rows[a] for a, _ in embedded]]
+        emb_b = class_retriever.embeddings[[rows[b] for _, b in embedded]]
+        similarities = np.einsum("ij,ij->i", emb_a, emb_b)
+        kept.extend(pair for pair, sim in zip(embedded, similarities) if sim >= threshold)
+
+    logger.info(f"과목 관계 후보 임베딩 필터: {len(pairs)}쌍 → {len(kept)}쌍")
+    return kept
+
+
+def _course_block(course: Dict) -> str:
+    return (
+        f"이름: {course.get('class_name', '')} | 학과: {course.get('department', '')} | "
+        f"{course.get('student_grade', '')}학년 {course.get('semester', '')}학기 | "
+        f"설명: {course.get('description', '')}"
+    )
+
+
+def _relation_batch_messages(batch: List[Tuple[Any, Any]], merged_graph: nx.DiGraph) -> list:
+    pair_info = "\n\n".join(
+        f"[{pair_id}]\n- 과목1: {_course_block(merged_graph.nodes[course1_id])}\n"
+        f"- 과목2: {_course_block(merged_graph.nodes[course2_id])}"
+        for pair_id, (course1_id, course2_id) in enumerate(batch)
+    )
+
+    prompt = f"""
+아래 대학 과목 쌍들의 관계를 각각 분석해주세요.
+
+{pair_info}
+
+각 쌍마다 다음 중 하나로 판정하세요:
+- "Prerequisite": 과목1이 과목2의 선수과목
+- "Complementary": 서로 보완적 관계
+- "Unrelated": 관련 없음
+
+모든 쌍 번호(pair_id)에 대해 빠짐없이 답변하세요.
+"""
+
+    return [
+        SystemMessage(content="당신은 교육과정 전문가입니다."),
+        HumanMessage(content=prompt)
+    ]
+
+
+async def _classify_relation_batch(batch: List[Tuple[Any, Any]], merged_graph: nx.DiGraph,
+                                   semaphore: asyncio.Semaphore) -> List[Tuple[Any, Any, str]]:
+    """과목 쌍 여러 개를 구조화 출력 LLM 호출 한 번으로 판정 (응답에서 빠진 쌍은 결과에서 제외)"""
+    llm = get_llm_client().with_structured_output(CourseRelationBatch)
+
+    async with semaphore:
+        try:
+            with start_span("llm.classify_relations", kind="client", pairs=len(batch)):
+                result = await llm.ainvoke(_relation_batch_messages(batch, merged_graph))
+        except Exception as e:
+            logger.error(f"과목 관계 배치 분석 실패 ({len(batch)}쌍): {e}")
+            return []
+
+    verdicts = []
+    for verdict in result.verdicts:
+        if 0 <= verdict.pair_id < len(batch):
+            course1_id, course2_id = batch[verdict.pair_id]
+            verdicts.append((course1_id, course2_id, verdict.relation))
+    return verdicts
+
+
+async def analyze_course_relationships_async(department_graphs: Dict, class_retriever=None) -> Dict:
+    """학과 간 과목 관계 분석 (비동기)
+
+    후보 쌍 → 임베딩 유사도 필터 → 캐시 조회 → 남은 쌍만 배치 LLM 호출 (동시 호출 수 제한).
+    과목 간 관계는 쿼리와 무관하게 판정하고 (선행 과목 ID, 후행 과목 ID) 로 영구 캐시한다.
+    반환: {"merged_graph": 학과 간 엣지를 더한 통합 그래프, "new_edges": [{"from", "to"}, ...]}
+    """
+    merged_graph = _merge_department_graphs(department_graphs)
+    pairs = _prefilter_pairs_by_embedding(_candidate_course_pairs(merged_graph), class_retriever)
+
+    relations = {}
+    uncached = []
+    for course1_id, course2_id in pairs:
+        relation = relation_cache.get(course1_id, course2_id)
+        if relation is None:
+            uncached.append((course1_id, course2_id))
+        else:
+            relations[(course1_id, course2_id)] = relation
+
+    if uncached:
+        semaphore = asyncio.Semaphore(RELATION_MAX_CONCURRENCY)
+        batches = [uncached[i:i + RELATION_BATCH_SIZE] for i in range(0, len(uncached), RELATION_BATCH_SIZE)]
+        results = await asyncio.gather(*[
+            _classify_relation_batch(batch, merged_graph, semaphore) for batch in batches
+        ])
+
+        # 실패/누락된 쌍은 캐시하지 않음 (다음 요청에서 다시 판정)
+        verdicts = [verdict for batch_verdicts in results for verdict in batch_verdicts]
+        relation_cache.update(verdicts)
+        await asyncio.get_running_loop().run_in_executor(None, relation_cache.save)
+        for course1_id, course2_id, relation in verdicts:
+            relations[(course1_id, course2_id)] = relation
+
+    new_edges = []
+    for course1_id, course2_id in pairs:
+        if relations.get((course1_id, course2_id)) in ["Prerequisite", "Complementary"]:
+            new_edges.append({"from": course1_id, "to": course2_id})
+            merged_graph.add_edge(course1_id, course2_id)
 
-    logger.info(f"새로운 학과 간 관계 {len(new_edges)}개 추가됨")
-    return {"merged_graph": merged_graph}
+    logger.info(
+        f"새로운 학과 간 관계 {len(new_edges)}개 추가됨 "
+        f"(후보 {len(pairs)}쌍, 캐시 적중 {len(pairs) - len(uncached)}쌍, LLM 판정 {len(uncached)}쌍)"
+    )
+    return {"merged_graph": merged_graph, "new_edges": new_edges}
 
 
 def is_consecutive_semester(course1: Dict, course2: Dict) -> bool:
@@ -276,11 +450,7 @@ JSON 형식으로 응답해주세요:
         response = llm.invoke(messages)
         response_text = response.content
 
-        # 결과 저장
-        timestamp = datetime.now().strftime("%Y-%m-%d %H-%M-%S")
-        save_path = SELECT_DIR / f"{timestamp}.json"
-        with open(save_path, "w", encoding="utf-8") as f:
-            json.dump({"query": query, "response": response_text}, f, ensure_ascii=False, indent=2)
+        audit_sink.record("select_courses", query=query, departments=departments, response=response_text)
 
         return response_text
 
@@ -290,7 +460,6 @@ JSON 형식으로 응답해주세요:
 
 
 # 하위 호환성을 위한 별칭
-selected_edge_by_llm = analyze_course_relationships
 selected_by_llm = select_courses_by_llm
 get_llm_prediction = get_course_relationship
 construct_prompt = lambda self, query, dept_names, items: f"Query: {query}, Departments: {dept_names}"
\ No newline at end of file
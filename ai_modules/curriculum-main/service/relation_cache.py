@@ -0,0 +1,80 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RELATION_CACHE_PATH = os.getenv(
+    "COURSE_RELATION_CACHE_PATH", str(Path(__file__).resolve().parent.parent / "result" / "course_relation_cache.json")
+)
+
+
+class RelationCache:
+    """과목 쌍 관계 판정 영구 캐시 - (선행 과목 ID, 후행 과목 ID) → 관계
+
+    과목 간 관계는 쿼리와 무관하므로 한 번 판정한 쌍은 재시작 후에도 다시 묻지 않는다.
+    """
+
+    def __init__(self, path: str = RELATION_CACHE_PATH):
+        self.path = path
+        self._verdicts: Dict[str, str] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def _key(course_id_a, course_id_b) -> str:
+        return f"{course_id_a}:{course_id_b}"
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._verdicts = json.load(f)
+            logger.info(f"✅ 과목 관계 캐시 로드: {len(self._verdicts)}쌍")
+        except Exception as e:
+            logger.warning(f"⚠️ 과목 관계 캐시 로드 실패 - 빈 캐시로 시작: {e}")
+            self._verdicts = {}
+
+    def get(self, course_id_a, course_id_b) -> Optional[str]:
+        return self._verdicts.get(self._key(course_id_a, course_id_b))
+
+    def update(self, verdicts: Iterable[Tuple[object, object, str]]):
+        """(과목 A, 과목 B, 관계) 목록 반영"""
+        with self._lock:
+            for course_id_a, course_id_b, relation in verdicts:
+                self._verdicts[self._key(course_id_a, course_id_b)] = relation
+                self._dirty = True
+
+    def save(self):
+        """변경분이 있으면 임시 파일에 쓰고 rename (쓰는 도중 죽어도 기존 캐시 유지)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = dict(self._verdicts)
+            self._dirty = False
+
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"과목 관계 캐시 저장 실패: {e}")
+            with self._lock:
+                self._dirty = True
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def __len__(self):
+        return len(self._verdicts)
+
+
+relation_cache = RelationCache()
@@ -0,0 +1,91 @@
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+ROADMAP_CACHE_TTL_SEC = int(os.getenv("ROADMAP_CACHE_TTL_SEC", "3600"))
+ROADMAP_CACHE_SIZE = int(os.getenv("ROADMAP_CACHE_SIZE", "256"))
+
+
+def normalize_query(query: str) -> str:
+    """캐시 키용 쿼리 정규화 (유니코드 NFKC, 소문자, 공백/끝 문장부호 정리)"""
+    query = unicodedata.normalize("NFKC", query or "").lower()
+    query = re.sub(r"\s+", " ", query).strip()
+    return query.rstrip(" ?!.~")
+
+
+class RoadmapCache:
+    """커리큘럼 로드맵 결과 캐시 (LRU + TTL)
+
+    한 결과를 원본 쿼리(정규화)와 확장 쿼리 두 키로 저장한다.
+    원본 쿼리가 같으면 쿼리 확장부터 건너뛰고, 확장 결과가 같으면 검색/그래프/렌더링을 건너뛴다.
+    데이터셋 버전이 바뀐 항목은 조회 시 버린다.
+    """
+
+    def __init__(self, max_size: int = ROADMAP_CACHE_SIZE, ttl_sec: int = ROADMAP_CACHE_TTL_SEC):
+        self.max_size = max_size
+        self.ttl_sec = ttl_sec
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_sec > 0 and self.max_size > 0
+
+    @staticmethod
+    def _key(kind: str, query: str, required_dept_count: int, graph_format: str) -> tuple:
+        return kind, normalize_query(query), required_dept_count, graph_format
+
+    def get(self, kind: str, query: str, required_dept_count: int, graph_format: str,
+            version: str) -> Optional[Dict]:
+        """kind: "query"(원본) 또는 "expanded"(확장 쿼리)"""
+        if not self.enabled:
+            return None
+
+        key = self._key(kind, query, required_dept_count, graph_format)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, entry_version, payload = entry
+                if expires_at > time.monotonic() and entry_version == version:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return payload
+                del self._entries[key]
+            self.misses += 1
+        return None
+
+    def put(self, query: str, payload: Dict, required_dept_count: int, graph_format: str, version: str):
+        """원본 쿼리 + 확장 쿼리(payload["expanded_query"]) 두 키로 저장"""
+        if not self.enabled:
+            return
+
+        entry = (time.monotonic() + self.ttl_sec, version, payload)
+        with self._lock:
+            for kind, key_query in (("query", query), ("expanded", payload.get("expanded_query", ""))):
+                key = self._key(kind, key_query, required_dept_count, graph_format)
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, payload: Dict):
+        """해당 결과를 가리키는 키 모두 제거 (결과물 파일이 정리된 경우 등)"""
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry[2] is payload]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+roadmap_cache = RoadmapCache()
@@ -1,12 +1,9 @@
-import os
-import pickle
 import numpy as np
-import faiss
 import logging
 from typing import List, Dict, Optional
-import openai
-import os
-        
+from .embedding_client import get_query_embedding
+from .dataset_store import load_dataset
+
 logger = logging.getLogger(__name__)
 
 
@@ -14,53 +11,61 @@ class ClassRetriever:
     def __init__(self, db_client=None, data_path="./data"):
         self.db_client = db_client
         self.data_path = data_path
-        self.index = None
-        self.lookup_index = None
+        self.lookup_index = None        # 행 번호 → 과목 정보 (ColumnarLookup 또는 dict 리스트)
+        self.embeddings = None          # 정규화된 (N, dim) float32 연속 배열 (변환 파일이면 읽기 전용 mmap)
+        self.dept_rows = {}             # (department_id, department_name) → 행 번호 배열
+        self.class_id_rows = {}         # class_id → 행 번호 리스트
         self.is_loaded = False
 
     def load_data(self):
-    
-        class_file = os.path.join(self.data_path, "class_Dataset.pkl")
+        """과목 데이터 로드 - 변환된 정규화 .npy(mmap) + 열 단위 lookup 우선, 없으면 pkl"""
+        if self.is_loaded:
+            return
+
         try:
-            with open(class_file, "rb") as f:
-                data = pickle.load(f)
-                embeddings = data["embeddings"]
-                embeddings_array = np.array(embeddings, dtype=np.float32)
-                self.lookup_index = data["lookup_index"]
-
-            # FAISS 인덱스 생성
-            embeddings_array /= np.linalg.norm(embeddings_array, axis=1, keepdims=True)  # 정규화
-            dim = embeddings_array.shape[1]
-            self.index = faiss.IndexFlatIP(dim)
-            self.index.add(embeddings_array)
+            # 과목 점수는 score_classes_by_departments 가 임베딩 행렬로 직접 계산하므로
+            # 별도 FAISS 인덱스(전체 복사본)는 만들지 않음 → mmap 페이지를 워커끼리 공유
+            self.embeddings, self.lookup_index = load_dataset(self.data_path, "class")
 
+            self._build_row_maps()
             self.is_loaded = True
 
         except Exception as e:
             logger.error(f"과목 데이터 로드 실패: {e}")
             raise
 
-    def get_query_embedding(self, query: str) -> np.ndarray:
-        client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    def warmup(self):
+        """서버 시작 시 로드 + 임베딩 페이지를 미리 읽어 첫 요청 지연 제거"""
+        self.load_data()
+        float(np.asarray(self.embeddings).sum())
+
+    def _build_row_maps(self):
+        """학과 → 행 번호, 과목 ID → 행 번호 맵을 한 번만 구성"""
+        dept_rows = {}
+        class_id_rows = {}
+        for i, class_info in enumerate(self.lookup_index):
+            key = (class_info.get("department_id"), class_info.get("department_name", "Unknown"))
+            dept_rows.setdefault(key, []).append(i)
+            class_id_rows.setdefault(class_info.get("class_id"), []).append(i)
 
-        response = client.embeddings.create(
-            input=query,
-            model='text-embedding-3-large'
-        )
+        self.dept_rows = {key: np.array(rows, dtype=np.int64) for key, rows in dept_rows.items()}
+        self.class_id_rows = class_id_rows
 
-        return np.array(response.data[0].embedding, dtype=np.float32)
+    def get_query_embedding(self, query: str) -> np.ndarray:
+        return get_query_embedding(query)
 
+    def embed_query(self, query: str) -> np.ndarray:
+        """정규화된 쿼리 임베딩 (1차원)"""
+        query_emb = self.get_query_embedding(query)
+        query_emb /= np.linalg.norm(query_emb)
+        return query_emb
 
-    def search_class_by_departments(self, query: str, department_list: List[Dict], exclude_class_ids: List[int] = None) -> Dict[str, List[Dict]]:
-        """특정 학과들에서만 과목 검색 - 효율적인 버전"""
+    def score_classes_by_departments(self, query_emb: np.ndarray, department_list: List[Dict],
+                                     exclude_class_ids=None, top_k: Optional[int] = None) -> Dict[str, List[Dict]]:
+        """이미 만든 쿼리 임베딩으로 학과별 과목 점수 계산 (행렬-벡터 곱 한 번)"""
         if not self.is_loaded:
             self.load_data()
 
-        # 쿼리 임베딩 생성
-        query_embedding = self.get_query_embedding(query)
-        query_emb = query_embedding.reshape(1, -1)
-        query_emb /= np.linalg.norm(query_emb, axis=1, keepdims=True)
-
         # 학과 ID 추출
         selected_dept_ids = {dept.get('department_id') for dept in department_list}
 
@@ -69,23 +74,45 @@ class ClassRetriever:
         for dept in department_list:
             results_by_dept[dept.get("department_name", "Unknown")] = []
 
-        # 한 번에 모든 과목을 확인하고 해당 학과에 속하는 것만 필터링
-        for i, class_info in enumerate(self.lookup_index):
-            # 지정된 학과에 속하는지 확인
-            if class_info.get("department_id") not in selected_dept_ids:
-                continue
-
-            # 제외할 과목 ID가 있다면 스킵
-            if exclude_class_ids and class_info.get("class_id") in exclude_class_ids:
-                continue
-
-            # 해당 과목의 임베딩과 쿼리 간 유사도 계산
-            class_emb = self.index.reconstruct(i).reshape(1, -1)
-            similarity = np.dot(query_emb, class_emb.T)[0, 0]
-
-            # 해당 학과 결과에 추가
-            dept_name = class_info.get("department_name", "Unknown")
-            if dept_name in results_by_dept:
+        # 학과명별 후보 행 모으기 (원래 lookup 순서 유지)
+        rows_by_dept = {}
+        for (dept_id, dept_name), rows in self.dept_rows.items():
+            if dept_id in selected_dept_ids and dept_name in results_by_dept:
+                rows_by_dept.setdefault(dept_name, []).append(rows)
+        if not rows_by_dept:
+            for dept_name in results_by_dept:
+                print(f"🔍 {dept_name} 검색 결과: 0개")
+            return results_by_dept
+
+        # 제외 과목 마스크 (set 기반)
+        excluded_rows = set()
+        if exclude_class_ids:
+            for class_id in set(exclude_class_ids):
+                excluded_rows.update(self.class_id_rows.get(class_id, ()))
+        excluded_rows = np.fromiter(excluded_rows, dtype=np.int64, count=len(excluded_rows))
+
+        dept_names = list(rows_by_dept)
+        dept_row_arrays = []
+        for dept_name in dept_names:
+            rows = np.sort(np.concatenate(rows_by_dept[dept_name]))
+            dept_row_arrays.append(rows[~np.isin(rows, excluded_rows)])
+
+        # 선택된 학과 과목 전체를 행렬-벡터 곱 한 번으로 점수 계산 후 학과별로 분할
+        all_rows = np.concatenate(dept_row_arrays)
+        all_scores = self.embeddings[all_rows] @ query_emb.reshape(-1)
+        split_points = np.cumsum([len(rows) for rows in dept_row_arrays])[:-1]
+
+        for dept_name, rows, scores in zip(dept_names, dept_row_arrays, np.split(all_scores, split_points)):
+            # 점수 내림차순 (동점은 lookup 순서), top_k 가 있으면 argpartition 으로 먼저 자름
+            if top_k is not None and top_k < len(rows):
+                candidate = np.argpartition(-scores, top_k - 1)[:top_k]
+                candidate = np.sort(candidate)
+                order = candidate[np.argsort(-scores[candidate], kind="stable")]
+            else:
+                order = np.argsort(-scores, kind="stable")
+
+            for pos in order.tolist():
+                class_info = self.lookup_index[rows[pos]]
                 results_by_dept[dept_name].append({
                     "class_id": class_info.get("class_id"),
                     "class_name": class_info.get("class_name", "Unknown"),
@@ -95,13 +122,20 @@ class ClassRetriever:
                     "semester": class_info.get("semester", "Unknown"),
                     "prerequisite": class_info.get("prerequisite", ""),
                     "description": class_info.get("text", ""),
-                    "score": float(similarity)
+                    "score": float(scores[pos])
                 })
 
-        # 각 학과별로 점수순 정렬하고 상위 count개만 유지
         for dept_name in results_by_dept:
-            results_by_dept[dept_name].sort(key=lambda x: x["score"], reverse=True)
-            results_by_dept[dept_name] = results_by_dept[dept_name]
             print(f"🔍 {dept_name} 검색 결과: {len(results_by_dept[dept_name])}개")
 
         return results_by_dept
+
+    def search_class_by_departments(self, query: str, department_list: List[Dict], exclude_class_ids: List[int] = None,
+                                    top_k: Optional[int] = None) -> Dict[str, List[Dict]]:
+        """특정 학과들에서만 과목 검색 - 효율적인 버전"""
+        if not self.is_loaded:
+            self.load_data()
+
+        # 쿼리 임베딩 생성
+        query_emb = self.embed_query(query)
+        return self.score_classes_by_departments(query_emb, department_list, exclude_class_ids, top_k)
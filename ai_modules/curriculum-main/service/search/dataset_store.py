@@ -0,0 +1,223 @@
+"""class_Dataset.pkl / department_Dataset.pkl → 빠른 시작용 파일 변환 및 로드
+
+서비스 디렉토리에서 실행:
+    python -m service.search.dataset_store              # 두 데이터셋 모두 변환
+    python -m service.search.dataset_store --benchmark  # 변환 후 기존/신규 로드 시간 비교
+
+    python -m service.search.dataset_store --if-stale   # 원본 pkl 과 맞지 않는 데이터셋만 변환 (컨테이너 시작 시)
+
+생성 파일 (data/):
+    <name>_embeddings.npy  L2 정규화된 float32 C-연속 배열 (mmap_mode='r' 로 워커 간 페이지 공유)
+    <name>_lookup.json     열 단위 lookup 테이블 {"columns": {컬럼: [값, ...]}, "absent": {컬럼: [행, ...]}}
+    <name>_meta.json       변환 당시 원본 pkl 의 sha256 (현재 pkl 과 다르면 위 파일 대신 pkl 로드)
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import pickle
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DATASET_NAMES = ("class", "department")
+
+
+def dataset_paths(data_path: str, name: str) -> Tuple[str, str, str]:
+    """(원본 pkl, 임베딩 npy, lookup json) 경로"""
+    return (
+        os.path.join(data_path, f"{name}_Dataset.pkl"),
+        os.path.join(data_path, f"{name}_embeddings.npy"),
+        os.path.join(data_path, f"{name}_lookup.json"),
+    )
+
+
+def meta_path(data_path: str, name: str) -> str:
+    """변환 메타 파일 경로 (원본 pkl 지문)"""
+    return os.path.join(data_path, f"{name}_meta.json")
+
+
+def source_fingerprint(pkl_path: str) -> str:
+    """원본 pkl 의 sha256"""
+    digest = hashlib.sha256()
+    with open(pkl_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_converted(data_path: str, name: str) -> bool:
+    """변환 파일이 있고 현재 원본 pkl 에서 만들어졌는지 (pkl 이 없으면 변환 파일만으로 판단)"""
+    pkl_path, npy_path, lookup_path = dataset_paths(data_path, name)
+    if not (os.path.exists(npy_path) and os.path.exists(lookup_path)):
+        return False
+    if not os.path.exists(pkl_path):
+        return True
+
+    try:
+        with open(meta_path(data_path, name), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return False
+    return meta.get("source_sha256") == source_fingerprint(pkl_path)
+
+
+class ColumnarLookup:
+    """열 단위로 저장된 lookup 테이블 - 행 접근 시에만 dict 를 만든다 (기존 lookup_index[i] 와 호환)"""
+
+    def __init__(self, columns: Dict[str, list], absent: Dict[str, List[int]] = None):
+        self.columns = columns
+        # 원래 행에 없던 키 (dict.get 기본값이 그대로 동작하도록 행 dict 에서 뺌)
+        self.absent = {name: set(rows) for name, rows in (absent or {}).items()}
+        self._length = len(next(iter(columns.values()))) if columns else 0
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict]) -> "ColumnarLookup":
+        names = []
+        for row in rows:
+            for name in row:
+                if name not in names:
+                    names.append(name)
+
+        columns = {name: [row.get(name) for row in rows] for name in names}
+        absent = {}
+        for name in names:
+            missing = [i for i, row in enumerate(rows) if name not in row]
+            if missing:
+                absent[name] = missing
+        return cls(columns, absent)
+
+    def to_json(self) -> Dict:
+        return {
+            "columns": self.columns,
+            "absent": {name: sorted(rows) for name, rows in self.absent.items()},
+        }
+
+    def column(self, name: str) -> list:
+        return self.columns.get(name, [None] * self._length)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, i) -> Dict:
+        i = int(i)
+        return {
+            name: values[i]
+            for name, values in self.columns.items()
+            if i not in self.absent.get(name, ())
+        }
+
+    def __iter__(self):
+        for i in range(self._length):
+            yield self[i]
+
+
+def _normalize_rows(embeddings) -> np.ndarray:
+    embeddings = np.array(embeddings, dtype=np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return np.ascontiguousarray(embeddings)
+
+
+def convert(data_path: str, name: str):
+    """pkl 을 읽어 정규화된 .npy 와 열 단위 lookup .json 으로 저장 (메타 파일은 마지막에 써서 중간 실패 시 무효)"""
+    pkl_path, npy_path, lookup_path = dataset_paths(data_path, name)
+    if os.path.exists(meta_path(data_path, name)):
+        os.remove(meta_path(data_path, name))
+    with open(pkl_path, "rb") as f:
+        data = pickle.load(f)
+
+    embeddings = _normalize_rows(data["embeddings"])
+    lookup_index = data["lookup_index"]
+    if embeddings.shape[0] != len(lookup_index):
+        raise ValueError(f"임베딩 행 수와 lookup 항목 수가 다릅니다: {embeddings.shape[0]} != {len(lookup_index)}")
+
+    np.save(npy_path, embeddings)
+    with open(lookup_path, "w", encoding="utf-8") as f:
+        json.dump(ColumnarLookup.from_rows(lookup_index).to_json(), f, ensure_ascii=False, separators=(",", ":"))
+    with open(meta_path(data_path, name), "w", encoding="utf-8") as f:
+        json.dump({"source_sha256": source_fingerprint(pkl_path), "rows": int(embeddings.shape[0])}, f)
+
+    print(f"✅ 변환 완료: {name} {embeddings.shape} → {npy_path}, {lookup_path}")
+
+
+def load_dataset(data_path: str, name: str):
+    """(정규화된 임베딩, lookup) 로드 - 현재 pkl 에서 변환된 파일이 있으면 mmap, 아니면 pkl 로 폴백"""
+    pkl_path, npy_path, lookup_path = dataset_paths(data_path, name)
+
+    if is_converted(data_path, name):
+        embeddings = np.load(npy_path, mmap_mode="r")
+        with open(lookup_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return embeddings, ColumnarLookup(data["columns"], data.get("absent"))
+
+    if not os.path.exists(pkl_path):
+        raise FileNotFoundError(f"{name} 데이터 파일을 찾을 수 없습니다: {pkl_path}")
+
+    reason = "원본 pkl 과 다름" if os.path.exists(npy_path) else "없음"
+    logger.warning(f"⚠️ {name} 변환 파일 {reason} - pkl 로드 (python -m service.search.dataset_store 로 변환 권장)")
+    with open(pkl_path, "rb") as f:
+        data = pickle.load(f)
+    return _normalize_rows(data["embeddings"]), data["lookup_index"]
+
+
+def dataset_version(data_path: str) -> str:
+    """데이터 파일 (크기, 수정 시각) 지문 - 변환/재배포 시 바뀜"""
+    stats = []
+    for name in DATASET_NAMES:
+        for path in dataset_paths(data_path, name):
+            try:
+                stat = os.stat(path)
+                stats.append(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}")
+            except FileNotFoundError:
+                continue
+    return hashlib.sha1("|".join(stats).encode("utf-8")).hexdigest()[:12]
+
+
+def _legacy_load(data_path: str, name: str):
+    pkl_path, _, _ = dataset_paths(data_path, name)
+    with open(pkl_path, "rb") as f:
+        data = pickle.load(f)
+    return _normalize_rows(data["embeddings"]), data["lookup_index"]
+
+
+def _fast_load(data_path: str, name: str):
+    embeddings, lookup = load_dataset(data_path, name)
+    # 실제 첫 요청처럼 전체 페이지를 한 번 훑음
+    float(np.asarray(embeddings).sum())
+    return embeddings, lookup
+
+
+def benchmark(data_path: str, name: str, repeat: int = 10):
+    """기존 pkl 로드와 변환 파일 로드 시간 비교 (ms, 중앙값)"""
+    for label, fn in (("pkl + normalize", _legacy_load), ("npy(mmap)/json", _fast_load)):
+        timings = []
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            fn(data_path, name)
+            timings.append((time.perf_counter() - start_time) * 1000)
+        timings.sort()
+        print(f"⏱️ {name:<10} {label:<16} median {timings[len(timings) // 2]:.2f}ms  min {timings[0]:.2f}ms  (n={repeat})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="curriculum 검색 데이터 변환")
+    parser.add_argument("--data-path", default="./data", help="pkl 이 있는 데이터 디렉토리")
+    parser.add_argument("--name", choices=DATASET_NAMES, action="append", help="변환할 데이터셋 (기본: 전체)")
+    parser.add_argument("--if-stale", action="store_true", help="변환 파일이 없거나 원본 pkl 과 다를 때만 변환")
+    parser.add_argument("--benchmark", action="store_true", help="변환 후 로드 시간 비교")
+    parser.add_argument("--repeat", type=int, default=10, help="벤치마크 반복 횟수")
+    args = parser.parse_args()
+
+    for dataset_name in args.name or DATASET_NAMES:
+        if args.if_stale:
+            source_pkl = dataset_paths(args.data_path, dataset_name)[0]
+            if not os.path.exists(source_pkl) or is_converted(args.data_path, dataset_name):
+                print(f"⏭️ {dataset_name} 변환 생략 (최신이거나 원본 pkl 없음)")
+                continue
+        convert(args.data_path, dataset_name)
+        if args.benchmark:
+            benchmark(args.data_path, dataset_name, args.repeat)
@@ -1,10 +1,11 @@
-import os
-import pickle
+import asyncio
 import numpy as np
 import faiss
 import logging
 from typing import List, Dict
-from ..open_ai import llm_select_departments
+from ..open_ai import llm_select_departments, llm_select_departments_async
+from .embedding_client import get_query_embedding, normalize
+from .dataset_store import load_dataset
 
 logger = logging.getLogger(__name__)
 
@@ -20,27 +21,16 @@ class DepartmentRetriever:
         self.is_loaded = False
 
     def load_data(self):
-        """저장된 학과 데이터 로드"""
+        """저장된 학과 데이터 로드 - 변환된 정규화 .npy(mmap) + 열 단위 lookup 우선, 없으면 pkl"""
         if self.is_loaded:
             return
 
-        dept_file = os.path.join(self.data_path, "department_Dataset.pkl")
-
-        if not os.path.exists(dept_file):
-            raise FileNotFoundError(f"학과 데이터 파일을 찾을 수 없습니다: {dept_file}")
-
         try:
-            with open(dept_file, "rb") as f:
-                data = pickle.load(f)
-                embeddings = data["embeddings"]
-                embeddings_array = np.array(embeddings, dtype=np.float32)
-                self.lookup_index = data["lookup_index"]
-
-            # FAISS 인덱스 생성
-            embeddings_array /= np.linalg.norm(embeddings_array, axis=1, keepdims=True)  # 정규화
-            dim = embeddings_array.shape[1]
-            self.index = faiss.IndexFlatIP(dim)
-            self.index.add(embeddings_array)
+            embeddings, self.lookup_index = load_dataset(self.data_path, "department")
+
+            # FAISS 인덱스 생성 (이미 정규화된 임베딩)
+            self.index = faiss.IndexFlatIP(embeddings.shape[1])
+            self.index.add(np.ascontiguousarray(embeddings, dtype=np.float32))
 
             self.is_loaded = True
 
@@ -48,32 +38,22 @@ class DepartmentRetriever:
             logger.error(f"학과 데이터 로드 실패: {e}")
             raise
 
+    def warmup(self):
+        """서버 시작 시 로드 + 더미 검색 한 번 (첫 요청 지연 제거)"""
+        self.load_data()
+        self.index.search(np.zeros((1, self.index.d), dtype=np.float32), k=1)
+
     def get_query_embedding(self, query: str) -> np.ndarray:
         """쿼리 임베딩 생성 (OpenAI API 사용)"""
-        import openai
-        import os
-
-        client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-        response = client.embeddings.create(
-            input=query,
-            model='text-embedding-3-large'
-        )
-
-        return np.array(response.data[0].embedding, dtype=np.float32)
+        return get_query_embedding(query)
 
-    def search_department(self, query: str, count: int = 10, threshold_diff: float = 0.015) -> List[Dict]:
-        """하이브리드 검색"""
+    def find_candidates(self, query_emb: np.ndarray, count: int = 10, threshold_diff: float = 0.015) -> List[Dict]:
+        """정규화된 쿼리 임베딩으로 FAISS 후보 학과 검색 (임계값 기반 1차 필터링)"""
         if not self.is_loaded:
             self.load_data()
 
-        # 쿼리 임베딩 생성
-        query_embedding = self.get_query_embedding(query)
-        query_emb = query_embedding.reshape(1, -1)
-        query_emb /= np.linalg.norm(query_emb, axis=1, keepdims=True)
-
         # FAISS 검색으로 후보 학과 찾기
-        similarities, indices = self.index.search(query_emb, k=count * 2)  # 더 많은 후보 확보
+        similarities, indices = self.index.search(query_emb.reshape(1, -1), k=count * 2)  # 더 많은 후보 확보
 
         # 1차 필터링: 임계값 기반
         candidate_depts = []
@@ -92,10 +72,10 @@ class DepartmentRetriever:
             })
             prev_score = score
 
-        # 2차 선택: LLM이 쿼리와 가장 관련된 학과 선택
-        selected_depts = llm_select_departments(query, candidate_depts, count)
+        return candidate_depts
 
-        # 최종 결과 포맷
+    def format_results(self, selected_depts: List[Dict]) -> List[Dict]:
+        """최종 결과 포맷"""
         results = []
         for dept in selected_depts:
             results.append({
@@ -105,4 +85,27 @@ class DepartmentRetriever:
                 "score": dept["score"]
             })
 
-        return results
\ No newline at end of file
+        return results
+
+    def search_department(self, query: str, count: int = 10, threshold_diff: float = 0.015) -> List[Dict]:
+        """하이브리드 검색"""
+        if not self.is_loaded:
+            self.load_data()
+
+        # 쿼리 임베딩 생성
+        query_emb = normalize(self.get_query_embedding(query))
+        candidate_depts = self.find_candidates(query_emb, count, threshold_diff)
+
+        # 2차 선택: LLM이 쿼리와 가장 관련된 학과 선택
+        selected_depts = llm_select_departments(query, candidate_depts, count)
+        return self.format_results(selected_depts)
+
+    async def search_department_async(self, query: str, query_emb: np.ndarray, count: int = 10,
+                                      threshold_diff: float = 0.015) -> List[Dict]:
+        """비동기 하이브리드 검색 - 미리 만든 정규화 임베딩 사용, FAISS 는 executor, LLM 선택은 비동기"""
+        loop = asyncio.get_running_loop()
+        candidate_depts = await loop.run_in_executor(None, self.find_candidates, query_emb, count, threshold_diff)
+
+        # 2차 선택: LLM이 쿼리와 가장 관련된 학과 선택
+        selected_depts = await llm_select_departments_async(query, candidate_depts, count)
+        return self.format_results(selected_depts)
@@ -0,0 +1,46 @@
+import os
+import numpy as np
+import openai
+from typing import Optional
+
+from util.tracing import start_span
+
+EMBEDDING_MODEL = "text-embedding-3-large"
+
+# 프로세스 전체에서 재사용하는 OpenAI 클라이언트 (요청마다 생성하지 않음)
+_client: Optional[openai.OpenAI] = None
+_async_client: Optional[openai.AsyncOpenAI] = None
+
+
+def get_openai_client() -> openai.OpenAI:
+    global _client
+    if _client is None:
+        _client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _client
+
+
+def get_async_openai_client() -> openai.AsyncOpenAI:
+    global _async_client
+    if _async_client is None:
+        _async_client = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _async_client
+
+
+def get_query_embedding(query: str) -> np.ndarray:
+    """쿼리 임베딩 생성 (동기)"""
+    with start_span("embedding.create", kind="client", model=EMBEDDING_MODEL):
+        response = get_openai_client().embeddings.create(input=query, model=EMBEDDING_MODEL)
+    return np.array(response.data[0].embedding, dtype=np.float32)
+
+
+async def get_query_embedding_async(query: str) -> np.ndarray:
+    """쿼리 임베딩 생성 (비동기) - 이벤트 루프를 막지 않음"""
+    with start_span("embedding.create", kind="client", model=EMBEDDING_MODEL):
+        response = await get_async_openai_client().embeddings.create(input=query, model=EMBEDDING_MODEL)
+    return np.array(response.data[0].embedding, dtype=np.float32)
+
+
+def normalize(embedding: np.ndarray) -> np.ndarray:
+    """L2 정규화된 1차원 float32 벡터"""
+    embedding = np.asarray(embedding, dtype=np.float32).reshape(-1)
+    return embedding / np.linalg.norm(embedding)
@@ -3,6 +3,8 @@ import pymysql
 from dotenv import load_dotenv
 import os
 
+from util.tracing import start_span
+
 load_dotenv()  # .env 파일 자동 로드
 
 db_host = os.getenv("DB_HOST")
@@ -40,7 +42,7 @@ class DbClient():
     # R
     def execute_query(self, query, params=None):
         try:
-            with self.connection.cursor() as cursor:
+            with start_span("db.query", kind="client", db=self.database), self.connection.cursor() as cursor:
                 cursor.execute(query, params)
                 return cursor.fetchall()
         except pymysql.MySQLError:
@@ -1,5 +1,6 @@
+from typing import Dict, Any, List
 from fastapi import APIRouter
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from service.mappingService import MappingService
 
 router = APIRouter()
@@ -7,19 +8,53 @@ mapping_service = MappingService()
 
 class MappingRequest(BaseModel):
     query: str
+    top_k: int = Field(default=1, ge=1, le=20)
 
-@router.post("/map")
-async def map_department(request: MappingRequest):
-    """학과 설명 조회 - 학과명과 설명을 함께 반환"""
-    result = mapping_service.find_department_with_description(request.query)
+class BatchMappingRequest(BaseModel):
+    queries: List[str]
+    top_k: int = Field(default=1, ge=1, le=20)
+
+def format_mapping_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """서비스 결과 → /map 응답 (department/description 은 1위 학과, 기존 응답과 호환)
+
+    match_type: 1위 학과가 키워드 매칭("keyword")인지 벡터 검색("vector")인지
+    confidence_margin: 벡터 1위와 2위의 코사인 유사도 차이 - 키워드 매칭이 1위이면 None
+    """
+    candidates = [
+        {
+            "department": dept["department_name"],
+            "description": dept["description"],
+            "score": dept["score"],
+            "match_type": dept["match_type"]
+        }
+        for dept in result["departments"]
+    ]
 
-    if result["departments"]:
+    if candidates:
         return {
-            "department": result["departments"][0]["department_name"],
-            "description": result["departments"][0]["description"]
+            "department": candidates[0]["department"],
+            "description": candidates[0]["description"],
+            "candidates": candidates,
+            "match_type": result["match_type"],
+            "confidence_margin": result["confidence_margin"]
         }
     else:
         return {
             "department": None,
-            "description": "해당 학과를 찾을 수 없습니다."
-        }
\ No newline at end of file
+            "description": "해당 학과를 찾을 수 없습니다.",
+            "candidates": [],
+            "match_type": None,
+            "confidence_margin": None
+        }
+
+@router.post("/map")
+async def map_department(request: MappingRequest):
+    """학과 설명 조회 - 학과명과 설명을 함께 반환 (top_k 후보와 점수 포함)"""
+    result = mapping_service.map_departments(request.query, request.top_k)
+    return format_mapping_result(result)
+
+@router.post("/map/batch")
+async def map_department_batch(request: BatchMappingRequest):
+    """여러 쿼리를 한 번에 학과 매핑 (임베딩 1회 + FAISS 검색 1회)"""
+    results = mapping_service.map_departments_batch(request.queries, request.top_k)
+    return {"results": [format_mapping_result(result) for result in results]}
@@ -2,6 +2,7 @@ import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from controller.mappingController import router as mapping_router
+from utils.tracing import TraceMiddleware
 
 app = FastAPI()
 
@@ -13,6 +14,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# llm_agent 가 보낸 traceparent 이어받기 (스팬은 TRACE_EXPORT_PATH 에 기록)
+app.add_middleware(TraceMiddleware, service_name="department_mapping")
+
 # 라우터 등록
 app.include_router(mapping_router)
 
@@ -1,54 +1,121 @@
-from typing import Dict, Any
-from utils.utils import load_config, load_data, load_embeddings, build_faiss_index, get_query_embedding
+import time
+import numpy as np
+from typing import Dict, Any, List, Optional, Tuple
+from utils.utils import load_config, load_data, build_faiss_index, build_department_index
+from utils.keyword_matcher import KeywordMatcher
+from utils.embedding_backend import get_embedding_backend
+from utils.tracing import start_span
 
 class MappingService:
     def __init__(self):
+        start_time = time.perf_counter()
         self.keyword_mapping = load_config()  # 중첩 딕셔너리
         self.departments_data = load_data()   # 학과 정보 리스트
-        self.embeddings = load_embeddings()
-        self.faiss_index = build_faiss_index(self.embeddings)
+        # 임베딩 백엔드 (EMBEDDING_BACKEND=openai | local), 학과 인덱스도 같은 백엔드로 구성
+        self.embedding_backend = get_embedding_backend()
+        self.embeddings = self.embedding_backend.load_department_embeddings(self.departments_data)
+        # 직렬화된 인덱스가 학과 데이터와 맞으면 그대로 사용, 아니면 임베딩으로 구축
+        self.faiss_index = self.embedding_backend.load_prebuilt_index()
+        if self.faiss_index is None or self.faiss_index.ntotal != len(self.departments_data):
+            self.faiss_index = build_faiss_index(self.embeddings)
 
+        # 시작 시 한 번만 빌드: 키워드 오토마톤 + 학과명 인덱스
+        self.keyword_matcher = KeywordMatcher(self.keyword_mapping)
+        self.department_index = build_department_index(self.departments_data)
 
+        print(f"✅ MappingService 초기화 완료: {(time.perf_counter() - start_time) * 1000:.1f}ms")
 
     def get_department_description(self, department_name: str) -> Dict[str, Any]:
         """학과명으로 학과 설명을 찾는 함수"""
-        for dept in self.departments_data:
-            # PKL 파일 형식 (department_name, text) 또는 JSON 형식 (학과, 학과설명) 모두 지원
-            dept_name = dept.get("department_name") or dept.get("학과")
-            if dept_name == department_name:
-                description = dept.get("text") or dept.get("학과설명", "학과 설명을 찾을 수 없습니다.")
-                return {
-                    "department_name": department_name,
-                    "description": description
-                }
+        description = self.department_index.get(department_name)
+        if description is not None:
+            return {
+                "department_name": department_name,
+                "description": description
+            }
 
         return {
             "department_name": department_name,
             "description": "해당 학과를 찾을 수 없습니다."
         }
 
-    def find_department_with_description(self, query: str) -> Dict[str, Any]:
-        """학과를 찾고 설명도 함께 반환하는 통합 함수"""
-        # 1. 키워드 매핑 먼저 시도
-        for category, mappings in self.keyword_mapping.items():
-            for keyword, dept_name in mappings.items():
-                if keyword in query.lower():
-                    description_info = self.get_department_description(dept_name)
-                    return {
-                        "departments": [description_info]
-                    }
-
-        # 2. FAISS 벡터 검색
-        query_embedding = get_query_embedding(query)
-        if query_embedding is not None:
-            scores, indices = self.faiss_index.search(query_embedding.reshape(1, -1), 1)
-            best_idx = indices[0][0]
-            best_dept = self.departments_data[best_idx]
+    def _vector_search(self, queries: List[str], k: int) -> List[List[Tuple[int, float]]]:
+        """쿼리들을 한 번에 임베딩하고 FAISS 다중 쿼리 검색 → 쿼리별 (행 번호, 점수) 목록"""
+        if not queries or self.faiss_index is None:
+            return [[] for _ in queries]
+
+        with start_span("embedding.embed_queries", kind="client", backend=type(self.embedding_backend).__name__,
+                        queries=len(queries)):
+            query_embeddings = self.embedding_backend.embed_queries(queries)
+        if query_embeddings is None:
+            return [[] for _ in queries]
+
+        k = min(k, self.faiss_index.ntotal)
+        with start_span("faiss.search", k=k):
+            scores, indices = self.faiss_index.search(np.ascontiguousarray(query_embeddings, dtype='float32'), k)
+        return [
+            [(int(idx), float(score)) for idx, score in zip(row_indices, row_scores) if idx >= 0]
+            for row_indices, row_scores in zip(indices, scores)
+        ]
+
+    def _build_mapping_result(self, keyword_match: Optional[Dict[str, Any]], hits: List[Tuple[int, float]], top_k: int) -> Dict[str, Any]:
+        """키워드 매칭(점수 1.0) + 벡터 후보를 학과명 기준으로 합쳐 top_k 와 신뢰도 마진 계산
+
+        confidence_margin 은 벡터 1위와 2위의 코사인 유사도 차이다. 키워드 매칭 1.0 은 유사도가 아니라서
+        비교하지 않고, 1위가 키워드 매칭이면 None (match_type="keyword" 로 구분).
+        """
+        departments = []
+        seen = set()
+
+        if keyword_match:
+            dept_name = keyword_match["department_name"]
+            departments.append({**self.get_department_description(dept_name), "score": 1.0, "match_type": "keyword"})
+            seen.add(dept_name)
+
+        for idx, score in hits:
             # PKL 파일 형식 (department_name) 또는 JSON 형식 (학과) 모두 지원
+            best_dept = self.departments_data[idx]
             dept_name = best_dept.get("department_name") or best_dept.get("학과")
-            description_info = self.get_department_description(dept_name)
-            return {
-                "departments": [description_info]
-            }
+            if dept_name in seen:
+                continue
+            seen.add(dept_name)
+            departments.append({**self.get_department_description(dept_name), "score": round(score, 4), "match_type": "vector"})
+
+        # 벡터 1위와 2위 유사도 차이 (키워드 매칭이 1위이거나 후보가 하나뿐이면 None)
+        match_type = departments[0]["match_type"] if departments else None
+        confidence_margin = None
+        if match_type == "vector" and len(departments) > 1:
+            confidence_margin = round(departments[0]["score"] - departments[1]["score"], 4)
+
+        return {
+            "departments": departments[:top_k],
+            "match_type": match_type,
+            "confidence_margin": confidence_margin
+        }
+
+    def map_departments_batch(self, queries: List[str], top_k: int = 1) -> List[Dict[str, Any]]:
+        """여러 쿼리를 한 번에 매핑 (임베딩 호출 1회 + FAISS 검색 1회)"""
+        keyword_matches = [self.keyword_matcher.match(query) for query in queries]
 
-        return {"departments": []}
\ No newline at end of file
+        # 키워드로 끝나는 top-1 요청은 임베딩 호출 없이 처리
+        vector_positions = [
+            i for i, keyword_match in enumerate(keyword_matches)
+            if keyword_match is None or top_k > 1
+        ]
+        # 마진 계산과 키워드 중복 제거를 위해 한 개 더 검색
+        vector_hits = self._vector_search([queries[i] for i in vector_positions], top_k + 1)
+
+        hits_by_position = dict(zip(vector_positions, vector_hits))
+        return [
+            self._build_mapping_result(keyword_match, hits_by_position.get(i, []), top_k)
+            for i, keyword_match in enumerate(keyword_matches)
+        ]
+
+    def map_departments(self, query: str, top_k: int = 1) -> Dict[str, Any]:
+        """단일 쿼리 top_k 학과 매핑 (점수, 신뢰도 마진 포함)"""
+        return self.map_departments_batch([query], top_k)[0]
+
+    def find_department_with_description(self, query: str) -> Dict[str, Any]:
+        """학과를 찾고 설명도 함께 반환하는 통합 함수"""
+        # 키워드 매핑 먼저 (가장 긴 키워드 우선), 없으면 FAISS 벡터 검색
+        return self.map_departments(query, top_k=1)
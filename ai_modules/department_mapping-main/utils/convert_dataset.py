@@ -0,0 +1,93 @@
+"""goal_Dataset.pkl → 빠른 시작용 파일 변환 도구
+
+서비스 디렉토리에서 실행:
+    python -m utils.convert_dataset              # 변환
+    python -m utils.convert_dataset --benchmark  # 변환 후 기존/신규 시작 시간 비교
+
+생성 파일 (GOAL_FAST_DATA_DIR, 기본 data/):
+    goal_embeddings.npy  float32 C-연속 배열 (np.load(mmap_mode='r') 로 복사 없이 로드)
+    goal_lookup.json     학과 lookup 테이블 (공백 없는 JSON)
+    goal_faiss.index     직렬화된 FAISS IndexFlatIP
+    goal_fast_meta.json  원본 pkl 의 sha256 (서비스 시작 시 현재 pkl 과 다르면 위 파일 대신 pkl 사용)
+
+생성 파일은 git 에 넣지 않는다 (Dockerfile 빌드 단계에서 생성).
+"""
+import argparse
+import json
+import os
+import pickle
+import time
+
+import faiss
+import numpy as np
+
+from utils.utils import (
+    FAST_DATA_DIR, FAST_EMBEDDINGS_PATH, FAST_LOOKUP_PATH, FAST_INDEX_PATH, FAST_META_PATH, PKL_PATH,
+    build_faiss_index, source_fingerprint,
+)
+
+
+def convert(pkl_path: str = PKL_PATH):
+    """pkl 을 읽어 .npy / .json / .index 세 파일로 저장 (메타 파일은 마지막에 써서 중간 실패 시 무효)"""
+    os.makedirs(FAST_DATA_DIR, exist_ok=True)
+    if os.path.exists(FAST_META_PATH):
+        os.remove(FAST_META_PATH)
+    with open(pkl_path, 'rb') as f:
+        data = pickle.load(f)
+
+    embeddings = np.ascontiguousarray(data['embeddings'], dtype='float32')
+    lookup_index = data.get('lookup_index', [])
+    if embeddings.shape[0] != len(lookup_index):
+        raise ValueError(f"임베딩 행 수와 lookup 항목 수가 다릅니다: {embeddings.shape[0]} != {len(lookup_index)}")
+
+    np.save(FAST_EMBEDDINGS_PATH, embeddings)
+    with open(FAST_LOOKUP_PATH, 'w', encoding='utf-8') as f:
+        json.dump(lookup_index, f, ensure_ascii=False, separators=(',', ':'))
+    faiss.write_index(build_faiss_index(embeddings), FAST_INDEX_PATH)
+    with open(FAST_META_PATH, 'w', encoding='utf-8') as f:
+        json.dump({"source_sha256": source_fingerprint(pkl_path), "rows": int(embeddings.shape[0])}, f)
+
+    print(f"✅ 변환 완료: {embeddings.shape} → {FAST_EMBEDDINGS_PATH}, {FAST_LOOKUP_PATH}, {FAST_INDEX_PATH}")
+
+
+def _legacy_startup():
+    # 기존 경로: 같은 pkl 을 두 번 언피클 + astype 복사 후 인덱스 구축
+    with open(PKL_PATH, 'rb') as f:
+        lookup_index = pickle.load(f).get('lookup_index', [])
+    with open(PKL_PATH, 'rb') as f:
+        embeddings = pickle.load(f).get('embeddings')
+    index = faiss.IndexFlatIP(embeddings.shape[1])
+    index.add(embeddings.astype('float32'))
+    return lookup_index, index
+
+
+def _fast_startup():
+    with open(FAST_LOOKUP_PATH, 'r', encoding='utf-8') as f:
+        lookup_index = json.load(f)
+    np.load(FAST_EMBEDDINGS_PATH, mmap_mode='r')
+    index = faiss.read_index(FAST_INDEX_PATH)
+    return lookup_index, index
+
+
+def benchmark(repeat: int = 20):
+    """기존 pkl 로드와 변환 파일 로드의 시작 시간 비교 (ms, 중앙값)"""
+    for name, fn in (("pkl x2 + build", _legacy_startup), ("npy/json/index", _fast_startup)):
+        timings = []
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - start_time) * 1000)
+        timings.sort()
+        print(f"⏱️ {name:<16} median {timings[len(timings) // 2]:.2f}ms  min {timings[0]:.2f}ms  (n={repeat})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="department_mapping 데이터 변환")
+    parser.add_argument("--pkl", default=PKL_PATH, help="원본 goal_Dataset.pkl 경로")
+    parser.add_argument("--benchmark", action="store_true", help="변환 후 시작 시간 비교")
+    parser.add_argument("--repeat", type=int, default=20, help="벤치마크 반복 횟수")
+    args = parser.parse_args()
+
+    convert(args.pkl)
+    if args.benchmark:
+        benchmark(args.repeat)
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import numpy as np
+from typing import Dict, Any, List, Optional
+
+from utils.utils import DATA_DIR, load_embeddings, load_faiss_index, get_query_embedding, get_query_embeddings
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # 로컬 백엔드를 쓰지 않으면 설치하지 않아도 됨
+    SentenceTransformer = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOCAL_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+# openwebui 가 이미 받아둔 HuggingFace 캐시 (컨테이너에서는 LOCAL_EMBEDDING_CACHE 로 마운트 경로 지정)
+DEFAULT_LOCAL_CACHE = os.path.join(os.path.dirname(__file__), "../../../openwebui_new/cache/embedding/models")
+
+
+class OpenAIEmbeddingBackend:
+    """OpenAI text-embedding-3-large 백엔드 (goal_Dataset.pkl 임베딩과 동일 공간)"""
+
+    name = "openai"
+
+    def load_department_embeddings(self, departments_data: List[Dict[str, Any]]) -> Optional[np.ndarray]:
+        return load_embeddings()
+
+    def load_prebuilt_index(self):
+        return load_faiss_index()
+
+    def embed_query(self, query: str) -> Optional[np.ndarray]:
+        return get_query_embedding(query)
+
+    def embed_queries(self, queries: List[str]) -> Optional[np.ndarray]:
+        return get_query_embeddings(queries)
+
+
+class LocalEmbeddingBackend:
+    """sentence-transformers 로컬 CPU 백엔드 (네트워크 없이 동작)
+
+    학과 임베딩은 같은 모델로 미리 만들어 data/ 아래 .npy 로 저장해두고,
+    다음 시작부터는 임베딩한 텍스트 해시가 같을 때만 그대로 로드한다.
+    """
+
+    name = "local"
+
+    def __init__(self, model_name: str = DEFAULT_LOCAL_MODEL, cache_folder: Optional[str] = None):
+        if SentenceTransformer is None:
+            raise ImportError("sentence-transformers 가 설치되어 있지 않습니다.")
+
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name, cache_folder=cache_folder, device="cpu")
+
+        model_slug = re.sub(r"[^0-9A-Za-z_.-]+", "_", model_name)
+        self.index_path = os.path.join(DATA_DIR, f"goal_embeddings_{model_slug}.npy")
+        # 임베딩한 학과 텍스트의 sha256 (설명만 바뀌고 행 수가 같아도 재생성되도록)
+        self.meta_path = os.path.join(DATA_DIR, f"goal_embeddings_{model_slug}.json")
+
+    def _department_text(self, dept: Dict[str, Any]) -> str:
+        # PKL 파일 형식 (department_name, text) 또는 JSON 형식 (학과, 학과설명) 모두 지원
+        name = dept.get("department_name") or dept.get("학과") or ""
+        description = dept.get("text") or dept.get("학과설명") or ""
+        return f"{name} {description}".strip()
+
+    @staticmethod
+    def _texts_hash(texts: List[str]) -> str:
+        return hashlib.sha256(json.dumps(texts, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+    def _cached_texts_hash(self) -> Optional[str]:
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("texts_sha256")
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def load_department_embeddings(self, departments_data: List[Dict[str, Any]]) -> Optional[np.ndarray]:
+        if not departments_data:
+            return None
+
+        texts = [self._department_text(dept) for dept in departments_data]
+        texts_hash = self._texts_hash(texts)
+
+        if os.path.exists(self.index_path):
+            embeddings = np.load(self.index_path)
+            if embeddings.shape[0] == len(texts) and self._cached_texts_hash() == texts_hash:
+                logger.info(f"✅ 로컬 학과 인덱스 로드: {self.index_path}")
+                return embeddings
+            logger.warning(f"⚠️ 로컬 학과 인덱스가 현재 학과 데이터와 다름, 재생성: {self.index_path}")
+
+        embeddings = self.model.encode(texts, normalize_embeddings=True, convert_to_numpy=True).astype("float32")
+        try:
+            np.save(self.index_path, embeddings)
+            with open(self.meta_path, "w", encoding="utf-8") as f:
+                json.dump({"model": self.model_name, "rows": len(texts), "texts_sha256": texts_hash}, f)
+            logger.info(f"✅ 로컬 학과 인덱스 저장: {self.index_path}")
+        except OSError as e:
+            logger.warning(f"로컬 학과 인덱스 저장 실패: {str(e)}")
+        return embeddings
+
+    def load_prebuilt_index(self):
+        # 로컬 모델 인덱스는 시작 시 .npy 에서 바로 구성
+        return None
+
+    def embed_query(self, query: str) -> Optional[np.ndarray]:
+        embedding = self.model.encode([query], normalize_embeddings=True, convert_to_numpy=True)[0]
+        return embedding.astype("float32")
+
+    def embed_queries(self, queries: List[str]) -> Optional[np.ndarray]:
+        if not queries:
+            return None
+        embeddings = self.model.encode(queries, normalize_embeddings=True, convert_to_numpy=True)
+        return embeddings.astype("float32")
+
+
+def get_embedding_backend():
+    """EMBEDDING_BACKEND 환경변수(openai | local)로 임베딩 백엔드 선택"""
+    backend = os.getenv("EMBEDDING_BACKEND", "openai").lower()
+
+    if backend == "local":
+        try:
+            return LocalEmbeddingBackend(
+                model_name=os.getenv("LOCAL_EMBEDDING_MODEL", DEFAULT_LOCAL_MODEL),
+                cache_folder=os.getenv("LOCAL_EMBEDDING_CACHE", DEFAULT_LOCAL_CACHE)
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ 로컬 임베딩 백엔드 초기화 실패, OpenAI 사용: {str(e)}")
+
+    return OpenAIEmbeddingBackend()
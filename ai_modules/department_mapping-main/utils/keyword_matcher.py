@@ -0,0 +1,89 @@
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+
+
+class KeywordMatcher:
+    """Aho-Corasick 기반 키워드 → 학과 매처 (서버 시작 시 한 번만 빌드)
+
+    모든 키워드를 하나의 오토마톤으로 컴파일해서 쿼리를 한 번만 훑는다.
+    여러 키워드가 걸리면 가장 긴 키워드가 이기고, 길이가 같으면
+    쿼리에서 먼저 나온 것, 그다음 department_mapping.json 순서를 따른다.
+    """
+
+    def __init__(self, keyword_mapping: Dict[str, Dict[str, str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # 노드에서 끝나는 가장 긴 키워드: (키워드 길이, 설정 순서, 학과명)
+        self._output: List[Optional[Tuple[int, int, str]]] = [None]
+
+        order = 0
+        for mappings in keyword_mapping.values():
+            for keyword, dept_name in mappings.items():
+                keyword = keyword.lower()
+                if keyword:
+                    self._add(keyword, order, dept_name)
+                    order += 1
+
+        self._build_failure_links()
+        self.keyword_count = order
+
+    def _add(self, keyword: str, order: int, dept_name: str):
+        node = 0
+        for ch in keyword:
+            next_node = self._goto[node].get(ch)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][ch] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(None)
+            node = next_node
+
+        # 같은 키워드가 중복되면 먼저 나온 설정을 유지
+        if self._output[node] is None:
+            self._output[node] = (len(keyword), order, dept_name)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+
+                # 자기 키워드가 없으면 suffix 링크에서 가장 긴 키워드를 물려받음
+                if self._output[child] is None:
+                    self._output[child] = self._output[self._fail[child]]
+
+    def match(self, query: str) -> Optional[Dict[str, Any]]:
+        """쿼리에서 가장 긴 키워드 매칭 결과 반환 (없으면 None)"""
+        lowered = query.lower()
+        best = None
+        best_key = None
+        node = 0
+
+        for end, ch in enumerate(lowered):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+
+            output = self._output[node]
+            if output is None:
+                continue
+
+            length, order, dept_name = output
+            start = end - length + 1
+            key = (-length, start, order)
+            if best_key is None or key < best_key:
+                best_key = key
+                best = {
+                    "department_name": dept_name,
+                    "keyword": lowered[start:end + 1],
+                    "start": start
+                }
+
+        return best
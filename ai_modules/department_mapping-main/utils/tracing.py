@@ -0,0 +1,263 @@
+"""
+서비스 간 요청 추적 (W3C traceparent 헤더 + 로컬 JSONL 스팬 기록)
+
+- TraceMiddleware: 들어온 요청의 traceparent 를 이어받아 서버 스팬 생성 (없으면 새 trace 시작)
+- start_span: 현재 요청 안에서만 자식 스팬 생성 (요청 밖 백그라운드 작업은 기록하지 않음)
+- inject_headers: 하위 서비스 호출 헤더에 traceparent 추가
+- 스팬은 큐에 넣기만 하고 백그라운드 스레드가 TRACE_EXPORT_PATH(JSONL, 크기 회전)에 기록
+
+같은 trace_id 의 스팬을 서비스별 파일에서 모아 보기:
+    python -m utils.tracing <trace_id> logs/traces.jsonl ../llm_agent-main/logs/traces.jsonl ...
+"""
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import secrets
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "./logs/traces.jsonl")
+TRACE_EXPORT_MAX_MB = int(os.getenv("TRACE_EXPORT_MAX_MB", "50"))
+TRACE_EXPORT_BACKUPS = int(os.getenv("TRACE_EXPORT_BACKUPS", "3"))
+
+TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+_service_name = os.getenv("SERVICE_NAME", "unknown")
+_exporter = None
+
+
+class Span:
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None, kind: str = "internal",
+                 attributes: Dict = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.status = "ok"
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_error(self, error: BaseException):
+        self.status = "error"
+        self.attributes["error"] = f"{type(error).__name__}: {error}"
+
+    def end(self):
+        _export({
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "service": _service_name,
+            "name": self.name,
+            "kind": self.kind,
+            "start_time": self.start_time,
+            "duration_ms": round((time.perf_counter() - self._start) * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        })
+
+
+def _get_exporter():
+    # 첫 스팬 기록 시 생성 (요청 경로 → 큐 → 리스너 스레드 → 파일)
+    global _exporter
+    if _exporter is None:
+        os.makedirs(os.path.dirname(TRACE_EXPORT_PATH) or ".", exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            TRACE_EXPORT_PATH, maxBytes=TRACE_EXPORT_MAX_MB * 1024 * 1024,
+            backupCount=TRACE_EXPORT_BACKUPS, encoding="utf-8", delay=True
+        )
+        file_handler.setFormatter(logging.Formatter("%(message)s"))
+
+        records = queue.Queue(-1)
+        exporter = logging.getLogger("tracing.exporter")
+        exporter.setLevel(logging.INFO)
+        exporter.propagate = False
+        exporter.addHandler(logging.handlers.QueueHandler(records))
+
+        listener = logging.handlers.QueueListener(records, file_handler)
+        listener.start()
+        atexit.register(listener.stop)
+        _exporter = exporter
+    return _exporter
+
+
+def _export(record: Dict):
+    _get_exporter().info(json.dumps(record, ensure_ascii=False, default=str))
+
+
+def parse_traceparent(value: Optional[str]):
+    """traceparent → (trace_id, parent_span_id), 형식이 틀리면 None"""
+    match = TRACEPARENT_PATTERN.match((value or "").strip().lower())
+    return (match.group(1), match.group(2)) if match else None
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def start_span(name: str, kind: str = "internal", root: bool = False, parent=None, **attributes):
+    """스팬 컨텍스트 매니저 - root=False 이고 진행 중인 요청이 없으면 아무것도 기록하지 않음"""
+    current = _current_span.get()
+    if not TRACING_ENABLED or (current is None and not root):
+        yield None
+        return
+
+    if current is not None and parent is None:
+        trace_id, parent_id = current.trace_id, current.span_id
+    elif parent is not None:
+        trace_id, parent_id = parent
+    else:
+        trace_id, parent_id = secrets.token_hex(16), None
+
+    span = Span(name, trace_id, parent_id, kind, attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except Exception as e:
+        span.set_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+def detached_span(name: str, kind: str = "internal", **attributes) -> Optional[Span]:
+    """현재 스팬의 자식이지만 컨텍스트에 올리지 않는 스팬 (async generator 처럼 여러 번 재개되는 구간용)
+
+    호출 측에서 span.end() 로 종료. 진행 중인 요청이 없으면 None.
+    """
+    current = _current_span.get()
+    if not TRACING_ENABLED or current is None:
+        return None
+    return Span(name, current.trace_id, current.span_id, kind, attributes)
+
+
+def traced(name: str = None, **attributes):
+    """함수 전체를 스팬으로 감싸는 데코레이터 (동기/비동기 모두)"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with start_span(span_name, **attributes):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with start_span(span_name, **attributes):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def with_context(func):
+    """run_in_executor 로 넘길 함수에 현재 컨텍스트(진행 중인 스팬)를 붙임"""
+    return functools.partial(contextvars.copy_context().run, func)
+
+
+def inject_headers(headers: Dict = None) -> Dict:
+    """하위 서비스 호출 헤더에 traceparent 추가"""
+    headers = dict(headers or {})
+    span = _current_span.get()
+    if span is not None:
+        headers["traceparent"] = span.traceparent
+    return headers
+
+
+class TraceMiddleware:
+    """ASGI 미들웨어 - 요청마다 서버 스팬 (스트리밍 응답은 본문 전송이 끝날 때 종료)"""
+
+    def __init__(self, app, service_name: str = None):
+        global _service_name
+        self.app = app
+        if service_name:
+            _service_name = service_name
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not TRACING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope.get("headers", [])}
+        parent = parse_traceparent(headers.get("traceparent"))
+        status_code = 500
+
+        with start_span(f"{scope.get('method', '')} {scope.get('path', '')}", kind="server",
+                        root=True, parent=parent) as span:
+            async def send_with_trace_id(message):
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    message = {
+                        **message,
+                        "headers": list(message.get("headers", [])) + [(b"x-trace-id", span.trace_id.encode())]
+                    }
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_trace_id)
+            finally:
+                span.attributes["http.status_code"] = status_code
+                if status_code >= 500:
+                    span.status = "error"
+
+
+def print_waterfall(trace_id: str, paths):
+    """여러 서비스의 JSONL 에서 trace_id 스팬을 모아 시간순 계층으로 출력"""
+    spans = []
+    for path in paths:
+        for candidate in (path, *(f"{path}.{i}" for i in range(1, TRACE_EXPORT_BACKUPS + 1))):
+            if not os.path.exists(candidate):
+                continue
+            with open(candidate, "r", encoding="utf-8") as f:
+                for line in f:
+                    record = json.loads(line)
+                    if record.get("trace_id") == trace_id:
+                        spans.append(record)
+
+    if not spans:
+        print(f"❌ trace {trace_id} 스팬 없음")
+        return
+
+    children = {}
+    span_ids = {span["span_id"] for span in spans}
+    for span in sorted(spans, key=lambda s: s["start_time"]):
+        parent_id = span["parent_id"] if span["parent_id"] in span_ids else None
+        children.setdefault(parent_id, []).append(span)
+    origin = min(span["start_time"] for span in spans)
+
+    def _print(parent_id, depth):
+        for span in children.get(parent_id, []):
+            offset_ms = (span["start_time"] - origin) * 1000
+            mark = "❌" if span["status"] == "error" else "  "
+            print(f"{mark} {offset_ms:9.1f}ms {span['duration_ms']:9.1f}ms  {'  ' * depth}"
+                  f"[{span['service']}] {span['name']}")
+            _print(span["span_id"], depth + 1)
+
+    _print(None, 0)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("사용법: python -m utils.tracing <trace_id> <traces.jsonl> [<traces.jsonl> ...]")
+        sys.exit(1)
+    print_waterfall(sys.argv[1], sys.argv[2:])
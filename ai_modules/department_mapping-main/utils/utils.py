@@ -1,11 +1,47 @@
+import hashlib
 import json
 import os
 import pickle
 import numpy as np
 import faiss
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 from langchain_openai import OpenAIEmbeddings
 
+DATA_DIR = os.path.join(os.path.dirname(__file__), "../data")
+# utils/convert_dataset.py 가 goal_Dataset.pkl 에서 만들어내는 빠른 시작용 파일
+# (컨테이너는 data/ 를 호스트에서 마운트하므로 이미지 빌드 시 마운트되지 않는 경로에 생성 - Dockerfile 참고)
+FAST_DATA_DIR = os.getenv("GOAL_FAST_DATA_DIR", DATA_DIR)
+FAST_EMBEDDINGS_PATH = os.path.join(FAST_DATA_DIR, "goal_embeddings.npy")
+FAST_LOOKUP_PATH = os.path.join(FAST_DATA_DIR, "goal_lookup.json")
+FAST_INDEX_PATH = os.path.join(FAST_DATA_DIR, "goal_faiss.index")
+# 변환 당시 원본 pkl 의 sha256 (다르면 위 파일들은 무시하고 pkl 로 폴백)
+FAST_META_PATH = os.path.join(FAST_DATA_DIR, "goal_fast_meta.json")
+PKL_PATH = os.path.join(DATA_DIR, "goal_Dataset.pkl")
+
+def source_fingerprint(pkl_path: str = PKL_PATH) -> str:
+    """원본 pkl 의 sha256"""
+    digest = hashlib.sha256()
+    with open(pkl_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+@lru_cache(maxsize=1)
+def fast_files_valid() -> bool:
+    """변환 파일이 현재 goal_Dataset.pkl 에서 만들어졌는지 확인 (프로세스당 한 번)"""
+    try:
+        with open(FAST_META_PATH, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get("source_sha256") == source_fingerprint():
+            return True
+        print("⚠️ 변환 파일이 현재 goal_Dataset.pkl 과 다름 → pkl 사용 (python -m utils.convert_dataset 로 재생성)")
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"변환 파일 메타 확인 오류: {str(e)}")
+    return False
+
 def load_config() -> Dict[str, Any]:
     """JSON 설정 파일에서 키워드 매핑 로드 (중첩 구조 유지)"""
     try:
@@ -22,6 +58,14 @@ def load_config() -> Dict[str, Any]:
         }
 def load_data() -> List[Dict[str, Any]]:
     """JSON 파일에서 학과 데이터 로드 (FAISS 인덱스와 동기화)"""
+    # 현재 pkl 에서 변환된 lookup 테이블이 있으면 우선 사용
+    if fast_files_valid() and os.path.exists(FAST_LOOKUP_PATH):
+        try:
+            with open(FAST_LOOKUP_PATH, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"lookup 테이블 로드 오류: {str(e)}")
+
     try:
         data_path = os.path.join(os.path.dirname(__file__), "../data/depart_info.json")
         with open(data_path, 'r', encoding='utf-8') as f:
@@ -31,18 +75,32 @@ def load_data() -> List[Dict[str, Any]]:
         print(f"데이터 로드 중 오류 발생: {str(e)}")
         # Fallback to PKL file
         try:
-            pkl_path = os.path.join(os.path.dirname(__file__), "../data/goal_Dataset.pkl")
-            with open(pkl_path, 'rb') as f:
+            with open(PKL_PATH, 'rb') as f:
                 pkl_data = pickle.load(f)
             return pkl_data.get('lookup_index', [])
         except:
             return []
 
+def build_department_index(departments_data: List[Dict[str, Any]]) -> Dict[str, str]:
+    """학과명 → 학과 설명 해시 인덱스 생성 (중복 학과명은 먼저 나온 항목 유지)"""
+    index = {}
+    for dept in departments_data:
+        # PKL 파일 형식 (department_name, text) 또는 JSON 형식 (학과, 학과설명) 모두 지원
+        dept_name = dept.get("department_name") or dept.get("학과")
+        if dept_name and dept_name not in index:
+            index[dept_name] = dept.get("text") or dept.get("학과설명", "학과 설명을 찾을 수 없습니다.")
+    return index
+
 def load_embeddings() -> Optional[np.ndarray]:
-    """실제 임베딩 데이터 로드"""
+    """실제 임베딩 데이터 로드 (현재 pkl 에서 변환된 .npy 가 있으면 mmap 으로 복사 없이 로드)"""
+    if fast_files_valid() and os.path.exists(FAST_EMBEDDINGS_PATH):
+        try:
+            return np.load(FAST_EMBEDDINGS_PATH, mmap_mode='r')
+        except Exception as e:
+            print(f"임베딩 .npy 로드 오류: {str(e)}")
+
     try:
-        data_path = os.path.join(os.path.dirname(__file__), "../data/goal_Dataset.pkl")
-        with open(data_path, 'rb') as f:
+        with open(PKL_PATH, 'rb') as f:
             data = pickle.load(f)
         return data.get('embeddings')
     except Exception as e:
@@ -54,20 +112,43 @@ def build_faiss_index(embeddings: np.ndarray) -> Optional[faiss.Index]:
     if embeddings is not None:
         print(f"✅ 저장된 임베딩 차원: {embeddings.shape}")
         index = faiss.IndexFlatIP(embeddings.shape[1])
-        index.add(embeddings.astype('float32'))
+        # 이미 float32 연속 배열이면 복사하지 않음
+        index.add(np.ascontiguousarray(embeddings, dtype='float32'))
         return index
     return None
 
+def load_faiss_index() -> Optional[faiss.Index]:
+    """직렬화된 FAISS 인덱스 로드 (없거나 pkl 과 맞지 않으면 None)"""
+    if not fast_files_valid() or not os.path.exists(FAST_INDEX_PATH):
+        return None
+    try:
+        return faiss.read_index(FAST_INDEX_PATH)
+    except Exception as e:
+        print(f"FAISS 인덱스 로드 오류: {str(e)}")
+        return None
+
+# 프로세스 전체에서 재사용하는 OpenAI 임베딩 클라이언트 (요청마다 생성하지 않음)
+_openai_embeddings: Optional[OpenAIEmbeddings] = None
+
+def get_openai_embeddings() -> OpenAIEmbeddings:
+    """OpenAI 임베딩 클라이언트 반환 (최초 호출 시 한 번만 생성)"""
+    global _openai_embeddings
+    if _openai_embeddings is None:
+        # 저장된 데이터와 일치하는 3072 차원 모델 사용
+        _openai_embeddings = OpenAIEmbeddings(
+            model="text-embedding-3-large",
+            api_key=os.getenv("OPENAI_API_KEY")
+        )
+    return _openai_embeddings
+
 def get_query_embedding(query: str) -> Optional[np.ndarray]:
     """쿼리 임베딩 생성 (OpenAI 임베딩 사용)"""
-    # OpenAI 임베딩 모델 초기화 - 저장된 데이터와 일치하는 3072 차원 모델 사용
-    embeddings = OpenAIEmbeddings(
-        model="text-embedding-3-large",
-        api_key=os.getenv("OPENAI_API_KEY")
-    )
+    query_embedding = get_openai_embeddings().embed_query(query)
+    return np.array(query_embedding, dtype='float32')
 
-    # 쿼리 임베딩 생성
-    query_embedding = embeddings.embed_query(query)
-    result = np.array(query_embedding, dtype='float32')
-    print(f"✅ 쿼리 임베딩 차원: {result.shape}")
-    return result
\ No newline at end of file
+def get_query_embeddings(queries: List[str]) -> Optional[np.ndarray]:
+    """여러 쿼리 임베딩을 한 번의 호출로 생성 (행 단위 float32 행렬)"""
+    if not queries:
+        return None
+    query_embeddings = get_openai_embeddings().embed_documents(queries)
+    return np.array(query_embeddings, dtype='float32')
@@ -5,12 +5,16 @@ from fastapi import FastAPI
 
 from controller.searchController import router as agent_router
 from util.logging_setup import init_logging
+from util.tracing import TraceMiddleware
 
 # 로깅 초기화
 logger = init_logging(service_name=os.getenv("SERVICE_NAME", "faiss-search"))
 
 app = FastAPI()
 
+# llm_agent 가 보낸 traceparent 이어받기 (스팬은 TRACE_EXPORT_PATH 에 기록)
+app.add_middleware(TraceMiddleware, service_name="faiss_search")
+
 # 라우터 목록 등록
 app.include_router(agent_router)
 
@@ -5,6 +5,7 @@ import requests
 from typing import Dict, List
 from util.langchainLlmClient import LangchainLlmClient
 from util.utils import load_prompt, extract_sql_from_response, prepare_vectors
+from util.tracing import start_span
 
 logger = logging.getLogger(__name__)
 
@@ -35,14 +36,15 @@ class SearchService:
         # 1. LLM으로 SQL 생성
         prompt = load_prompt("sql_prefilter_generator")
         full_prompt = f"{prompt}\n\n사용자 쿼리: {query_text}"
-        response = self.llm_client.get_llm().invoke(full_prompt)
+        with start_span("llm.sql_prefilter", kind="client"):
+            response = self.llm_client.get_llm().invoke(full_prompt)
 
         sql_query = extract_sql_from_response(response.content)
         logger.info(f"추출된 SQL: {sql_query}")
 
 
         # 2. SQL 실행
-        with self.db_client.connection.cursor() as cursor:
+        with start_span("db.query", kind="client"), self.db_client.connection.cursor() as cursor:
             logger.info(f"SQL 생성됨: {sql_query}")
             cursor.execute(sql_query)
             return cursor.fetchall()
@@ -54,24 +56,26 @@ class SearchService:
             return []
 
         # FAISS 검색 - LangChain 임베딩 사용
-        query_vector = np.array(
-            self.llm_client.get_embeddings().embed_query(query_text),
-            dtype=np.float32
-        )
+        with start_span("embedding.embed_query", kind="client"):
+            query_vector = np.array(
+                self.llm_client.get_embeddings().embed_query(query_text),
+                dtype=np.float32
+            )
         if query_vector is None:
             return []
 
-        # 인덱스 생성 및 검색
-        vectors_array = np.array(vectors)
-        index = faiss.IndexFlatIP(vectors_array.shape[1])
-        index.add(vectors_array)
+        with start_span("faiss.search", candidates=len(vectors)):
+            # 인덱스 생성 및 검색
+            vectors_array = np.array(vectors)
+            index = faiss.IndexFlatIP(vectors_array.shape[1])
+            index.add(vectors_array)
 
-        # 쿼리 벡터 정규화
-        query_vector = query_vector.reshape(1, -1).astype(np.float32)
-        query_vector = query_vector / np.linalg.norm(query_vector)
+            # 쿼리 벡터 정규화
+            query_vector = query_vector.reshape(1, -1).astype(np.float32)
+            query_vector = query_vector / np.linalg.norm(query_vector)
 
-        # 검색 실행
-        scores, indices = index.search(query_vector, min(count, len(vectors)))
+            # 검색 실행
+            scores, indices = index.search(query_vector, min(count, len(vectors)))
 
         # 결과 구성
         results = []
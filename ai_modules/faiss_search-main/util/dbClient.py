@@ -3,6 +3,8 @@ import os
 import pymysql
 from dotenv import load_dotenv
 
+from util.tracing import start_span
+
 load_dotenv()  # .env 파일 자동 로드
 
 
@@ -54,7 +56,7 @@ class DbClient:
         if not self.ensure_connection():
             return None
         try:
-            with self.connection.cursor() as cursor:
+            with start_span("db.query", kind="client", db=self.database), self.connection.cursor() as cursor:
                 cursor.execute(query, params)
                 return cursor.fetchall()
         except pymysql.MySQLError:
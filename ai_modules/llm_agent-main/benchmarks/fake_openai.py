@@ -0,0 +1,242 @@
+"""
+오프라인 벤치마크용 OpenAI 호환 가짜 서버 (비용/네트워크 없이 에이전트 부하 측정)
+
+- POST /v1/chat/completions: 일반/스트리밍(SSE), response_format=json_object/json_schema 지원
+- POST /v1/embeddings: 텍스트 해시로 만든 결정적 단위 벡터
+- 응답 지연 = 첫 토큰 지연(latency_ms, ±jitter) + 토큰 수 / tokens_per_sec
+
+프롬프트 종류(라우터/쿼리 확장/히스토리 분석/통합 분석/Light 검증)를 알아보고 에이전트가 파싱할 수 있는 JSON 을 돌려준다.
+라우터 응답은 질문 키워드로 경로를 골라 실제 트래픽처럼 경로가 섞이게 한다.
+
+실행 (llm_agent-main 디렉토리에서):
+    python -m benchmarks.fake_openai --port 9100 --latency-ms 300 --tokens-per-sec 60
+에이전트는 OPENAI_BASE_URL=http://127.0.0.1:9100/v1 OPENAI_API_KEY=bench 로 띄운다.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import struct
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+app = FastAPI(title="Fake OpenAI (benchmark)")
+
+CONFIG = {
+    "latency_ms": 300.0,
+    "jitter": 0.2,
+    "tokens_per_sec": 60.0,
+    "answer_tokens": 120,
+    "embedding_dim": 1536,
+}
+
+ANSWER_WORDS = (
+    "전북대학교", "컴퓨터인공지능학부", "교과목", "선수과목", "학점", "이수", "추천", "기계학습", "자료구조",
+    "알고리즘", "운영체제", "데이터베이스", "캡스톤디자인", "3학년", "2학기", "전공필수", "전공선택", "과목을",
+    "수강하면", "좋습니다.", "먼저", "기초를", "다진", "뒤", "심화", "과정으로", "넘어가세요.",
+)
+
+# 라우터 응답 - (질문 키워드, complexity, owner_hint, category, plan 에이전트 목록)
+ROUTE_RULES = (
+    (("커리큘럼", "로드맵", "복수전공", "융합"), "medium", "CURRICULUM_PLAN", "curriculum_design", ["CURRICULUM_PLAN"]),
+    (("컴공", "전전", "소공"), "heavy", "DEPARTMENT_MAPPING+SQL_QUERY", "course_lookup",
+     ["DEPARTMENT_MAPPING", "SQL_QUERY"]),
+    (("교수", "학년", "학기", "학점"), "medium", "SQL_QUERY", "course_lookup", ["SQL_QUERY"]),
+    (("추천", "관련", "쉬운", "배우"), "medium", "FAISS_SEARCH", "course_content", ["FAISS_SEARCH"]),
+    (("무슨 학과", "학과 소개", "학과"), "medium", "DEPARTMENT_MAPPING", "course_lookup", ["DEPARTMENT_MAPPING"]),
+)
+
+
+def _route_decision(query: str) -> dict:
+    for keywords, complexity, owner_hint, category, agents in ROUTE_RULES:
+        if any(keyword in query for keyword in keywords):
+            return {
+                "complexity": complexity,
+                "owner_hint": owner_hint,
+                "category": category,
+                "reasoning": "벤치마크 규칙 라우팅",
+                "plan": [{"step": i + 1, "agent": agent, "goal": query[:30]} for i, agent in enumerate(agents)],
+                "execution_type": "sequential",
+            }
+    return {"complexity": "light", "owner_hint": "LLM_FALLBACK", "category": "general",
+            "reasoning": "일반 대화", "plan": [], "execution_type": "sequential"}
+
+
+def _section(prompt: str, marker: str) -> str:
+    """marker 다음 줄부터 빈 줄 전까지 (프롬프트에 삽입된 사용자 질문 추출)"""
+    _, _, rest = prompt.partition(marker)
+    return rest.strip().split("\n\n")[0].strip()
+
+
+def _reply(prompt: str, json_mode: bool) -> str:
+    """프롬프트 종류별 응답 본문"""
+    if "FUSED ANALYZER" in prompt:
+        query = _section(prompt, "## 현재 질문:")
+        return json.dumps({
+            "is_continuation": False,
+            "reconstructed_query": query,
+            "history_usage": {"reuse_previous": False, "relationship": "new_search", "context_integration": "새로운 검색"},
+            "routing": _route_decision(query),
+            "expansion": {
+                "expansion_context": f"{query} 관련 전북대학교 교과 정보",
+                "expansion_keywords": "전공, 교과목, 선수과목, 학점",
+                "expansion_augmentation": f"(Definition: {query[:20]}, Topic: 교과, Outcome: 수강 계획, Department: null)",
+                "decision_question_type": "Exploratory",
+                "decision_data_source": "Hybrid",
+            },
+        }, ensure_ascii=False)
+    if "ACADEMIC QUERY ROUTER" in prompt:
+        return json.dumps(_route_decision(_section(prompt, "Query:")), ensure_ascii=False)
+    if "query expansion specialist" in prompt:
+        query = _section(prompt, "[USER QUERY]")
+        return json.dumps({
+            "expansion_context": f"{query} 관련 전북대학교 교과 정보",
+            "expansion_keywords": "전공, 교과목, 선수과목, 학점",
+            "expansion_augmentation": f"(Definition: {query[:20]}, Topic: 교과, Outcome: 수강 계획, Department: null)",
+            "decision_question_type": "Exploratory",
+            "decision_data_source": "Hybrid",
+        }, ensure_ascii=False)
+    if "reconstructed_query" in prompt:
+        return json.dumps({
+            "is_continuation": False,
+            "reconstructed_query": _section(prompt, "## 현재 질문:"),
+            "history_usage": {"reuse_previous": False, "relationship": "new_search", "context_integration": "새로운 검색"},
+        }, ensure_ascii=False)
+    if "is_general_chat" in prompt:
+        return json.dumps({"is_general_chat": False, "reason": "학업 관련 질문"}, ensure_ascii=False)
+    if json_mode:
+        return json.dumps({"result": "ok"})
+
+    rng = random.Random(hashlib.md5(prompt.encode("utf-8")).digest())
+    return " ".join(rng.choice(ANSWER_WORDS) for _ in range(CONFIG["answer_tokens"]))
+
+
+def _tokens(text: str) -> list:
+    # 공백 단위를 토큰으로 취급 (JSON 은 짧은 조각으로)
+    return re.findall(r"\S+\s*", text) or [text]
+
+
+def _first_token_delay() -> float:
+    jitter = CONFIG["jitter"]
+    return max(0.0, CONFIG["latency_ms"] / 1000 * random.uniform(1 - jitter, 1 + jitter))
+
+
+def _prompt_text(messages) -> str:
+    parts = []
+    for message in messages:
+        content = message.get("content", "")
+        if isinstance(content, list):
+            content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+        parts.append(content or "")
+    return "\n".join(parts)
+
+
+def _usage(prompt: str, completion_tokens: int) -> dict:
+    prompt_tokens = len(_tokens(prompt))
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "gpt-4o-mini")
+    prompt = _prompt_text(body.get("messages", []))
+    json_mode = (body.get("response_format") or {}).get("type") in ("json_object", "json_schema")
+    tokens = _tokens(_reply(prompt, json_mode))
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+    created = int(time.time())
+    token_interval = 1 / CONFIG["tokens_per_sec"] if CONFIG["tokens_per_sec"] > 0 else 0.0
+
+    if not body.get("stream"):
+        await asyncio.sleep(_first_token_delay() + token_interval * len(tokens))
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(tokens)},
+                         "finish_reason": "stop"}],
+            "usage": _usage(prompt, len(tokens)),
+        }
+
+    include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+
+    def _chunk(delta: dict, finish_reason=None, usage=None) -> str:
+        data = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if usage is None else []}
+        if usage is not None:
+            data["usage"] = usage
+        return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    async def generate():
+        await asyncio.sleep(_first_token_delay())
+        yield _chunk({"role": "assistant", "content": ""})
+        for token in tokens:
+            yield _chunk({"content": token})
+            await asyncio.sleep(token_interval)
+        yield _chunk({}, finish_reason="stop")
+        if include_usage:
+            yield _chunk({}, usage=_usage(prompt, len(tokens)))
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(generate(), media_type="text/event-stream")
+
+
+def _embedding(text: str, dim: int) -> list:
+    """텍스트 해시를 시드로 한 결정적 단위 벡터 (같은 텍스트 → 같은 벡터)"""
+    seed = struct.unpack("<Q", hashlib.sha256(text.encode("utf-8")).digest()[:8])[0]
+    rng = random.Random(seed)
+    vector = [rng.gauss(0, 1) for _ in range(dim)]
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+@app.post("/v1/embeddings")
+async def embeddings(request: Request):
+    body = await request.json()
+    inputs = body.get("input", [])
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    dim = body.get("dimensions") or CONFIG["embedding_dim"]
+    await asyncio.sleep(_first_token_delay() / 3)
+    return {
+        "object": "list",
+        "model": body.get("model", "text-embedding-3-small"),
+        "data": [{"object": "embedding", "index": i, "embedding": _embedding(str(text), dim)}
+                 for i, text in enumerate(inputs)],
+        "usage": {"prompt_tokens": sum(len(_tokens(str(text))) for text in inputs),
+                  "total_tokens": sum(len(_tokens(str(text))) for text in inputs)},
+    }
+
+
+@app.get("/v1/models")
+async def models():
+    return {"object": "list", "data": [{"id": "gpt-4o-mini", "object": "model", "owned_by": "benchmark"}]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오프라인 벤치마크용 OpenAI 호환 가짜 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=CONFIG["latency_ms"], help="첫 토큰까지 지연")
+    parser.add_argument("--jitter", type=float, default=CONFIG["jitter"], help="지연 변동 비율 (0.2 = ±20%%)")
+    parser.add_argument("--tokens-per-sec", type=float, default=CONFIG["tokens_per_sec"], help="생성 속도 (0 = 즉시)")
+    parser.add_argument("--answer-tokens", type=int, default=CONFIG["answer_tokens"], help="일반 답변 길이 (토큰)")
+    parser.add_argument("--embedding-dim", type=int, default=CONFIG["embedding_dim"])
+    args = parser.parse_args()
+
+    CONFIG.update(latency_ms=args.latency_ms, jitter=args.jitter, tokens_per_sec=args.tokens_per_sec,
+                  answer_tokens=args.answer_tokens, embedding_dim=args.embedding_dim)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+로컬 의도 분류기 학습/평가 - LLM 라우터 결정과 얼마나 일치하는지 오프라인으로 측정
+
+데이터 (JSONL, 두 형식 섞어도 됨):
+- 트래픽 녹화 (utils/recorder.py): 마지막 사용자 질문 + 그 요청에서 라우터 LLM 이 낸 결정
+  (연속대화로 재구성된 요청은 원래 질문과 라우팅 대상이 달라 제외, TRAFFIC_RECORD_SAMPLE_RATE 를 올려 모은다)
+- 라벨 파일: {"query": ..., "route": ...} (label 명령 출력)
+
+명령:
+    label: 질문 코퍼스를 현재 라우터 프롬프트(router_prompt)로 분류해 라벨 파일 생성
+    train: 경로별 임베딩 중심 벡터 계산 → INTENT_CENTROIDS_PATH 에 둘 JSON
+    eval:  규칙표 + 중심 벡터 분류기를 돌려 적용률(로컬 결정 비율)과 LLM 라우터 일치율 보고
+
+실행 (llm_agent-main 디렉토리에서):
+    python -m benchmarks.intent_eval label benchmarks/queries.jsonl --output logs/router_labels.jsonl
+    python -m benchmarks.intent_eval train logs/traffic.jsonl logs/router_labels.jsonl --holdout 0.2 --output data/intent_centroids.json
+    python -m benchmarks.intent_eval eval logs/traffic.jsonl logs/router_labels.jsonl --holdout 0.2 --centroids data/intent_centroids.json
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+from benchmarks.loadgen import load_queries
+from config.settings import settings
+from service.handlers.query_analyzer.intent_classifier import LOCAL_ROUTES, IntentClassifier, build_centroids
+from service.nodes.node_manager import select_route
+from utils.json_utils import extract_json_block, to_router_decision
+
+EMBED_BATCH = 64
+
+
+def decision_route(data: Dict) -> str:
+    """라우터 JSON → 그래프가 실제로 갈 노드 (router_node 의 복잡도 승격 포함)"""
+    decision = to_router_decision(data)
+    complexity = decision["complexity"]
+    if complexity == "medium" and len(decision["plan"]) > 1:
+        complexity = "heavy"
+    return select_route({"route": complexity, "owner_hint": decision["owner_hint"], "plan": decision["plan"]})
+
+
+def _from_recording(recording: Dict) -> Optional[Dict]:
+    user_messages = [m["content"] for m in recording.get("request", {}).get("messages", []) if m.get("role") == "user"]
+    if not user_messages:
+        return None
+
+    route = None
+    for exchange in recording.get("exchanges", []):
+        if exchange.get("kind") != "llm":
+            continue
+        data = extract_json_block(exchange.get("response", "")) or {}
+        if data.get("is_continuation"):
+            return None
+        if isinstance(data.get("routing"), dict):  # 통합 분석기
+            data = data["routing"]
+        if "complexity" in data and "owner_hint" in data:
+            route = decision_route(data)
+    return {"query": user_messages[-1], "route": route, "source": "traffic"} if route else None
+
+
+def load_samples(paths: List[str]) -> List[Dict]:
+    """트래픽 녹화/라벨 파일 → [{"query", "route"}] (같은 질문은 마지막 결정만)"""
+    samples = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                sample = _from_recording(record) if "exchanges" in record else (
+                    {"query": record["query"], "route": record["route"], "source": "label"}
+                    if record.get("query") and record.get("route") else None
+                )
+                if sample:
+                    samples[sample["query"].strip()] = sample
+    return list(samples.values())
+
+
+def in_holdout(query: str, holdout: float) -> bool:
+    """질문 해시로 고정 분할 (train/eval 이 같은 분할을 쓰도록)"""
+    return int(hashlib.md5(query.encode("utf-8")).hexdigest(), 16) % 1000 < holdout * 1000
+
+
+async def _embed(classifier: IntentClassifier, texts: List[str]) -> List[List[float]]:
+    vectors = []
+    for i in range(0, len(texts), EMBED_BATCH):
+        vectors.extend(await classifier.embeddings.aembed_documents(texts[i:i + EMBED_BATCH]))
+    return vectors
+
+
+async def label(args):
+    from service.handlers import LlmClient
+    from service.handlers.query_analyzer import analyze_routing_async
+
+    llm_client = LlmClient(max_tokens=2000)
+    queries = load_queries(args.queries)
+    with open(args.output, "w", encoding="utf-8") as f:
+        for query in queries:
+            decision = await analyze_routing_async(llm_client, query)
+            route = decision_route(decision)
+            f.write(json.dumps({"query": query, "route": route, "decision": decision}, ensure_ascii=False) + "\n")
+            print(f"🏷️ {route:18s} {query}")
+    print(f"\n💾 라벨 {len(queries)}건 저장: {args.output}")
+
+
+async def train(args):
+    samples = [s for s in load_samples(args.data) if s["route"] in LOCAL_ROUTES and not in_holdout(s["query"], args.holdout)]
+    if not samples:
+        raise SystemExit("학습할 샘플이 없습니다 (로컬 경로로 라우팅된 결정이 필요)")
+
+    classifier = IntentClassifier(embedding_model=args.model)
+    vectors = await _embed(classifier, [s["query"] for s in samples])
+    vectors_by_route = defaultdict(list)
+    for sample, vector in zip(samples, vectors):
+        vectors_by_route[sample["route"]].append(vector)
+
+    routes = build_centroids(vectors_by_route)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"model": args.model, "created_at": time.time(), "samples": len(samples), "routes": routes}, f)
+    print(f"💾 중심 벡터 저장: {args.output} | " + ", ".join(f"{r}={e['count']}" for r, e in sorted(routes.items())))
+
+
+async def evaluate(args):
+    samples = load_samples(args.data)
+    if args.holdout:
+        samples = [s for s in samples if in_holdout(s["query"], args.holdout)]
+    if not samples:
+        raise SystemExit("평가할 샘플이 없습니다")
+
+    classifier = IntentClassifier(
+        centroids_path=args.centroids, embedding_model=args.model, threshold=args.threshold, margin=args.margin
+    )
+    by_method = defaultdict(lambda: {"decided": 0, "agree": 0})
+    by_route = defaultdict(lambda: {"total": 0, "decided": 0, "agree": 0})
+    confusion, disagreements = Counter(), []
+
+    for sample in samples:
+        decision = await classifier.classify(sample["query"])
+        route_stats = by_route[sample["route"]]
+        route_stats["total"] += 1
+        if decision is None:
+            continue
+        method, local_route = decision["local_method"], decision["local_route"]
+        agree = local_route == sample["route"]
+        route_stats["decided"] += 1
+        route_stats["agree"] += agree
+        by_method[method]["decided"] += 1
+        by_method[method]["agree"] += agree
+        if not agree:
+            confusion[f"{sample['route']} → {local_route}"] += 1
+            disagreements.append({"query": sample["query"], "llm": sample["route"], "local": local_route,
+                                  "method": method, "confidence": decision["local_confidence"]})
+
+    decided = sum(stats["decided"] for stats in by_method.values())
+    agreed = sum(stats["agree"] for stats in by_method.values())
+    report = {
+        "samples": len(samples),
+        "coverage": round(decided / len(samples), 4),
+        "agreement": round(agreed / decided, 4) if decided else None,
+        "threshold": args.threshold,
+        "margin": args.margin,
+        "by_method": dict(by_method),
+        "by_route": dict(by_route),
+        "confusion": dict(confusion.most_common()),
+        "disagreements": disagreements,
+    }
+
+    print(f"\n🧭 샘플 {report['samples']}건 | 로컬 결정 {decided}건 (적용률 {report['coverage']:.1%}) | "
+          f"LLM 라우터 일치율 {report['agreement'] if report['agreement'] is None else format(report['agreement'], '.1%')}")
+    for method, stats in sorted(by_method.items()):
+        print(f"   {method:9s} 결정 {stats['decided']:4d}  일치 {stats['agree']:4d}")
+    for route, stats in sorted(by_route.items()):
+        print(f"   {route:18s} 전체 {stats['total']:4d}  로컬 {stats['decided']:4d}  일치 {stats['agree']:4d}")
+    for item in disagreements[:args.show]:
+        print(f"   ❌ [{item['method']}] LLM={item['llm']} 로컬={item['local']} | {item['query']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 결과 저장: {args.output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 의도 분류기 학습/평가")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    label_parser = commands.add_parser("label", help="질문 코퍼스를 LLM 라우터로 라벨링")
+    label_parser.add_argument("queries", help="질문 코퍼스 (JSONL 또는 텍스트)")
+    label_parser.add_argument("--output", required=True)
+
+    for name, help_text in (("train", "경로별 임베딩 중심 벡터 학습"), ("eval", "LLM 라우터와 일치율 평가")):
+        sub = commands.add_parser(name, help=help_text)
+        sub.add_argument("data", nargs="+", help="트래픽 녹화 또는 라벨 JSONL")
+        sub.add_argument("--holdout", type=float, default=0.0, help="평가용으로 떼어 둘 비율 (train 은 제외, eval 은 이것만)")
+        sub.add_argument("--model", default=settings.intent_embedding_model)
+        sub.add_argument("--output", required=name == "train")
+    eval_parser = commands.choices["eval"]
+    eval_parser.add_argument("--centroids", help="중심 벡터 JSON (없으면 규칙표만)")
+    eval_parser.add_argument("--threshold", type=float, default=settings.intent_centroid_threshold)
+    eval_parser.add_argument("--margin", type=float, default=settings.intent_centroid_margin)
+    eval_parser.add_argument("--show", type=int, default=20, help="출력할 불일치 예시 수")
+
+    args = parser.parse_args()
+    asyncio.run({"label": label, "train": train, "eval": evaluate}[args.command](args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+에이전트 부하 생성기 - 질문 코퍼스를 /v1/chat/completions 로 재생하고 지연 분포 보고
+
+- 동시성(--concurrency)만큼 워커가 코퍼스를 순서대로 나눠 전송 (총 --requests 건, 기본 코퍼스 크기)
+- 스트리밍: TTFT(첫 content 조각까지) + 전체 완료 시간, 비스트리밍: 전체 응답 시간
+- 요청마다 새 chat_id (히스토리가 쌓여 뒤 요청이 느려지지 않게, --shared-session 으로 끔)
+- 결과: p50/p95/p99, 평균, req/s, 오류 수 (--output 으로 JSON 저장 → 변경 전후 비교)
+
+실행 (llm_agent-main 디렉토리에서, fake_openai + stub_services + 에이전트 실행 후):
+    python -m benchmarks.loadgen --mode both --concurrency 8 --requests 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+import uuid
+from typing import Dict, List, Optional
+
+import httpx
+
+DEFAULT_QUERIES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "queries.jsonl")
+
+
+def load_queries(path: str) -> List[str]:
+    """JSONL({"query": ...}) 또는 한 줄에 질문 하나인 텍스트 파일"""
+    queries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            queries.append(json.loads(line)["query"] if line.startswith("{") else line)
+    if not queries:
+        raise ValueError(f"질문 코퍼스가 비어 있습니다: {path}")
+    return queries
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """선형 보간 백분위수 (값이 없으면 None)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+async def _send(client: httpx.AsyncClient, url: str, query: str, stream: bool, session_id: str) -> Dict:
+    body = {"model": "ai-mentor", "messages": [{"role": "user", "content": query}],
+            "stream": stream, "chat_id": session_id}
+    return await send_chat(client, url, body)
+
+
+async def send_chat(client: httpx.AsyncClient, url: str, body: Dict) -> Dict:
+    """채팅 요청 하나 - {"latency", "ttft"(스트리밍만), "chars", "content"} (초 단위)"""
+    stream = bool(body.get("stream"))
+    start = time.perf_counter()
+    ttft = None
+    parts = []
+
+    if not stream:
+        response = await client.post(url, json=body)
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}")
+        content = response.json()["choices"][0]["message"]["content"]
+        return {"latency": time.perf_counter() - start, "ttft": None, "chars": len(content), "content": content}
+
+    async with client.stream("POST", url, json=body) as response:
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}")
+        async for line in response.aiter_lines():
+            if not line.startswith("data: ") or line == "data: [DONE]":
+                continue
+            data = json.loads(line[6:])
+            if "error" in data:
+                raise RuntimeError(data["error"])
+            content = (data.get("choices") or [{}])[0].get("delta", {}).get("content")
+            if content:
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+                parts.append(content)
+    content = "".join(parts)
+    return {"latency": time.perf_counter() - start, "ttft": ttft, "chars": len(content), "content": content}
+
+
+async def run_load(url: str, queries: List[str], stream: bool, concurrency: int, total: int,
+                   shared_session: bool = False, timeout: float = 300.0) -> Dict:
+    """total 건을 concurrency 개 워커로 보내고 요약 통계 반환"""
+    samples, errors = [], {}
+    next_index = 0
+    run_id = uuid.uuid4().hex[:8]
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal next_index
+        while next_index < total:
+            index = next_index
+            next_index += 1
+            session_id = f"bench-{run_id}" if shared_session else f"bench-{run_id}-{index}"
+            try:
+                samples.append(await _send(client, url, queries[index % len(queries)], stream, session_id))
+            except Exception as e:
+                reason = str(e) or type(e).__name__
+                errors[reason] = errors.get(reason, 0) + 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return summarize(samples, errors, elapsed, stream, concurrency)
+
+
+def summarize(samples: List[Dict], errors: Dict[str, int], elapsed: float, stream: bool, concurrency: int) -> Dict:
+    latencies = [sample["latency"] for sample in samples]
+    ttfts = [sample["ttft"] for sample in samples if sample["ttft"] is not None]
+
+    def _ms(value):
+        return round(value * 1000, 1) if value is not None else None
+
+    summary = {
+        "mode": "stream" if stream else "non-stream",
+        "concurrency": concurrency,
+        "requests": len(samples) + sum(errors.values()),
+        "ok": len(samples),
+        "errors": errors,
+        "elapsed_sec": round(elapsed, 2),
+        "req_per_sec": round(len(samples) / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": {f"p{p}": _ms(percentile(latencies, p)) for p in (50, 95, 99)},
+        "avg_chars": round(sum(sample["chars"] for sample in samples) / len(samples)) if samples else 0,
+    }
+    summary["latency_ms"]["mean"] = _ms(sum(latencies) / len(latencies)) if latencies else None
+    if stream:
+        summary["ttft_ms"] = {f"p{p}": _ms(percentile(ttfts, p)) for p in (50, 95, 99)}
+    return summary
+
+
+def print_summary(summary: Dict):
+    latency = summary["latency_ms"]
+    print(f"\n📊 [{summary['mode']}] 동시성 {summary['concurrency']} | 요청 {summary['requests']} "
+          f"(성공 {summary['ok']}) | {summary['elapsed_sec']}s | {summary['req_per_sec']} req/s")
+    print(f"   지연(ms)  p50={latency['p50']}  p95={latency['p95']}  p99={latency['p99']}  평균={latency['mean']}")
+    if "ttft_ms" in summary:
+        ttft = summary["ttft_ms"]
+        print(f"   TTFT(ms)  p50={ttft['p50']}  p95={ttft['p95']}  p99={ttft['p99']}")
+    for reason, count in summary["errors"].items():
+        print(f"   ❌ {count}건: {reason}")
+
+
+async def _main(args):
+    queries = load_queries(args.queries)
+    total = args.requests or len(queries)
+    modes = {"stream": [True], "non-stream": [False], "both": [False, True]}[args.mode]
+
+    if args.warmup:
+        await run_load(args.url, queries, False, 1, args.warmup, timeout=args.timeout)
+
+    results = []
+    for stream in modes:
+        summary = await run_load(args.url, queries, stream, args.concurrency, total,
+                                 shared_session=args.shared_session, timeout=args.timeout)
+        print_summary(summary)
+        results.append(summary)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"url": args.url, "queries": args.queries, "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 결과 저장: {args.output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="에이전트 부하 생성기 (/v1/chat/completions)")
+    parser.add_argument("--url", default="http://127.0.0.1:8001/v1/chat/completions")
+    parser.add_argument("--queries", default=DEFAULT_QUERIES, help="질문 코퍼스 (JSONL 또는 텍스트)")
+    parser.add_argument("--mode", choices=("stream", "non-stream", "both"), default="both")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=0, help="모드별 총 요청 수 (0 = 코퍼스 크기)")
+    parser.add_argument("--warmup", type=int, default=2, help="측정 전 순차 요청 수")
+    parser.add_argument("--shared-session", action="store_true", help="모든 요청을 한 세션으로 (히스토리 누적)")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--output", help="요약 JSON 저장 경로")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+녹화된 트래픽 재생 - utils/recorder.py 가 남긴 JSONL 을 새 빌드에 다시 보내 지연 비교
+
+serve: 녹화된 하위 서비스/LLM 응답을 돌려주는 스텁 (OpenAI 호환 /v1/chat/completions 와
+       /api/v1/agent, /search, /map, /chat 를 한 포트에서). --latency recorded 면 녹화 당시 걸린 시간만큼 기다린다.
+run:   녹화된 요청을 순서대로 에이전트에 보내고 녹화 당시 지연/TTFT/응답과 비교.
+       요청마다 스텁에 재생할 녹화 ID 를 먼저 알리므로 순차 실행 (같은 입력 → 같은 하위 응답).
+
+응답 찾기: LLM 은 프롬프트 해시, 하위 서비스는 경로 + 요청 본문 해시로 먼저 찾고,
+코드가 바뀌어 해시가 안 맞으면 같은 종류의 다음 미사용 응답을 순서대로 쓴다 (stats 의 fallback).
+"응답 변경" 에는 에이전트가 무작위로 고르는 문구(분석 중 피드백, 거절 메시지) 차이도 포함된다.
+
+실행 (llm_agent-main 디렉토리에서):
+    python -m benchmarks.replay serve logs/traffic.jsonl --port 9200
+    OPENAI_BASE_URL=http://127.0.0.1:9200/v1 SQL_SERVICE_URL=http://127.0.0.1:9200/api/v1/agent \\
+    SEARCH_SERVICE_URL=http://127.0.0.1:9200/search MAPPING_SERVICE_URL=http://127.0.0.1:9200/map \\
+    CURRICULUM_SERVICE_URL=http://127.0.0.1:9200/chat python main.py
+    python -m benchmarks.replay run logs/traffic.jsonl --stub http://127.0.0.1:9200 --output replay.json
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from typing import Dict, List, Optional
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from benchmarks.loadgen import percentile, send_chat
+from utils.recorder import body_hash, prompt_hash
+
+STREAM_PIECES = 20  # 녹화된 LLM 스트리밍 응답을 몇 조각으로 나눠 보낼지
+
+
+def load_recordings(paths: List[str]) -> List[Dict]:
+    recordings = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            recordings.extend(json.loads(line) for line in f if line.strip())
+    return sorted(recordings, key=lambda recording: recording["timestamp"])
+
+
+class ReplayStore:
+    """선택된 녹화 하나의 exchange 를 꺼내 주는 저장소 (같은 응답은 한 번만 사용)"""
+
+    def __init__(self, recordings: List[Dict]):
+        self.recordings = {recording["id"]: recording for recording in recordings}
+        self.current_id = None
+        self._unused: List[Dict] = []
+        self.stats = {kind: {"hit": 0, "fallback": 0, "miss": 0} for kind in ("llm", "downstream")}
+
+    def select(self, recording_id: str) -> bool:
+        recording = self.recordings.get(recording_id)
+        if recording is None:
+            return False
+        self.current_id = recording_id
+        self._unused = list(recording["exchanges"])
+        return True
+
+    def _take(self, kind: str, key_name: str, key: str, **match) -> Optional[Dict]:
+        candidates = [exchange for exchange in self._unused
+                      if exchange["kind"] == kind and all(exchange.get(k) == v for k, v in match.items())]
+        exact = next((exchange for exchange in candidates if exchange.get(key_name) == key), None)
+        chosen = exact or (candidates[0] if candidates else None)
+        self.stats[kind]["hit" if exact else "fallback" if chosen else "miss"] += 1
+        if chosen is not None:
+            self._unused.remove(chosen)
+        return chosen
+
+    def take_llm(self, model: str, prompt: str, json_mode: bool) -> Optional[Dict]:
+        return self._take("llm", "prompt_hash", prompt_hash(model, prompt, json_mode))
+
+    def take_downstream(self, path: str, body: str) -> Optional[Dict]:
+        return self._take("downstream", "request_hash", body_hash(body), path=path)
+
+
+def create_app(store: ReplayStore, recorded_latency: bool) -> FastAPI:
+    app = FastAPI(title="Replay stub")
+
+    async def _wait(ms: Optional[float]):
+        if recorded_latency and ms:
+            await asyncio.sleep(ms / 1000)
+
+    @app.post("/_replay/select")
+    async def select(request: Request):
+        recording_id = (await request.json()).get("id")
+        if not store.select(recording_id):
+            return JSONResponse(status_code=404, content={"error": f"녹화 없음: {recording_id}"})
+        return {"selected": recording_id}
+
+    @app.get("/_replay/stats")
+    async def stats():
+        return store.stats
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "")
+        prompt = "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+        json_mode = (body.get("response_format") or {}).get("type") in ("json_object", "json_schema")
+        exchange = store.take_llm(model, prompt, json_mode) or {"response": "{}" if json_mode else "", "elapsed_ms": 0}
+        content = exchange["response"]
+        completion_id = f"chatcmpl-replay-{uuid.uuid4().hex[:12]}"
+
+        if not body.get("stream"):
+            await _wait(exchange.get("elapsed_ms"))
+            return {"id": completion_id, "object": "chat.completion", "created": int(time.time()), "model": model,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                                 "finish_reason": "stop"}]}
+
+        def _chunk(delta: Dict, finish_reason=None) -> str:
+            data = {"id": completion_id, "object": "chat.completion.chunk", "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+            return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+        async def generate():
+            # 첫 조각은 녹화된 TTFT 에, 나머지는 완료 시각까지 균등하게
+            ttft = exchange.get("ttft_ms") or exchange.get("elapsed_ms") or 0
+            size = max(1, -(-len(content) // STREAM_PIECES))
+            pieces = [content[i:i + size] for i in range(0, len(content), size)]
+            interval = ((exchange.get("elapsed_ms") or 0) - ttft) / max(1, len(pieces) - 1)
+            await _wait(ttft)
+            for index, piece in enumerate(pieces):
+                if index:
+                    await _wait(interval)
+                yield _chunk({"content": piece})
+            yield _chunk({}, finish_reason="stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(generate(), media_type="text/event-stream")
+
+    @app.post("/{path:path}")
+    async def downstream(path: str, request: Request):
+        exchange = store.take_downstream(f"/{path}", (await request.body()).decode("utf-8", errors="replace"))
+        if exchange is None or "status" not in exchange:
+            return JSONResponse(status_code=404, content={"error": f"녹화된 응답 없음: /{path}"})
+
+        lines = exchange.get("response_body", "").splitlines(keepends=True)
+        offsets = exchange.get("line_offsets_ms") or []
+        media_type = exchange.get("content_type") or "application/json"
+        if "ndjson" not in media_type or len(lines) <= 1:
+            await _wait(offsets[-1] if offsets else exchange.get("elapsed_ms"))
+            return Response("".join(lines), status_code=exchange["status"], media_type=media_type)
+
+        async def generate():
+            previous = 0.0
+            for line, offset in zip(lines, offsets + [offsets[-1] if offsets else 0.0] * len(lines)):
+                await _wait(offset - previous)
+                previous = offset
+                yield line
+
+        return StreamingResponse(generate(), status_code=exchange["status"], media_type=media_type)
+
+    return app
+
+
+def _recorded_content(recording: Dict) -> str:
+    """녹화된 응답 본문(JSON 또는 SSE)에서 답변 텍스트만"""
+    body = recording.get("response", "")
+    if not recording.get("stream"):
+        try:
+            return json.loads(body)["choices"][0]["message"]["content"]
+        except (ValueError, KeyError, IndexError):
+            return body
+    parts = []
+    for line in body.splitlines():
+        if line.startswith("data: ") and line != "data: [DONE]":
+            try:
+                parts.append((json.loads(line[6:]).get("choices") or [{}])[0].get("delta", {}).get("content") or "")
+            except ValueError:
+                pass
+    return "".join(parts)
+
+
+async def run_replay(recordings: List[Dict], agent_url: str, stub_url: str, timeout: float = 300.0) -> Dict:
+    run_id = uuid.uuid4().hex[:8]
+    results = []
+    async with httpx.AsyncClient(timeout=timeout) as client:
+        for recording in recordings:
+            selected = await client.post(f"{stub_url}/_replay/select", json={"id": recording["id"]})
+            selected.raise_for_status()
+
+            # 세션 ID 는 실행마다 새로 (녹화 안의 대화 순서는 유지 → 히스토리가 녹화 당시처럼 쌓임)
+            body = dict(recording["request"])
+            body["chat_id"] = f"replay-{run_id}-{body.get('chat_id') or body.get('session_id') or recording['id']}"
+            result = {"id": recording["id"], "stream": recording["stream"],
+                      "recorded_ms": recording["duration_ms"], "recorded_ttft_ms": recording.get("ttft_ms")}
+            try:
+                sample = await send_chat(client, f"{agent_url}{recording['path']}", body)
+                result["replay_ms"] = round(sample["latency"] * 1000, 1)
+                result["replay_ttft_ms"] = round(sample["ttft"] * 1000, 1) if sample["ttft"] is not None else None
+                result["same_output"] = sample["content"] == _recorded_content(recording)
+            except Exception as e:
+                result["error"] = str(e) or type(e).__name__
+            results.append(result)
+
+        stats = (await client.get(f"{stub_url}/_replay/stats")).json()
+
+    return {"results": results, "stub_stats": stats}
+
+
+def print_report(report: Dict, top: int = 5):
+    ok = [result for result in report["results"] if "error" not in result]
+    errors = len(report["results"]) - len(ok)
+
+    print(f"\n🔁 재생 {len(report['results'])}건 (성공 {len(ok)}, 오류 {errors}, "
+          f"응답 변경 {sum(1 for result in ok if not result['same_output'])})")
+    for label, key in (("녹화", "recorded_ms"), ("재생", "replay_ms")):
+        values = [result[key] for result in ok]
+        print(f"   {label} 지연(ms)  " + "  ".join(f"p{p}={percentile(values, p) or 0:.1f}" for p in (50, 95, 99)))
+    for label, key in (("녹화", "recorded_ttft_ms"), ("재생", "replay_ttft_ms")):
+        values = [result[key] for result in ok if result["stream"] and result.get(key) is not None]
+        if values:
+            print(f"   {label} TTFT(ms)  " + "  ".join(f"p{p}={percentile(values, p):.1f}" for p in (50, 95, 99)))
+
+    slowest = sorted(ok, key=lambda result: result["replay_ms"] - result["recorded_ms"], reverse=True)[:top]
+    if slowest:
+        print("   느려진 요청:")
+        for result in slowest:
+            print(f"     {result['id'][:12]}  {result['recorded_ms']:.0f}ms → {result['replay_ms']:.0f}ms "
+                  f"({result['replay_ms'] - result['recorded_ms']:+.0f}ms)")
+    for kind, counts in report["stub_stats"].items():
+        print(f"   스텁 {kind}: 일치 {counts['hit']}, 순서 대체 {counts['fallback']}, 없음 {counts['miss']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="녹화된 트래픽 재생 (utils/recorder.py)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="녹화된 하위 서비스/LLM 응답 스텁 실행")
+    serve.add_argument("recordings", nargs="+")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=9200)
+    serve.add_argument("--latency", choices=("recorded", "none"), default="recorded",
+                       help="recorded: 녹화 당시 걸린 시간만큼 대기, none: 즉시 응답")
+
+    run = commands.add_parser("run", help="녹화된 요청을 에이전트에 다시 보내고 비교")
+    run.add_argument("recordings", nargs="+")
+    run.add_argument("--agent", default="http://127.0.0.1:8001")
+    run.add_argument("--stub", default="http://127.0.0.1:9200")
+    run.add_argument("--timeout", type=float, default=300.0)
+    run.add_argument("--output", help="요청별 결과 JSON 저장 경로")
+
+    args = parser.parse_args()
+    recordings = load_recordings(args.recordings)
+    if args.command == "serve":
+        print(f"🔁 재생 스텁: 녹화 {len(recordings)}건, 지연 {args.latency}")
+        uvicorn.run(create_app(ReplayStore(recordings), args.latency == "recorded"),
+                    host=args.host, port=args.port, log_level="warning")
+        return
+
+    report = asyncio.run(run_replay(recordings, args.agent.rstrip("/"), args.stub.rstrip("/"), args.timeout))
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+오프라인 벤치마크용 AI 모듈 스텁 (tool_sql / faiss_search / department_mapping / curriculum)
+
+실제 서비스와 같은 엔드포인트/응답 구조를 고정 데이터로 돌려준다 (MySQL, FAISS 인덱스, OpenAI 불필요).
+서비스별 응답 지연은 --<서비스>-ms 로 조절 (±jitter). 네 서비스를 한 프로세스에서 각자 포트로 띄운다.
+
+실행 (llm_agent-main 디렉토리에서):
+    python -m benchmarks.stub_services --sql-ms 150 --curriculum-ms 2000
+시작 시 에이전트에 넘길 *_SERVICE_URL 환경변수를 출력한다.
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
+
+JITTER = 0.2
+
+# 1x1 PNG (그래프 이미지 자리)
+GRAPH_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=="
+)
+
+COURSES = (
+    {"name": "기계학습", "department": "컴퓨터인공지능학부", "professor": "김교수", "grade": 3, "semester": "1학기"},
+    {"name": "자료구조", "department": "컴퓨터인공지능학부", "professor": "이교수", "grade": 2, "semester": "1학기"},
+    {"name": "데이터베이스", "department": "소프트웨어공학과", "professor": "박교수", "grade": 3, "semester": "2학기"},
+    {"name": "신호및시스템", "department": "전자공학부", "professor": "최교수", "grade": 2, "semester": "2학기"},
+    {"name": "딥러닝", "department": "컴퓨터인공지능학부", "professor": "정교수", "grade": 4, "semester": "1학기"},
+)
+
+DELAYS_MS = {"sql": 150.0, "vector": 80.0, "mapping": 30.0, "curriculum": 2000.0, "curriculum_graph": 1500.0}
+PORTS = {"sql": 7999, "vector": 7997, "mapping": 8000, "curriculum": 7996}
+
+
+async def _delay(key: str):
+    await asyncio.sleep(DELAYS_MS[key] / 1000 * random.uniform(1 - JITTER, 1 + JITTER))
+
+
+def _pick(query: str, count: int) -> list:
+    # 같은 질문 → 같은 결과 (질문별 응답 크기가 실행마다 달라지지 않게)
+    rng = random.Random(hashlib.md5(query.encode("utf-8")).digest())
+    return rng.sample(COURSES, min(count, len(COURSES)))
+
+
+class QueryBody(BaseModel):
+    query: str
+
+
+class SearchBody(BaseModel):
+    query: str
+    count: int = 30
+
+
+class MapBody(BaseModel):
+    query: str
+    top_k: int = 1
+
+
+class CurriculumBody(BaseModel):
+    query: str
+    required_dept_count: int = 30
+    graph_format: str = "png"
+    stream: bool = False
+
+
+def create_sql_app() -> FastAPI:
+    app = FastAPI(title="tool_sql stub")
+
+    @app.post("/api/v1/agent")
+    async def agent(body: QueryBody):
+        await _delay("sql")
+        rows = _pick(body.query, 3)
+        return {"result": "\n".join(
+            f"{row['name']} | {row['department']} | {row['professor']} | {row['grade']}학년 {row['semester']}"
+            for row in rows
+        )}
+
+    return app
+
+
+def create_vector_app() -> FastAPI:
+    app = FastAPI(title="faiss_search stub")
+
+    @app.post("/search")
+    async def search(body: SearchBody):
+        await _delay("vector")
+        results = [{**course, "score": round(0.9 - i * 0.05, 3), "description": f"{course['name']} 강의 개요"}
+                   for i, course in enumerate(_pick(body.query, body.count))]
+        return {"results": results}
+
+    return app
+
+
+def create_mapping_app() -> FastAPI:
+    app = FastAPI(title="department_mapping stub")
+
+    @app.post("/map")
+    async def map_department(body: MapBody):
+        await _delay("mapping")
+        department = _pick(body.query, 1)[0]["department"]
+        candidate = {"department": department, "description": f"{department} 소개", "score": 0.92,
+                     "match_type": "vector"}
+        return {"department": department, "description": candidate["description"],
+                "candidates": [candidate], "match_type": "vector", "confidence_margin": 0.3}
+
+    return app
+
+
+def create_curriculum_app(public_base_url: str) -> FastAPI:
+    app = FastAPI(title="curriculum stub")
+
+    def _courses_event(query: str) -> dict:
+        courses = _pick(query, 5)
+        message = "\n".join(f"- {course['grade']}학년 {course['semester']}: {course['name']} ({course['department']})"
+                            for course in courses)
+        return {"type": "courses", "message": f"추천 커리큘럼\n{message}",
+                "selected_departments": sorted({course["department"] for course in courses}),
+                "recommended_courses": courses, "cached": False}
+
+    def _graph_url(query: str) -> str:
+        return f"{public_base_url}/graph-image/{hashlib.md5(query.encode('utf-8')).hexdigest()[:16]}.png"
+
+    @app.post("/chat")
+    async def chat(body: CurriculumBody):
+        if body.stream:
+            async def generate():
+                await _delay("curriculum")
+                yield json.dumps(_courses_event(body.query), ensure_ascii=False) + "\n"
+                await _delay("curriculum_graph")
+                yield json.dumps({"type": "graph", "graph_format": body.graph_format,
+                                  "graph_image_url": _graph_url(body.query)}) + "\n"
+
+            return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+        await _delay("curriculum")
+        await _delay("curriculum_graph")
+        event = _courses_event(body.query)
+        return {"message": event["message"], "graph_format": body.graph_format, "cached": False,
+                "graph_image_url": _graph_url(body.query)}
+
+    @app.get("/graph-image/{artifact_id}")
+    async def graph_image(artifact_id: str):
+        return Response(GRAPH_PNG, media_type="image/png")
+
+    return app
+
+
+async def serve(host: str):
+    apps = {
+        "sql": create_sql_app(),
+        "vector": create_vector_app(),
+        "mapping": create_mapping_app(),
+        "curriculum": create_curriculum_app(f"http://{host}:{PORTS['curriculum']}"),
+    }
+    servers = [uvicorn.Server(uvicorn.Config(app, host=host, port=PORTS[name], log_level="warning"))
+               for name, app in apps.items()]
+
+    print("🧪 AI 모듈 스텁 실행 - 에이전트 환경변수:")
+    print(f"  SQL_SERVICE_URL=http://{host}:{PORTS['sql']}/api/v1/agent")
+    print(f"  SEARCH_SERVICE_URL=http://{host}:{PORTS['vector']}/search")
+    print(f"  MAPPING_SERVICE_URL=http://{host}:{PORTS['mapping']}/map")
+    print(f"  CURRICULUM_SERVICE_URL=http://{host}:{PORTS['curriculum']}/chat")
+    await asyncio.gather(*(server.serve() for server in servers))
+
+
+def main():
+    global JITTER
+    parser = argparse.ArgumentParser(description="오프라인 벤치마크용 AI 모듈 스텁")
+    parser.add_argument("--host", default="127.0.0.1")
+    for name, port in PORTS.items():
+        parser.add_argument(f"--{name}-port", type=int, default=port)
+    for key, delay in DELAYS_MS.items():
+        parser.add_argument(f"--{key.replace('_', '-')}-ms", type=float, default=delay, help="응답 지연 (ms)")
+    parser.add_argument("--jitter", type=float, default=JITTER, help="지연 변동 비율 (0.2 = ±20%%)")
+    args = parser.parse_args()
+
+    JITTER = args.jitter
+    for name in PORTS:
+        PORTS[name] = getattr(args, f"{name}_port")
+    for key in DELAYS_MS:
+        DELAYS_MS[key] = getattr(args, f"{key}_ms")
+    asyncio.run(serve(args.host))
+
+
+if __name__ == "__main__":
+    main()
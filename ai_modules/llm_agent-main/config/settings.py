@@ -68,6 +68,12 @@ class Settings(BaseSettings):
             raise ValueError(f'log_level must be one of {valid_levels}')
         return v.upper()
     
+    @validator('ai_modules_mode')
+    def validate_ai_modules_mode(cls, v):
+        if v.lower() not in ('http', 'embedded'):
+            raise ValueError('ai_modules_mode must be "http" or "embedded"')
+        return v.lower()
+
     @validator('port')
     def validate_port(cls, v):
         if not 1 <= v <= 65535:
@@ -87,6 +93,41 @@ class Settings(BaseSettings):
     mapping_service_url: str = "http://department-mapping:8000/map"
     llm_service_url: str = "http://llm-client:7998/agent"
 
+    # 하위 서비스 호출 방식: "http" (기본, 서비스별 컨테이너) | "embedded" (한 프로세스 안에서 직접 호출)
+    ai_modules_mode: str = "http"
+    # embedded 모드에서 tool_sql-main, faiss_search-main ... 디렉토리를 찾는 위치
+    embedded_modules_root: str = str(Path(__file__).resolve().parents[2])
+
+    # 하위 서비스 HTTP 연결 (utils/downstream.py - 모든 핸들러가 커넥션 풀 하나를 공유)
+    downstream_max_connections: int = 100
+    downstream_max_keepalive: int = 20
+    downstream_keepalive_expiry: float = 30.0
+    downstream_connect_timeout: float = 3.0
+    downstream_http2: bool = False  # h2 패키지 + HTTP/2 지원 서버일 때만 효과
+    downstream_retries: int = 2
+    downstream_backoff_base: float = 0.2
+    downstream_hedge_delay_ms: int = 300  # mapping 첫 응답이 이보다 늦으면 같은 요청을 한 번 더
+    circuit_failure_threshold: int = 5
+    circuit_reset_timeout: float = 30.0
+
+    # 통합 분석기 (히스토리가 있을 때 히스토리 분석 + 라우팅 + 확장을 LLM 1회로, 실패 시 기존 3단계로 폴백)
+    fused_analyzer_enabled: bool = False
+    # 추측 라우팅 (히스토리 분석과 동시에 마지막 질문으로 라우팅/확장 시작, 연속대화로 판정되면 취소)
+    speculative_routing_enabled: bool = False
+    # 로컬 의도 분류기 (규칙표 + 임베딩 최근접 중심, 확신할 때만 라우터 LLM 호출 생략)
+    intent_classifier_enabled: bool = False
+    intent_centroids_path: str = "./data/intent_centroids.json"  # benchmarks/intent_eval.py train 결과
+    intent_embedding_model: str = "text-embedding-3-small"
+    intent_centroid_threshold: float = 0.8
+    intent_centroid_margin: float = 0.05
+
+    # 트래픽 녹화 (utils/recorder.py - 채팅 요청 + 하위 서비스/LLM 응답을 익명화해 JSONL 로, benchmarks/replay.py 로 재생)
+    traffic_record_enabled: bool = False
+    traffic_record_sample_rate: float = 0.05
+    traffic_record_path: str = "./logs/traffic.jsonl"
+    traffic_record_max_mb: int = 100
+    traffic_record_backups: int = 3
+
     # 타임존 설정
     tz: str = "Asia/Seoul"
 
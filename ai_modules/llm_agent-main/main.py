@@ -7,12 +7,15 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 
 from config.settings import settings, LOGGING_CONFIG
 from controller.agentController import router as agent_router
 
 from service.core.mentor_service import HybridMentorService
+from utils.metrics import render_metrics
+from utils.tracing import TraceMiddleware
+from utils.recorder import TrafficRecorderMiddleware
 
 # 로그 디렉토리 확인 및 생성 (현재 디렉토리 기준)
 log_dir = Path("./logs")
@@ -52,6 +55,7 @@ async def lifespan(_: FastAPI):
     yield  # 서버 실행 중
 
     # Shutdown
+    await global_mentor_service.aclose()
     logger.info("서버 종료")
 
 # FastAPI 앱 생성
@@ -73,6 +77,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 요청별 trace 컨텍스트 (하위 서비스 호출에 traceparent 전달, 스팬은 TRACE_EXPORT_PATH 에 기록)
+app.add_middleware(TraceMiddleware, service_name="llm_agent")
+
+# 트래픽 녹화 (기본 꺼짐, 표본 요청 + 하위 서비스/LLM 응답을 익명화해 TRAFFIC_RECORD_PATH 에 기록)
+if settings.traffic_record_enabled:
+    app.add_middleware(TrafficRecorderMiddleware)
+    logger.info(f"🎙️ 트래픽 녹화 활성화 (표본 {settings.traffic_record_sample_rate:.0%}) → {settings.traffic_record_path}")
+
 
 # 라우터 등록
 app.include_router(agent_router, tags=["AI Mentor"])
@@ -245,6 +257,22 @@ async def chat_completions(request: Request):
         return JSONResponse(status_code=500, content={"error": str(e)})
 
 
+# Prometheus 메트릭
+@app.get("/metrics")
+async def metrics():
+    """노드/하위 서비스/LLM 지연, 토큰, 캐시 적중률, 라우팅 분포 (Prometheus 텍스트 형식)"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# 임베디드 모드 커리큘럼 그래프 이미지 (HTTP 모드에서는 curriculum 서비스가 직접 제공)
+@app.get("/graph-image/{artifact_id}")
+async def graph_image(artifact_id: str, request: Request):
+    backend = global_mentor_service.langgraph_app.embedded.get("curriculum") if global_mentor_service else None
+    if backend is None:
+        return JSONResponse(status_code=404, content={"error": "임베디드 모드가 아닙니다"})
+    return await backend.graph_image(artifact_id, request)
+
+
 # 기본 엔드포인트
 @app.get("/")
 async def root():
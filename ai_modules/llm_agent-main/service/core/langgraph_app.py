@@ -18,6 +18,9 @@ from ..memory.memory import ConversationMemory
 from ..memory.context_analyzer import ConversationContextAnalyzer
 from .langgraph_state import GraphState, create_initial_state
 from ..nodes import NodeManager
+from utils.downstream import DownstreamPool
+from utils.metrics import SPECULATIVE_ROUTING
+from config.settings import settings
 
 
 logger = logging.getLogger(__name__)
@@ -31,23 +34,55 @@ class LangGraphApp:
         # 메모리 설정
         self.conversation_memory = conversation_memory
 
+        # 하위 서비스 커넥션 풀 (모든 핸들러 공유, aclose() 에서 닫음)
+        self.downstream = DownstreamPool()
+
+        # 임베디드 모드: 다른 AI 모듈을 이 프로세스에서 직접 호출 (HTTP 홉 없음)
+        self.embedded = {}
+        if settings.ai_modules_mode == "embedded":
+            from ..embedded import create_embedded_backends
+            self.embedded = create_embedded_backends()
+
         # LLM 핸들러 생성 (통합 사용)
         self.llm_handler = LlmClient(max_tokens=10000)
 
         # 히스토리 분석기 초기화 (llm_handler 전달)
         self.context_analyzer = ConversationContextAnalyzer(self.llm_handler)
 
+        # 쿼리 분석기 (router 노드 + 통합 분석기 공용)
+        self.query_analyzer = QueryAnalyzer(conversation_memory=self.conversation_memory)
+
+        # 로컬 의도 분류기 (라우터 LLM 앞단 빠른 경로)
+        self.intent_classifier = None
+        if settings.intent_classifier_enabled:
+            from ..handlers.query_analyzer.intent_classifier import IntentClassifier
+            self.intent_classifier = IntentClassifier(
+                centroids_path=settings.intent_centroids_path,
+                embedding_model=settings.intent_embedding_model,
+                threshold=settings.intent_centroid_threshold,
+                margin=settings.intent_centroid_margin
+            )
+
         # NodeManager 초기화
         self.node_manager = NodeManager(
-            query_analyzer=QueryAnalyzer(conversation_memory=self.conversation_memory),
+            query_analyzer=self.query_analyzer,
             llm_handler=self.llm_handler,  # 같은 인스턴스 사용
-            sql_handler=SqlQueryHandler(),
-            vector_handler=VectorSearchHandler(),
-            dept_handler=DepartmentMappingHandler(),
-            curriculum_handler=CurriculumHandler(),
+            sql_handler=SqlQueryHandler(
+                http_client=self.downstream.client("sql"), embedded=self.embedded.get("sql")
+            ),
+            vector_handler=VectorSearchHandler(
+                http_client=self.downstream.client("vector"), embedded=self.embedded.get("vector")
+            ),
+            dept_handler=DepartmentMappingHandler(
+                http_client=self.downstream.client("mapping"), embedded=self.embedded.get("mapping")
+            ),
+            curriculum_handler=CurriculumHandler(
+                http_client=self.downstream.client("curriculum"), embedded=self.embedded.get("curriculum")
+            ),
             result_synthesizer=ResultSynthesizer(self.llm_handler),  # 같은 인스턴스 사용
             conversation_memory=self.conversation_memory,  # 메모리 전달
-            llm_client=self.llm_handler  # Light 검증용 LLM Client
+            llm_client=self.llm_handler,  # Light 검증용 LLM Client
+            intent_classifier=self.intent_classifier
         )
 
         # 그래프 빌드
@@ -130,21 +165,52 @@ class LangGraphApp:
             }
         }
 
+        precomputed_analysis = None
         if not self.context_analyzer or not self.conversation_memory:
             logger.info("컨텍스트 분석기 또는 메모리가 없습니다. 기본값 반환")
             history_analysis = default_result
         else:
-            history_analysis = await self.context_analyzer.analyze_session_context(
-                user_message,
-                self.conversation_memory,
-                session_id
-            )
+            # 통합 분석/추측 라우팅은 히스토리가 있을 때만 (없으면 히스토리 분석 호출이 없어 기존 병렬 경로가 이미 1단계)
+            has_history = False
+            if settings.fused_analyzer_enabled or settings.speculative_routing_enabled:
+                history_context = self.context_analyzer.get_history_context(self.conversation_memory, session_id)
+                has_history = bool(history_context)
+
+            fused = None
+            if settings.fused_analyzer_enabled and has_history:
+                fused = await self.query_analyzer.analyze_fused(user_message, history_context)
+
+            if fused:
+                history_analysis = fused["history"]
+                precomputed_analysis = fused["analysis"]
+            else:
+                # 추측 라우팅: 히스토리 분석과 동시에 마지막 질문 그대로 라우팅/확장 시작
+                speculative_task = None
+                if settings.speculative_routing_enabled and has_history:
+                    speculative_task = asyncio.create_task(self._speculative_analysis(user_message))
+
+                try:
+                    history_analysis = await self.context_analyzer.analyze_session_context(
+                        user_message,
+                        self.conversation_memory,
+                        session_id
+                    )
+                except BaseException:
+                    if speculative_task:
+                        speculative_task.cancel()
+                    raise
+
+                if speculative_task:
+                    precomputed_analysis = await self._resolve_speculation(
+                        speculative_task, user_message, history_analysis
+                    )
 
         # 상태 초기화
         initial_state = create_initial_state(user_message, session_id)
         initial_state["conversation_memory"] = self.conversation_memory
         initial_state["is_continuation"] = history_analysis.get("is_continuation", False)
         initial_state["history_usage"] = history_analysis.get("history_usage", {})
+        initial_state["precomputed_analysis"] = precomputed_analysis
 
         # 스트리밍 콜백 설정
         if stream_callback:
@@ -174,6 +240,39 @@ class LangGraphApp:
 
         return initial_state
 
+    async def _speculative_analysis(self, user_message: str) -> Dict[str, Any]:
+        """추측 라우팅 - 연속대화가 아니라고 가정하고 마지막 질문으로 router 와 같은 분석 수행"""
+        from service.nodes.utils import extract_last_question
+        return await self.query_analyzer.analyze_query_parallel(
+            extract_last_question(user_message).strip(),
+            is_reconstructed=False,
+            history_context=""
+        )
+
+    async def _resolve_speculation(self, speculative_task: asyncio.Task, user_message: str,
+                                   history_analysis: Dict[str, Any]):
+        """히스토리 분석 결과로 추측 라우팅 결과 채택 여부 결정 (채택 못 하면 취소하고 None → router 가 다시 분석)"""
+        from service.nodes.utils import extract_last_question
+        last_question = extract_last_question(user_message).strip()
+        reconstructed_query = (history_analysis.get("reconstructed_query") or "").strip()
+
+        if history_analysis.get("is_continuation", False) and reconstructed_query != last_question:
+            speculative_task.cancel()
+            SPECULATIVE_ROUTING.inc(result="cancelled")
+            logger.info(f"🔄 연속대화라 추측 라우팅 취소: '{last_question}' → '{reconstructed_query}'")
+            return None
+
+        try:
+            analysis = await speculative_task
+        except Exception as e:
+            SPECULATIVE_ROUTING.inc(result="error")
+            logger.warning(f"⚠️ 추측 라우팅 실패, router 에서 다시 분석: {e}")
+            return None
+
+        SPECULATIVE_ROUTING.inc(result="hit")
+        logger.info(f"⚡ 추측 라우팅 채택: complexity={analysis.get('complexity')}")
+        return analysis
+
     async def process_query(self, user_message: str, session_id: str = "default") -> Dict[str, Any]:
         """비스트리밍 쿼리 처리"""
         logger.info(f"🚀 통합 쿼리 처리 시작: '{user_message}...'")
@@ -215,47 +314,58 @@ class LangGraphApp:
         """스트리밍 쿼리 처리"""
         logger.info(f"🚀 스트리밍 쿼리 처리 시작: '{user_message}...'")
 
-        # 스트리밍 콜백 큐 설정
-        feedback_queue = []
+        # 스트리밍 콜백 큐 설정 (노드 실행 중에 들어온 메시지도 바로 내보냄)
+        feedback_queue = asyncio.Queue()
+        graph_done = object()
 
         async def stream_callback(msg: str):
-            feedback_queue.append(msg)
+            await feedback_queue.put(msg)
 
         # 공통 준비 로직
         initial_state = await self._prepare_query_state(user_message, session_id, stream_callback)
 
         if initial_state is None:
             return
+        initial_state["progressive_stream"] = True
 
-        # 그래프를 스트리밍으로 실행하면서 각 노드마다 피드백 확인
         final_state = None
-        async for event in self.graph.astream(initial_state):
-            # 노드 실행 후 새로운 피드백이 있으면 즉시 yield (문단 구분)
-            while feedback_queue:
-                feedback_msg = feedback_queue.pop(0)
+
+        async def run_graph():
+            nonlocal final_state
+            try:
+                async for event in self.graph.astream(initial_state):
+                    # 마지막 상태 저장
+                    if event:
+                        for node_name, node_state in event.items():
+                            if node_state:
+                                final_state = node_state
+            finally:
+                await feedback_queue.put(graph_done)
+
+        # 그래프는 백그라운드로 실행하고, 피드백/부분 결과는 도착하는 대로 yield (문단 구분)
+        graph_task = asyncio.create_task(run_graph())
+        try:
+            while True:
+                feedback_msg = await feedback_queue.get()
+                if feedback_msg is graph_done:
+                    break
                 yield feedback_msg + "\n\n"
                 await asyncio.sleep(0.01)
-
-            # 마지막 상태 저장
-            if event:
-                for node_name, node_state in event.items():
-                    if node_state:
-                        final_state = node_state
-
-        # 남은 피드백 메시지 처리
-        while feedback_queue:
-            feedback_msg = feedback_queue.pop(0)
-            yield feedback_msg + "\n\n"
-            await asyncio.sleep(0.01)
+            await graph_task
+        finally:
+            if not graph_task.done():
+                graph_task.cancel()
 
         # final_result가 있으면 그대로 스트리밍
         final_result = final_state.get("final_result", "") if final_state else ""
 
         if final_result:
-            # 결과를 한 글자씩 스트리밍 (시뮬레이션)
-            for char in final_result:
-                yield char
-                await asyncio.sleep(0.01)  # 스트리밍 효과
+            # 노드가 이미 단계별로 전달한 결과(커리큘럼)는 다시 보내지 않음
+            if not final_state.get("final_streamed"):
+                # 결과를 한 글자씩 스트리밍 (시뮬레이션)
+                for char in final_result:
+                    yield char
+                    await asyncio.sleep(0.01)  # 스트리밍 효과
 
             # 메모리에 저장
             if self.conversation_memory:
@@ -266,4 +376,8 @@ class LangGraphApp:
                 )
                 logger.info(f"💾 대화 저장 완료: session_id={session_id}")
         else:
-            yield "응답을 생성할 수 없습니다."
\ No newline at end of file
+            yield "응답을 생성할 수 없습니다."
+
+    async def aclose(self):
+        """하위 서비스 커넥션 풀 종료 (lifespan 종료 시)"""
+        await self.downstream.aclose()
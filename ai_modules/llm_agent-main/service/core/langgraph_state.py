@@ -51,6 +51,7 @@ class GraphState(TypedDict):
     enhanced_query: Optional[str]
     keywords: Optional[str]
     owner_hint: Optional[str]
+    precomputed_analysis: Optional[Dict[str, Any]]  # 통합 분석기/추측 라우팅이 미리 만든 라우팅/확장 결과 (router 가 재사용)
 
     # 처리 결과
     slots: Annotated[Dict[str, Any], merge_dicts]
@@ -66,6 +67,8 @@ class GraphState(TypedDict):
 
     # 스트리밍 콜백
     stream_callback: Optional[Any]
+    progressive_stream: bool  # 스트리밍 요청 여부 (노드가 결과를 stream_callback 으로 바로 전달 가능)
+    final_streamed: bool  # final_result 가 이미 stream_callback 으로 전달됨
 
 
 def create_initial_state(
@@ -91,13 +94,16 @@ def create_initial_state(
         enhanced_query=None,
         keywords=None,
         owner_hint=None,
+        precomputed_analysis=None,
         slots={},
         processing_type=None,
         final_result=None,
         step_times={},
         retry_count=0,
         parallel_tasks=[],
-        stream_callback=None
+        stream_callback=None,
+        progressive_stream=False,
+        final_streamed=False
     )
 
 
@@ -95,9 +95,15 @@ class HybridMentorService:
             "service": "ai-mentor",
             "version": "3.0-simple",
             "mode": "unified_langgraph",
+            "ai_modules_mode": settings.ai_modules_mode,
+            "circuits": self.langgraph_app.downstream.circuit_states(),
             "timestamp": datetime.now().isoformat()
         }
 
+    async def aclose(self):
+        """서버 종료 시 리소스 정리"""
+        await self.langgraph_app.aclose()
+
     def get_session_info(self, session_id: str) -> Dict[str, Any]:
         """세션 정보"""
         return {
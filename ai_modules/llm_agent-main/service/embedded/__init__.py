@@ -0,0 +1,9 @@
+"""
+임베디드 모드 - 다른 AI 모듈을 llm_agent 프로세스 안에서 직접 호출 (ai_modules_mode=embedded)
+"""
+
+from .backends import create_embedded_backends
+
+__all__ = [
+    'create_embedded_backends'
+]
@@ -0,0 +1,130 @@
+"""
+임베디드 모드 백엔드 - 각 AI 모듈의 핵심 클래스를 직접 호출하고 HTTP 엔드포인트와 같은 응답 dict 반환
+
+핸들러는 HTTP 응답 JSON 대신 request() 결과를 그대로 사용하므로 응답 처리 코드는 두 모드가 공유한다.
+동기 코드(DB/LLM/FAISS)는 이벤트 루프를 막지 않도록 executor 에서 실행.
+sql/vector 는 모듈 전역 pymysql 커넥션 하나를 공유하므로 (스레드 안전하지 않음) 백엔드별 Lock 으로 한 번에 하나씩
+- HTTP 모드에서 async 엔드포인트가 이벤트 루프 하나에서 직렬로 돌던 것과 같은 동작.
+"""
+import asyncio
+import logging
+import os
+from functools import partial
+from typing import Any, AsyncIterator, Dict
+
+from config.settings import settings
+from utils.tracing import start_span, with_context
+from .loader import load_service_module
+
+logger = logging.getLogger(__name__)
+
+# 핸들러 이름 → (모듈 디렉토리, import 할 모듈)
+EMBEDDED_MODULES = {
+    "sql": ("tool_sql-main", "service.sqlCoreService"),
+    "vector": ("faiss_search-main", "controller.searchController"),
+    "mapping": ("department_mapping-main", "controller.mappingController"),
+    "curriculum": ("curriculum-main", "controller.curriculumController"),
+}
+
+
+def _load(name: str):
+    directory, module_name = EMBEDDED_MODULES[name]
+    return load_service_module(name, os.path.join(settings.embedded_modules_root, directory), module_name)
+
+
+async def _run_sync(func, *args, **kwargs):
+    return await asyncio.get_running_loop().run_in_executor(None, with_context(partial(func, *args, **kwargs)))
+
+
+class EmbeddedSqlBackend:
+    """tool_sql SqlService - POST /api/v1/agent 와 같은 {"result": ...}"""
+
+    def __init__(self):
+        self.sql_service = _load("sql").sql_service
+        self._db_lock = asyncio.Lock()  # SqlService.db_client 커넥션 공유
+
+    async def request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        with start_span("embedded.sql"):
+            async with self._db_lock:
+                return {"result": await _run_sync(self.sql_service.execute, payload["query"])}
+
+
+class EmbeddedVectorBackend:
+    """faiss_search SearchService - POST /search 와 같은 {"results": [...]}"""
+
+    def __init__(self):
+        self.search_service = _load("vector").search_service
+        self._db_lock = asyncio.Lock()  # searchController.db_client 커넥션 공유
+
+    async def request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        with start_span("embedded.vector"):
+            async with self._db_lock:
+                results = await _run_sync(
+                    self.search_service.search_hybrid, query_text=payload["query"], count=payload.get("count", 30)
+                )
+        return {"results": results}
+
+
+class EmbeddedMappingBackend:
+    """department_mapping MappingService - POST /map 과 같은 {"department", "description", "candidates", ...}"""
+
+    def __init__(self):
+        self.controller = _load("mapping")
+
+    async def request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        with start_span("embedded.mapping"):
+            result = await _run_sync(
+                self.controller.mapping_service.map_departments, payload["query"], payload.get("top_k", 1)
+            )
+        return self.controller.format_mapping_result(result)
+
+
+class EmbeddedCurriculumBackend:
+    """curriculum CurriculumService - POST /chat (JSON / NDJSON 이벤트) 와 같은 응답
+
+    그래프 이미지는 llm_agent 의 /graph-image/{id} 로 제공 (main.py).
+    """
+
+    def __init__(self):
+        # 그래프 이미지 URL 을 llm_agent 주소로 (명시적으로 설정했으면 그대로)
+        server_host = os.getenv("SERVER_HOST", "210.117.181.110")
+        os.environ.setdefault("GRAPH_IMAGE_BASE_URL", f"http://{server_host}:{settings.port}")
+
+        self.controller = _load("curriculum")
+        try:
+            self.controller.curriculum_service.warmup()
+        except Exception as e:
+            logger.warning(f"⚠️ 커리큘럼 검색 데이터 예열 실패 (첫 요청에서 로드): {e}")
+
+    async def request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        request = self.controller.QueryRequest(**payload)
+        with start_span("embedded.curriculum"):
+            result = await self.controller.curriculum_service.process_query_async(
+                request.query, request.required_dept_count, request.graph_format
+            )
+        return self.controller.build_content(request, result)
+
+    async def stream(self, payload: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """courses → graph 이벤트 dict (NDJSON 스트림의 각 줄과 같은 형식)"""
+        async for event in self.controller.stream_events(self.controller.QueryRequest(**payload, stream=True)):
+            yield event
+
+    async def graph_image(self, artifact_id: str, request):
+        return await self.controller.get_graph_artifact(artifact_id, request)
+
+
+_BACKEND_CLASSES = {
+    "sql": EmbeddedSqlBackend,
+    "vector": EmbeddedVectorBackend,
+    "mapping": EmbeddedMappingBackend,
+    "curriculum": EmbeddedCurriculumBackend,
+}
+
+
+def create_embedded_backends() -> Dict[str, Any]:
+    """ai_modules_mode=embedded 일 때 핸들러별 백엔드 생성 (모듈 로드 실패 시 서버 시작 실패)"""
+    backends = {}
+    for name, backend_class in _BACKEND_CLASSES.items():
+        logger.info(f"📦 임베디드 백엔드 로드: {name}")
+        backends[name] = backend_class()
+    return backends
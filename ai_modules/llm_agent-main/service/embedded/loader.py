@@ -0,0 +1,122 @@
+"""
+다른 AI 모듈(tool_sql, faiss_search, department_mapping, curriculum)을 llm_agent 프로세스 안에서 import
+
+각 모듈은 자기 디렉토리를 기준으로 `service`, `util`, `utils`, `controller` 같은 같은 이름의 최상위 패키지를 쓰므로
+그대로 import 하면 llm_agent 의 패키지와 충돌한다. 모듈마다 `_embedded.<이름>.` 접두사 네임스페이스로 불러오고,
+그 안의 `from service.x import ...` 같은 절대 import 는 모듈 전용 __import__ 로 같은 네임스페이스에 연결한다.
+(함수 안의 지연 import, 프로세스 풀 워커의 pickle 참조도 같은 이름으로 풀린다)
+
+추적 모듈(util(s).tracing)은 llm_agent 의 utils.tracing 을 공유해서 임베디드 호출 스팬이 같은 trace 에 기록된다.
+"""
+import builtins
+import importlib
+import importlib.abc
+import importlib.machinery
+import importlib.util
+import logging
+import os
+import sys
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+EMBEDDED_PREFIX = "_embedded"
+
+# 임베디드 모듈이 import 해도 llm_agent 쪽 모듈을 그대로 쓰는 것 (모듈 상태 공유)
+SHARED_MODULES = {
+    "util.tracing": "utils.tracing",
+    "utils.tracing": "utils.tracing",
+}
+
+
+class _EmbeddedSourceLoader(importlib.machinery.SourceFileLoader):
+    """모듈 실행 전에 전용 __builtins__ (네임스페이스 __import__) 를 넣는 로더"""
+
+    def __init__(self, fullname: str, path: str, builtins_dict: Dict):
+        super().__init__(fullname, path)
+        self._builtins = builtins_dict
+
+    def exec_module(self, module):
+        module.__builtins__ = self._builtins
+        super().exec_module(module)
+
+
+class _EmbeddedFinder(importlib.abc.MetaPathFinder):
+    """`_embedded.<이름>.a.b` → <모듈 디렉토리>/a/b(.py | /__init__.py | 네임스페이스 디렉토리)"""
+
+    def __init__(self):
+        self.roots: Dict[str, str] = {}
+        self.builtins: Dict[str, Dict] = {}
+
+    def register(self, name: str, root: str):
+        local_names = {
+            os.path.splitext(entry)[0] for entry in os.listdir(root)
+            if not entry.startswith((".", "__")) and (entry.endswith(".py") or os.path.isdir(os.path.join(root, entry)))
+        }
+        self.roots[name] = root
+        self.builtins[name] = dict(builtins.__dict__, __import__=_namespaced_import(name, local_names))
+
+    def find_spec(self, fullname, path=None, target=None):
+        parts = fullname.split(".")
+        if parts[0] != EMBEDDED_PREFIX:
+            return None
+        if len(parts) == 1:
+            return self._namespace_spec(fullname, [])
+        root = self.roots.get(parts[1])
+        if root is None:
+            return None
+        if len(parts) == 2:
+            return self._namespace_spec(fullname, [root])
+
+        location = os.path.join(root, *parts[2:])
+        if os.path.isdir(location):
+            init_path = os.path.join(location, "__init__.py")
+            if not os.path.exists(init_path):
+                return self._namespace_spec(fullname, [location])
+            return importlib.util.spec_from_file_location(
+                fullname, init_path, loader=_EmbeddedSourceLoader(fullname, init_path, self.builtins[parts[1]]),
+                submodule_search_locations=[location]
+            )
+        if os.path.exists(location + ".py"):
+            return importlib.util.spec_from_file_location(
+                fullname, location + ".py",
+                loader=_EmbeddedSourceLoader(fullname, location + ".py", self.builtins[parts[1]])
+            )
+        return None
+
+    @staticmethod
+    def _namespace_spec(fullname: str, locations):
+        spec = importlib.machinery.ModuleSpec(fullname, None, is_package=True)
+        spec.submodule_search_locations = list(locations)
+        return spec
+
+
+def _namespaced_import(name: str, local_names):
+    """모듈 디렉토리의 최상위 이름(service, util ...)을 `_embedded.<name>.` 아래로 돌리는 __import__"""
+    prefix = f"{EMBEDDED_PREFIX}.{name}."
+
+    def _import(module_name, globals=None, locals=None, fromlist=(), level=0):
+        if level == 0 and module_name.split(".")[0] in local_names:
+            if fromlist and module_name in SHARED_MODULES:
+                return importlib.import_module(SHARED_MODULES[module_name])
+            module = builtins.__import__(prefix + module_name, globals, locals, fromlist, 0)
+            # `import service.x` 는 최상위 패키지(service)를 바인딩
+            return module if fromlist else sys.modules[prefix + module_name.split(".")[0]]
+        return builtins.__import__(module_name, globals, locals, fromlist, level)
+
+    return _import
+
+
+_finder = _EmbeddedFinder()
+
+
+def load_service_module(name: str, root: str, module_name: str):
+    """모듈 디렉토리(root)의 module_name 을 `_embedded.<name>.<module_name>` 으로 import"""
+    if name not in _finder.roots:
+        if not os.path.isdir(root):
+            raise FileNotFoundError(f"임베디드 모듈 디렉토리를 찾을 수 없습니다: {root}")
+        _finder.register(name, root)
+        if _finder not in sys.meta_path:
+            sys.meta_path.insert(0, _finder)
+        logger.info(f"📦 임베디드 모듈 등록: {name} ← {root}")
+    return importlib.import_module(f"{EMBEDDED_PREFIX}.{name}.{module_name}")
@@ -1,8 +1,11 @@
 import httpx
+import json
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Awaitable
 from .base_handler import BaseQueryHandler
 from config.settings import settings
+from utils.downstream import standalone_client
+from utils.metrics import record_cache
 
 logger = logging.getLogger(__name__)
 
@@ -10,10 +13,13 @@ logger = logging.getLogger(__name__)
 class CurriculumHandler(BaseQueryHandler):
     """커리큘럼 서비스와 연동하는 핸들러 - 최대 간소화"""
 
-    def __init__(self, base_url: str = None):
+    def __init__(self, base_url: str = None, http_client: httpx.AsyncClient = None, embedded=None):
         super().__init__()
         self.base_url = base_url or settings.curriculum_service_url.replace('/chat', '')
-        self.http_client = httpx.AsyncClient(timeout=120.0)
+        # LangGraphApp 의 공유 커넥션 풀 클라이언트 (단독 생성 시 자체 풀)
+        self.http_client = http_client or standalone_client("curriculum")
+        # 임베디드 모드: curriculum CurriculumService 직접 호출 (HTTP 응답/NDJSON 이벤트와 같은 dict)
+        self.embedded = embedded
 
     async def handle(self, user_message: str, query_analysis: Dict, **kwargs) -> Dict[str, Any]:
         """커리큘럼 쿼리 처리"""
@@ -33,43 +39,29 @@ class CurriculumHandler(BaseQueryHandler):
                 "query": enhanced_query,
             }
 
-            response = await self.http_client.post(
-                f"{self.base_url}/chat",
-                json=request_data,
-                headers={"Content-Type": "application/json"}
-            )
-
-            # HTTP 상태 코드로 직접 판단
-            if response.status_code == 200:
-                result = response.json()
-                message = result.get("message", "커리큘럼 정보를 찾을 수 없습니다.")
-                graph_image_url = result.get("graph_image_url", "")
-
-                # 그래프 이미지 URL을 Markdown 형식으로 추가
-                if graph_image_url:
-                    display_message = f"{message}\n\n📊 **커리큘럼 로드맵**\n\n![커리큘럼 그래프]({graph_image_url})"
-                else:
-                    display_message = message
-
-                return self.create_response(
-                    agent_type="curriculum",
-                    result=message,
-                    display=display_message,
-                    metadata={
-                        "source": "curriculum_service",
-                        "response_length": len(message),
-                        "graph_url": graph_image_url
-                    },
-                    success=True
-                )
+            if self.embedded is not None:
+                result = await self.embedded.request(request_data)
             else:
-                return self.create_response(
-                    agent_type="curriculum",
-                    result=None,
-                    display=f"서비스 오류: {response.status_code}",
-                    success=False
+                response = await self.http_client.post(
+                    f"{self.base_url}/chat",
+                    json=request_data,
+                    headers={"Content-Type": "application/json"}
                 )
 
+                # HTTP 상태 코드로 직접 판단
+                if response.status_code != 200:
+                    return self.create_response(
+                        agent_type="curriculum",
+                        result=None,
+                        display=f"서비스 오류: {response.status_code}",
+                        success=False
+                    )
+                result = response.json()
+
+            record_cache("curriculum_roadmap", bool(result.get("cached")))
+            message = result.get("message", "커리큘럼 정보를 찾을 수 없습니다.")
+            return self._success_response(message, result.get("graph_image_url", ""))
+
         except Exception as e:
             logger.error(f"Curriculum 처리 실패: {e}")
             return self.create_response(
@@ -79,6 +71,87 @@ class CurriculumHandler(BaseQueryHandler):
                 success=False
             )
 
+    async def handle_stream(self, user_message: str, query_analysis: Dict, on_part: Callable[[str], Awaitable[Any]],
+                            **kwargs) -> Dict[str, Any]:
+        """커리큘럼 쿼리 스트리밍 처리 - 과목 목록/그래프를 도착하는 대로 on_part 로 전달
+
+        반환값은 handle() 과 같은 형식 (전체 display). 아무것도 전달하기 전에 실패하면 handle() 로 폴백.
+        """
+        if not self.is_available():
+            return await self.handle(user_message, query_analysis, **kwargs)
+
+        enhanced_query = query_analysis.get("enhanced_query", user_message)
+        message = None
+        graph_image_url = ""
+
+        try:
+            async for event in self._stream_events(enhanced_query):
+                if event.get("type") == "courses":
+                    record_cache("curriculum_roadmap", bool(event.get("cached")))
+                    message = event.get("message", "커리큘럼 정보를 찾을 수 없습니다.")
+                    await on_part(message)
+                elif event.get("type") == "graph":
+                    graph_image_url = event.get("graph_image_url") or ""
+                    if graph_image_url:
+                        await on_part(self._graph_markdown(graph_image_url))
+                elif event.get("type") == "error":
+                    raise RuntimeError(event.get("error", "커리큘럼 처리 실패"))
+
+        except Exception as e:
+            if message is None:
+                logger.warning(f"Curriculum 스트리밍 실패, 일반 요청으로 재시도: {e}")
+                return await self.handle(user_message, query_analysis, **kwargs)
+            # 과목 목록은 이미 전달됨 - 그래프만 빠진 결과로 마무리
+            logger.error(f"Curriculum 그래프 스트리밍 실패: {e}")
+
+        if message is None:
+            return await self.handle(user_message, query_analysis, **kwargs)
+        return self._success_response(message, graph_image_url, streamed=True)
+
+    async def _stream_events(self, query: str):
+        """courses/graph/error 이벤트 dict - 임베디드 호출 또는 NDJSON 스트림 한 줄씩"""
+        if self.embedded is not None:
+            async for event in self.embedded.stream({"query": query}):
+                yield event
+            return
+
+        async with self.http_client.stream(
+            "POST",
+            f"{self.base_url}/chat",
+            json={"query": query, "stream": True},
+            headers={"Content-Type": "application/json"}
+        ) as response:
+            if response.status_code != 200:
+                raise RuntimeError(f"서비스 오류: {response.status_code}")
+
+            async for line in response.aiter_lines():
+                if line.strip():
+                    yield json.loads(line)
+
+    @staticmethod
+    def _graph_markdown(graph_image_url: str) -> str:
+        return f"📊 **커리큘럼 로드맵**\n\n![커리큘럼 그래프]({graph_image_url})"
+
+    def _success_response(self, message: str, graph_image_url: str, streamed: bool = False) -> Dict[str, Any]:
+        # 그래프 이미지 URL을 Markdown 형식으로 추가
+        if graph_image_url:
+            display_message = f"{message}\n\n{self._graph_markdown(graph_image_url)}"
+        else:
+            display_message = message
+
+        return self.create_response(
+            agent_type="curriculum",
+            result=message,
+            display=display_message,
+            metadata={
+                "source": "curriculum_service",
+                "response_length": len(message),
+                "graph_url": graph_image_url,
+                "streamed": streamed  # display 내용이 이미 on_part 로 전달됨
+            },
+            success=True
+        )
+
     def is_available(self) -> bool:
         """서비스 사용 가능 여부"""
         return self.http_client is not None
@@ -2,15 +2,19 @@ import os
 import httpx
 from .base_handler import BaseQueryHandler
 from config.settings import settings
+from utils.downstream import standalone_client
 from typing import Dict
 
 
 class DepartmentMappingHandler(BaseQueryHandler):
     """Department mapping handler for name normalization"""
 
-    def __init__(self):
+    def __init__(self, http_client: httpx.AsyncClient = None, embedded=None):
         super().__init__()
-        self.http = httpx.AsyncClient(timeout=10.0)
+        # LangGraphApp 의 공유 커넥션 풀 클라이언트 (단독 생성 시 자체 풀)
+        self.http = http_client or standalone_client("mapping")
+        # 임베디드 모드: department_mapping MappingService 직접 호출 (HTTP 응답과 같은 dict)
+        self.embedded = embedded
         self.mapping_service_url = os.getenv(
             "DEPARTMENT_MAPPING_URL", settings.mapping_service_url
         )
@@ -49,33 +53,41 @@ class DepartmentMappingHandler(BaseQueryHandler):
                 self.logger.info(f"[DEPT] 이전 컨텍스트 존재: {previous_context}")
 
             payload = {"query": final_query, "top_k": 1}
-            resp = await self.http.post(self.mapping_service_url, json=payload)
-
-            if resp.status_code == 200:
+            if self.embedded is not None:
+                data = await self.embedded.request(payload)
+            else:
+                resp = await self.http.post(self.mapping_service_url, json=payload)
+                if resp.status_code != 200:
+                    return self.create_response(
+                        agent_type="department_mapping",
+                        result=None,
+                        display=f"학과명 매핑 중 오류가 발생했습니다: HTTP {resp.status_code}",
+                        success=False
+                    )
                 data = resp.json()
-                # 실제 /map 엔드포인트 응답 구조: {"department": "학과명", "description": "학과 설명"}
-                dept_name = data.get("department", "학과를 찾을 수 없습니다.")
-                description = data.get("description", "설명이 없습니다.")
 
-                return self.create_response(
-                    agent_type="department_mapping",
-                    result=dept_name,
-                    normalized=dept_name,  # 정규화된 학과명
-                    display=f"학과: {dept_name}\n설명: {description}",
-                    metadata={
-                        "confidence": 1.0,  # 단일 결과이므로 1.0
-                        "source": "mapping_service",
-                        "original_query": user_message,
-                        "description": description  # description도 metadata에 포함
-                    },
-                    success=True
-                )
+            # 실제 /map 엔드포인트 응답 구조:
+            # {"department": "학과명", "description": "학과 설명", "candidates": [...], "match_type": "keyword"|"vector",
+            #  "confidence_margin": float (벡터 1위-2위 유사도 차이, 키워드 매칭이면 None)}
+            dept_name = data.get("department", "학과를 찾을 수 없습니다.")
+            description = data.get("description", "설명이 없습니다.")
+            candidates = data.get("candidates") or []
+            score = candidates[0].get("score", 1.0) if candidates else 1.0
 
             return self.create_response(
                 agent_type="department_mapping",
-                result=None,
-                display=f"학과명 매핑 중 오류가 발생했습니다: HTTP {resp.status_code}",
-                success=False
+                result=dept_name,
+                normalized=dept_name,  # 정규화된 학과명
+                display=f"학과: {dept_name}\n설명: {description}",
+                metadata={
+                    "confidence": score,  # 키워드 매칭은 1.0, 벡터 검색은 유사도
+                    "confidence_margin": data.get("confidence_margin"),
+                    "match_type": data.get("match_type") or (candidates[0].get("match_type") if candidates else None),
+                    "source": "mapping_service",
+                    "original_query": user_message,
+                    "description": description  # description도 metadata에 포함
+                },
+                success=True
             )
 
         except Exception as e:
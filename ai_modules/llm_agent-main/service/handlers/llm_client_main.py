@@ -1,11 +1,16 @@
 from langchain_openai import ChatOpenAI
 from langchain.schema import HumanMessage, SystemMessage
 import os
+import time
 import asyncio
 import json
 import re
 import logging
 
+from utils.metrics import LLM_DURATION, LLM_ERRORS, record_llm_usage
+from utils.recorder import record_llm
+from utils.tracing import detached_span, start_span
+
 logger = logging.getLogger(__name__)
 
 class LlmClient:
@@ -24,8 +29,11 @@ class LlmClient:
         """특정 설정으로 새로운 LlmClient 인스턴스 생성"""
         return cls(model=model, max_tokens=max_tokens)
 
-    async def chat(self, message: str, context: str = None, json_mode: bool = False) -> str:
-        """채팅 응답 생성"""
+    async def chat(self, message: str, context: str = None, json_mode: bool = False, json_schema: dict = None) -> str:
+        """채팅 응답 생성
+
+        json_schema: {"name", "schema", "strict"} - OpenAI structured output (스키마에 맞는 JSON 만 생성)
+        """
         # 메시지 구성
         messages = []
         if context:
@@ -33,11 +41,29 @@ class LlmClient:
         messages.append(HumanMessage(content=message))
 
         # JSON 모드 설정
-        llm = self.llm.bind(response_format={"type": "json_object"}) if json_mode else self.llm
-
-        response = await asyncio.get_event_loop().run_in_executor(
-            None, llm.invoke, messages
-        )
+        if json_schema:
+            llm = self.llm.bind(response_format={"type": "json_schema", "json_schema": json_schema})
+            json_mode = True
+        else:
+            llm = self.llm.bind(response_format={"type": "json_object"}) if json_mode else self.llm
+
+        start_time = time.perf_counter()
+        with start_span("llm.chat", kind="client", model=self.model, json_mode=json_mode) as span:
+            try:
+                response = await asyncio.get_event_loop().run_in_executor(
+                    None, llm.invoke, messages
+                )
+            except Exception:
+                LLM_ERRORS.inc(model=self.model)
+                LLM_DURATION.observe(time.perf_counter() - start_time, model=self.model, status="error")
+                raise
+            LLM_DURATION.observe(time.perf_counter() - start_time, model=self.model, status="ok")
+            usage = getattr(response, "usage_metadata", None)
+            record_llm_usage(self.model, usage)
+            if span is not None and usage:
+                span.attributes["tokens"] = usage.get("total_tokens")
+        record_llm(self.model, self._prompt_text(messages), response.content, time.perf_counter() - start_time,
+                   json_mode=json_mode)
         return response.content
 
     async def chat_stream(self, message: str, context: str = None):
@@ -47,10 +73,36 @@ class LlmClient:
             messages.append(SystemMessage(content=context))
         messages.append(HumanMessage(content=message))
         
-        # 🔥 LangChain astream 사용
-        async for chunk in self.llm.astream(messages):
-            if hasattr(chunk, 'content') and chunk.content:
-                yield chunk.content
+        # 🔥 LangChain astream 사용 (stream_usage: 마지막 청크에 토큰 사용량 포함)
+        start_time = time.perf_counter()
+        # yield 사이에 컨텍스트가 바뀔 수 있어 현재 스팬으로 올리지 않음
+        span = detached_span("llm.chat_stream", kind="client", model=self.model)
+        parts, ttft = [], None
+        try:
+            async for chunk in self.llm.astream(messages, stream_usage=True):
+                record_llm_usage(self.model, getattr(chunk, "usage_metadata", None))
+                if hasattr(chunk, 'content') and chunk.content:
+                    if ttft is None:
+                        ttft = time.perf_counter() - start_time
+                    parts.append(chunk.content)
+                    yield chunk.content
+        except Exception as e:
+            LLM_ERRORS.inc(model=self.model)
+            LLM_DURATION.observe(time.perf_counter() - start_time, model=self.model, status="error")
+            if span is not None:
+                span.set_error(e)
+            raise
+        finally:
+            if span is not None:
+                span.end()
+        LLM_DURATION.observe(time.perf_counter() - start_time, model=self.model, status="ok")
+        record_llm(self.model, self._prompt_text(messages), "".join(parts), time.perf_counter() - start_time,
+                   ttft=ttft, stream=True)
+
+    @staticmethod
+    def _prompt_text(messages) -> str:
+        # 녹화/재생에서 LLM 응답을 찾는 키 (OpenAI 요청의 messages content 를 줄바꿈으로 이은 것과 같음)
+        return "\n".join(str(message.content) for message in messages)
 
     def chat_completion(self, messages, model: str = None, **kwargs) -> str:
         """OpenAI 스타일 chat completion - chat 메서드를 동기로 래핑"""
@@ -0,0 +1,158 @@
+"""
+통합 분석기 (fused analyzer) - 히스토리 분석 + 라우팅 + 쿼리 확장을 LLM 호출 한 번으로
+
+- 출력은 FUSED_ANALYSIS_SCHEMA (OpenAI structured output, strict) 로 강제하고 FusedAnalysis 로 한 번 더 검증
+- 검증에 실패하면 None → 호출하는 쪽이 기존 3단계 경로(히스토리 분석 → 라우팅/확장 병렬)로 폴백
+"""
+import logging
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, ValidationError, validator
+
+from utils.json_utils import extract_json_block
+from utils.prompt_loader import load_prompt
+
+logger = logging.getLogger(__name__)
+
+COMPLEXITIES = ["light", "medium", "heavy"]
+OWNER_HINTS = [
+    "SQL_QUERY", "FAISS_SEARCH", "DEPARTMENT_MAPPING", "CURRICULUM_PLAN", "LLM_FALLBACK",
+    "DEPARTMENT_MAPPING+SQL_QUERY", "DEPARTMENT_MAPPING+FAISS_SEARCH",
+]
+
+FUSED_ANALYSIS_SCHEMA = {
+    "name": "fused_query_analysis",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "additionalProperties": False,
+        "required": ["is_continuation", "reconstructed_query", "history_usage", "routing", "expansion"],
+        "properties": {
+            "is_continuation": {"type": "boolean"},
+            "reconstructed_query": {"type": "string"},
+            "history_usage": {
+                "type": "object",
+                "additionalProperties": False,
+                "required": ["reuse_previous", "relationship", "context_integration"],
+                "properties": {
+                    "reuse_previous": {"type": "boolean"},
+                    "relationship": {"type": "string", "enum": ["continuation", "new_search"]},
+                    "context_integration": {"type": "string"},
+                },
+            },
+            "routing": {
+                "type": "object",
+                "additionalProperties": False,
+                "required": ["complexity", "owner_hint", "category", "reasoning", "plan", "execution_type"],
+                "properties": {
+                    "complexity": {"type": "string", "enum": COMPLEXITIES},
+                    "owner_hint": {"type": "string", "enum": OWNER_HINTS},
+                    "category": {"type": "string"},
+                    "reasoning": {"type": "string"},
+                    "plan": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "additionalProperties": False,
+                            "required": ["step", "agent", "goal"],
+                            "properties": {
+                                "step": {"type": "integer"},
+                                "agent": {"type": "string"},
+                                "goal": {"type": "string"},
+                            },
+                        },
+                    },
+                    "execution_type": {"type": "string", "enum": ["sequential", "parallel"]},
+                },
+            },
+            "expansion": {
+                "type": "object",
+                "additionalProperties": False,
+                "required": ["expansion_context", "expansion_keywords", "expansion_augmentation",
+                             "decision_question_type", "decision_data_source"],
+                "properties": {
+                    "expansion_context": {"type": "string"},
+                    "expansion_keywords": {"type": "string"},
+                    "expansion_augmentation": {"type": "string"},
+                    "decision_question_type": {"type": "string"},
+                    "decision_data_source": {"type": "string"},
+                },
+            },
+        },
+    },
+}
+
+
+class PlanStep(BaseModel):
+    step: int
+    agent: str
+    goal: str = ""
+
+
+class HistoryUsage(BaseModel):
+    reuse_previous: bool = False
+    relationship: str = "new_search"
+    context_integration: str = ""
+
+
+class FusedRouting(BaseModel):
+    complexity: str
+    owner_hint: str
+    category: str = ""
+    reasoning: str = ""
+    plan: List[PlanStep] = []
+    execution_type: str = "sequential"
+
+    @validator('complexity')
+    def validate_complexity(cls, v):
+        if v not in COMPLEXITIES:
+            raise ValueError(f'complexity must be one of {COMPLEXITIES}')
+        return v
+
+    @validator('owner_hint')
+    def validate_owner_hint(cls, v):
+        if v not in OWNER_HINTS:
+            raise ValueError(f'owner_hint must be one of {OWNER_HINTS}')
+        return v
+
+
+class FusedExpansion(BaseModel):
+    expansion_context: str = ""
+    expansion_keywords: str = ""
+    expansion_augmentation: str = ""
+    decision_question_type: str = ""
+    decision_data_source: str = ""
+
+
+class FusedAnalysis(BaseModel):
+    is_continuation: bool
+    reconstructed_query: str
+    history_usage: HistoryUsage
+    routing: FusedRouting
+    expansion: FusedExpansion
+
+    @validator('reconstructed_query')
+    def validate_reconstructed_query(cls, v):
+        if not v.strip() or v.strip() == "None":
+            raise ValueError('reconstructed_query cannot be empty')
+        return v.strip()
+
+
+async def analyze_fused_async(llm_client, query: str, history_context: str) -> Optional[FusedAnalysis]:
+    """통합 분석 (LLM 1회) - 스키마 검증에 실패하면 None"""
+    prompt = (load_prompt('fused_analyzer')
+              .replace('{history_context}', history_context or "(없음)")
+              .replace('{current_query}', query))
+
+    response = await llm_client.chat(prompt, json_schema=FUSED_ANALYSIS_SCHEMA)
+    data: Dict[str, Any] = extract_json_block(response) or {}
+
+    try:
+        analysis = FusedAnalysis(**data)
+    except (ValidationError, TypeError) as e:
+        logger.warning(f"⚠️ 통합 분석 결과 검증 실패: {e}")
+        return None
+
+    logger.info(f"🎯 통합 분석: 연속대화={analysis.is_continuation}, complexity={analysis.routing.complexity}, "
+                f"owner={analysis.routing.owner_hint}")
+    return analysis
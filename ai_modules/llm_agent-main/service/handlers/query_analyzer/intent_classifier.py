@@ -0,0 +1,172 @@
+"""
+로컬 의도 분류기 - LLM 라우터 앞단의 빠른 경로
+
+1. 규칙표 (키워드/정규식): 인사/잡담, 명확한 단일 의도 질문
+2. 임베딩 최근접 중심 (nearest centroid): 기록된 라우터 결정으로 학습한 경로별 중심 벡터 (benchmarks/intent_eval.py train)
+
+둘 다 확신이 없으면 None → 기존 LLM 라우터가 결정한다.
+학과 별칭(컴공/전전 ...)이나 질문 여러 개처럼 다중 에이전트가 필요할 수 있는 질문은 항상 LLM 에게 넘긴다.
+"""
+import json
+import logging
+import math
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+LOCAL_ROUTES = ("light", "medium_sql", "medium_vector", "medium_department", "medium_curriculum")
+
+# 경로별 라우터 결정 (router_prompt 출력과 같은 필드)
+ROUTE_DECISIONS = {
+    "light": {"complexity": "light", "owner_hint": "LLM_FALLBACK", "category": "general", "agent": None},
+    "medium_sql": {"complexity": "medium", "owner_hint": "SQL_QUERY", "category": "course_lookup", "agent": "SQL_QUERY"},
+    "medium_vector": {"complexity": "medium", "owner_hint": "FAISS_SEARCH", "category": "course_content",
+                      "agent": "FAISS_SEARCH"},
+    "medium_department": {"complexity": "medium", "owner_hint": "DEPARTMENT_MAPPING", "category": "course_lookup",
+                          "agent": "DEPARTMENT_MAPPING"},
+    "medium_curriculum": {"complexity": "medium", "owner_hint": "CURRICULUM_PLAN", "category": "curriculum_design",
+                          "agent": "CURRICULUM_PLAN"},
+}
+
+# 이런 표현이 있으면 규칙/임베딩 모두 건너뜀 (학과 별칭 → 학과 매핑 + 다른 에이전트, 비교/조건 → 다단계)
+DEFER_PATTERNS = (
+    re.compile(r"컴공|전전|소공|컴인|전컴|산공|기공|화공"),
+    re.compile(r"비교|차이|그리고|하고\s.*(하고|도)"),
+)
+
+ACADEMIC_PATTERN = re.compile(r"교수|과목|수업|강의|학과|학부|전공|학년|학기|학점|커리큘럼|수강|졸업|이수")
+
+# (경로, 정규식) - 위에서부터 검사, 서로 다른 경로가 둘 이상 맞으면 판단하지 않음
+RULES = (
+    ("light", re.compile(r"^\s*(안녕|하이|헬로|hello|hi|hey|반가워|반갑습니다|고마워|감사합니다|감사해요|ㅎㅇ|ㅋㅋ+|잘\s*가|바이)"
+                         r"[\s!?.~ㅎㅋ]*(요|하세요)?[\s!?.~]*$", re.IGNORECASE)),
+    ("light", re.compile(r"날씨|점심|저녁 메뉴|맛집|영화|노래|게임|주식|코인|연애|농담")),
+    ("medium_curriculum", re.compile(r"커리큘럼|로드맵|복수전공|융합전공|부전공|이수\s*계획")),
+    ("medium_sql", re.compile(r"교수(님)?\S*\s*(의\s*)?(과목|수업|강의|누구|가르치)|누가\s*(\S+\s*)?가르|담당\s*교수|"
+                              r"\d\s*학년\s*\d?\s*(학기)?\s*(과목|수업|강의|전공)|몇\s*학년|몇\s*학기|몇\s*학점|선수\s*과목")),
+    ("medium_vector", re.compile(r"추천|관련(된)?\s*(수업|과목|강의)|쉬운\s*(수업|과목|강의)|배우(고|려면)|들으면\s*좋")),
+    ("medium_department", re.compile(r"무슨\s*학과|어떤\s*학과|학과\s*소개|무엇을\s*배우는\s*학과|학과는\s*뭐")),
+)
+
+
+def make_decision(route: str, query: str, method: str, confidence: float) -> Dict[str, Any]:
+    """경로 → to_router_decision 과 같은 형태의 라우팅 결정"""
+    spec = ROUTE_DECISIONS[route]
+    plan = [{"step": 1, "agent": spec["agent"], "goal": query[:50]}] if spec["agent"] else []
+    return {
+        "complexity": spec["complexity"],
+        "is_complex": spec["complexity"] != "light",
+        "category": spec["category"],
+        "owner_hint": spec["owner_hint"],
+        "plan": plan,
+        "reasoning": f"로컬 분류기 ({method}, confidence={confidence:.2f})",
+        "local_route": route,
+        "local_method": method,
+        "local_confidence": round(confidence, 4),
+    }
+
+
+def classify_rules(query: str) -> Optional[str]:
+    """규칙표로 경로 결정 (확실하지 않으면 None)"""
+    text = query.strip()
+    if not text or text.count("?") > 1 or any(pattern.search(text) for pattern in DEFER_PATTERNS):
+        return None
+
+    routes = {route for route, pattern in RULES if pattern.search(text)}
+    # 잡담 단어가 있어도 학업 표현이 같이 있으면 잡담으로 보지 않음
+    if "light" in routes and ACADEMIC_PATTERN.search(text):
+        routes.discard("light")
+    return routes.pop() if len(routes) == 1 else None
+
+
+def normalize(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+
+def build_centroids(vectors_by_route: Dict[str, List[List[float]]]) -> Dict[str, Dict[str, Any]]:
+    """경로별 정규화 벡터 평균 → 다시 정규화한 중심 벡터"""
+    centroids = {}
+    for route, vectors in vectors_by_route.items():
+        if not vectors:
+            continue
+        vectors = [normalize(vector) for vector in vectors]
+        mean = [sum(values) / len(vectors) for values in zip(*vectors)]
+        centroids[route] = {"centroid": normalize(mean), "count": len(vectors)}
+    return centroids
+
+
+class IntentClassifier:
+    """규칙표 + 임베딩 최근접 중심 분류기 (확신이 없으면 None → LLM 라우터)"""
+
+    def __init__(self, centroids_path: str = None, embedding_model: str = "text-embedding-3-small",
+                 threshold: float = 0.8, margin: float = 0.05, embeddings=None):
+        self.threshold = threshold
+        self.margin = margin
+        self.embedding_model = embedding_model
+        self.centroids: Dict[str, List[float]] = {}
+        self._embeddings = embeddings
+
+        if centroids_path and os.path.exists(centroids_path):
+            self.load_centroids(centroids_path)
+        elif centroids_path:
+            logger.warning(f"⚠️ 의도 중심 벡터 파일 없음, 규칙표만 사용: {centroids_path}")
+
+    def load_centroids(self, path: str):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("model") and data["model"] != self.embedding_model:
+            logger.warning(f"⚠️ 중심 벡터 모델({data['model']})과 설정 모델({self.embedding_model})이 다름 → 파일 기준 사용")
+            self.embedding_model = data["model"]
+        self.centroids = {
+            route: entry["centroid"] for route, entry in data.get("routes", {}).items() if route in LOCAL_ROUTES
+        }
+        logger.info(f"🧭 의도 중심 벡터 로드: {sorted(self.centroids)} ({path})")
+
+    @property
+    def embeddings(self):
+        if self._embeddings is None:
+            from langchain_openai import OpenAIEmbeddings
+            # 짧은 질문 하나라 토큰 분할(tiktoken) 불필요
+            self._embeddings = OpenAIEmbeddings(
+                model=self.embedding_model,
+                openai_api_key=os.getenv("OPENAI_API_KEY"),
+                check_embedding_ctx_length=False
+            )
+        return self._embeddings
+
+    def nearest(self, vector: List[float]) -> Optional[Dict[str, Any]]:
+        """가장 가까운 중심 (코사인), 2등과의 차이 포함"""
+        if not self.centroids:
+            return None
+        vector = normalize(vector)
+        scores = sorted(
+            ((sum(a * b for a, b in zip(vector, centroid)), route) for route, centroid in self.centroids.items()),
+            reverse=True
+        )
+        best_score, best_route = scores[0]
+        runner_up = scores[1][0] if len(scores) > 1 else -1.0
+        return {"route": best_route, "score": best_score, "margin": best_score - runner_up}
+
+    async def classify(self, query: str) -> Optional[Dict[str, Any]]:
+        """로컬 라우팅 결정 (규칙 → 임베딩) - 확신이 없거나 오류면 None"""
+        route = classify_rules(query)
+        if route:
+            return make_decision(route, query, "rule", 1.0)
+
+        if not self.centroids or any(pattern.search(query) for pattern in DEFER_PATTERNS):
+            return None
+
+        try:
+            vector = await self.embeddings.aembed_query(query)
+        except Exception as e:
+            logger.warning(f"⚠️ 의도 분류 임베딩 실패, LLM 라우터 사용: {e}")
+            return None
+
+        match = self.nearest(vector)
+        if match["score"] < self.threshold or match["margin"] < self.margin:
+            logger.info(f"🧭 로컬 분류 보류: {match['route']} score={match['score']:.3f} margin={match['margin']:.3f}")
+            return None
+        return make_decision(match["route"], query, "centroid", match["score"])
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import logging
 import asyncio
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from .llm_client_main import LlmClient
 from .query_analyzer.analyzer import (
@@ -10,6 +10,9 @@ from .query_analyzer.analyzer import (
     expand_query_async,
     combine_expansion_with_query
 )
+from .query_analyzer.fused import analyze_fused_async
+from utils.json_utils import to_router_decision
+from utils.metrics import FUSED_ANALYSIS
 
 logger = logging.getLogger(__name__)
 
@@ -57,4 +60,65 @@ class QueryAnalyzer:
         }
 
         logger.info(f"✅ 쿼리 분석 완료 (병렬+확장): complexity={complexity}")
-        return combined_result
\ No newline at end of file
+        return combined_result
+
+    async def analyze_with_decision(self, query: str, decision: Dict[str, Any], is_reconstructed: bool = False) -> Dict[str, Any]:
+        """로컬 분류기가 정한 라우팅으로 분석 - 라우터 LLM 호출 생략, 확장은 light 가 아닐 때만"""
+        if decision.get("complexity") == "light":
+            expansion_result = {}
+            enhanced_query = query
+        else:
+            expansion_result = await expand_query_async(self.llm_client, query)
+            enhanced_query = combine_expansion_with_query(query, expansion_result)
+
+        return {
+            **decision,
+            **expansion_result,
+            "original_query": query,
+            "enhanced_query": enhanced_query,
+            "analysis_method": f"local_{decision.get('local_method', 'rule')}",
+            "analyzer_type": "LocalIntentClassifier",
+            "has_context": False,
+            "is_reconstructed": is_reconstructed
+        }
+
+    async def analyze_fused(self, query: str, history_context: str) -> Optional[Dict[str, Any]]:
+        """통합 분석 - 히스토리 분석 + 라우팅 + 확장을 LLM 1회로 (실패 시 None → 기존 경로로 폴백)
+
+        반환: {"history": 히스토리 분석 결과, "analysis": analyze_query_parallel 과 같은 형태의 결과}
+        """
+        try:
+            fused = await analyze_fused_async(self.llm_client, query, history_context)
+        except Exception as e:
+            logger.warning(f"⚠️ 통합 분석 호출 실패: {e}")
+            fused = None
+
+        if fused is None:
+            FUSED_ANALYSIS.inc(result="fallback")
+            return None
+        FUSED_ANALYSIS.inc(result="ok")
+
+        # 새로운 질문이면 기존 경로와 같이 마지막 질문만 사용
+        from service.nodes.utils import extract_last_question
+        reconstructed_query = fused.reconstructed_query if fused.is_continuation else extract_last_question(query)
+        analysis_result = to_router_decision(fused.routing.model_dump())
+        expansion_result = fused.expansion.model_dump()
+        enhanced_query = combine_expansion_with_query(reconstructed_query, expansion_result)
+
+        return {
+            "history": {
+                "is_continuation": fused.is_continuation,
+                "reconstructed_query": reconstructed_query,
+                "history_usage": fused.history_usage.model_dump()
+            },
+            "analysis": {
+                **analysis_result,
+                **expansion_result,
+                "original_query": reconstructed_query,
+                "enhanced_query": enhanced_query,
+                "analysis_method": "fused",
+                "analyzer_type": "LangChain_Fused",
+                "has_context": True,
+                "is_reconstructed": fused.is_continuation
+            }
+        }
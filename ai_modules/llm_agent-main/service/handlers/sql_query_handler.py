@@ -4,11 +4,15 @@
 import httpx
 from .base_handler import BaseQueryHandler
 from config.settings import settings
+from utils.downstream import standalone_client
 
 class SqlQueryHandler(BaseQueryHandler):
-    def __init__(self):
+    def __init__(self, http_client: httpx.AsyncClient = None, embedded=None):
         super().__init__()
-        self.http_client = httpx.AsyncClient(timeout=30.0)
+        # LangGraphApp 의 공유 커넥션 풀 클라이언트 (단독 생성 시 자체 풀)
+        self.http_client = http_client or standalone_client("sql")
+        # 임베디드 모드: tool_sql SqlService 직접 호출 (HTTP 응답과 같은 dict)
+        self.embedded = embedded
         self.sql_service_url = settings.sql_service_url
 
     def is_available(self) -> bool:
@@ -30,33 +34,35 @@ class SqlQueryHandler(BaseQueryHandler):
         self.logger.info(f"🔍 SQL 쿼리 사용: '{query_to_use}'")
 
         try:
-            response = await self.http_client.post(
-                self.sql_service_url,
-                json={"query": query_to_use}
-            )
-
-            if response.status_code == 200:
-                result = response.json()
-                db_result = result.get("result", result.get("message", "조회 결과를 가져올 수 없습니다."))
-
-                return self.create_response(
-                    agent_type="sql_query",
-                    result=db_result,
-                    display=str(db_result),
-                    metadata={
-                        "source": "sql_service",
-                        "query": user_message,
-                        "response_length": len(str(db_result))
-                    },
-                    success=True
-                )
+            if self.embedded is not None:
+                result = await self.embedded.request({"query": query_to_use})
             else:
-                return self.create_response(
-                    agent_type="sql_query",
-                    result=None,
-                    display=f"데이터베이스 조회 실패 (상태코드: {response.status_code})",
-                    success=False
+                response = await self.http_client.post(
+                    self.sql_service_url,
+                    json={"query": query_to_use}
                 )
+                if response.status_code != 200:
+                    return self.create_response(
+                        agent_type="sql_query",
+                        result=None,
+                        display=f"데이터베이스 조회 실패 (상태코드: {response.status_code})",
+                        success=False
+                    )
+                result = response.json()
+
+            db_result = result.get("result", result.get("message", "조회 결과를 가져올 수 없습니다."))
+
+            return self.create_response(
+                agent_type="sql_query",
+                result=db_result,
+                display=str(db_result),
+                metadata={
+                    "source": "sql_service",
+                    "query": user_message,
+                    "response_length": len(str(db_result))
+                },
+                success=True
+            )
 
         except Exception as e:
             self.logger.error(f"SQL 처리 실패: {e}")
@@ -1,14 +1,18 @@
 import httpx
 from .base_handler import BaseQueryHandler
 from config.settings import settings
+from utils.downstream import standalone_client
 from typing import Dict, List
 
 class VectorSearchHandler(BaseQueryHandler):
     """초간단 FAISS 벡터 검색 핸들러"""
 
-    def __init__(self):
+    def __init__(self, http_client: httpx.AsyncClient = None, embedded=None):
         super().__init__()
-        self.http_client = httpx.AsyncClient(timeout=30.0)
+        # LangGraphApp 의 공유 커넥션 풀 클라이언트 (단독 생성 시 자체 풀)
+        self.http_client = http_client or standalone_client("vector")
+        # 임베디드 모드: faiss_search SearchService 직접 호출 (HTTP 응답과 같은 dict)
+        self.embedded = embedded
         self.faiss_service_url = settings.search_service_url
 
     def is_available(self) -> bool:
@@ -37,42 +41,44 @@ class VectorSearchHandler(BaseQueryHandler):
 
             # API 호출
             payload = {"query": query_text, "count": 3}
-            response = await self.http_client.post(self.faiss_service_url, json=payload)
-
-            if response.status_code == 200:
+            if self.embedded is not None:
+                data = await self.embedded.request(payload)
+            else:
+                response = await self.http_client.post(self.faiss_service_url, json=payload)
+                if response.status_code != 200:
+                    self.logger.error(f"API 오류: {response.status_code}")
+                    return self.create_response(
+                        agent_type="vector_search",
+                        result=[],
+                        display=f"벡터 검색 API 오류: HTTP {response.status_code}",
+                        success=False
+                    )
                 data = response.json()
-                results = data.get('results', []) if isinstance(data, dict) else data
 
-                # 결과가 있으면 name과 department를 추출해서 정규화
-                course_info = []
-                if results:
-                    for item in results[:5]:
-                        name = item.get("name", "")
-                        department = item.get("department", "")
-                        if name:
-                            info = f"{name}" + (f" ({department})" if department else "")
-                            course_info.append(info)
+            results = data.get('results', []) if isinstance(data, dict) else data
 
-                return self.create_response(
-                    agent_type="vector_search",
-                    result=results,
-                    normalized=", ".join(course_info),  # 과목명과 학과명으로 정규화
-                    display=f"검색된 강의 {len(results)}개: {', '.join(course_info)} ",
-                    metadata={
-                        "count": len(results),
-                        "query_text": query_text,
-                        "source": "faiss_service"
-                    },
-                    success=True
-                )
-            else:
-                self.logger.error(f"API 오류: {response.status_code}")
-                return self.create_response(
-                    agent_type="vector_search",
-                    result=[],
-                    display=f"벡터 검색 API 오류: HTTP {response.status_code}",
-                    success=False
-                )
+            # 결과가 있으면 name과 department를 추출해서 정규화
+            course_info = []
+            if results:
+                for item in results[:5]:
+                    name = item.get("name", "")
+                    department = item.get("department", "")
+                    if name:
+                        info = f"{name}" + (f" ({department})" if department else "")
+                        course_info.append(info)
+
+            return self.create_response(
+                agent_type="vector_search",
+                result=results,
+                normalized=", ".join(course_info),  # 과목명과 학과명으로 정규화
+                display=f"검색된 강의 {len(results)}개: {', '.join(course_info)} ",
+                metadata={
+                    "count": len(results),
+                    "query_text": query_text,
+                    "source": "faiss_service"
+                },
+                success=True
+            )
 
         except Exception as e:
             self.logger.error(f"벡터 검색 실패: {e}")
@@ -14,10 +14,9 @@ class ConversationContextAnalyzer:
     async def analyze_session_context(self, current_query: str, conversation_memory, session_id: str) -> Dict[str, Any]:
         """히스토리 분석 + 질의 재구성 통합 (1번의 LLM 호출)"""
         try:
-            session_state = conversation_memory.get_state(session_id)
-            history = session_state.get("conversation_history", [])
+            history_context = self.get_history_context(conversation_memory, session_id)
 
-            if not history:
+            if not history_context:
                 return {
                     "is_continuation": False,
                     "reconstructed_query": current_query,
@@ -28,9 +27,6 @@ class ConversationContextAnalyzer:
                     }
                 }
 
-            # 히스토리 포맷팅
-            history_context = self._format_history(history)
-
             # 통합 프롬프트 로드 및 구성 (히스토리 분석 + 질의 재구성)
             prompt = load_prompt('integrated_history_analyzer').format(
                 history_context=history_context,
@@ -93,6 +89,12 @@ class ConversationContextAnalyzer:
                 }
             }
 
+    def get_history_context(self, conversation_memory, session_id: str) -> str:
+        """세션 히스토리를 프롬프트용 문자열로 (히스토리가 없으면 빈 문자열)"""
+        session_state = conversation_memory.get_state(session_id)
+        history = session_state.get("conversation_history", [])
+        return self._format_history(history) if history else ""
+
     def _format_history(self, history):
         """히스토리 포맷팅 - 맥락 보존을 위해 전체 정보 포함"""
         formatted = []
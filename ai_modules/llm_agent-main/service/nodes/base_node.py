@@ -1,7 +1,10 @@
+import re
 import time
 import logging
 from typing import Dict, Any, List
 from langchain_core.messages import BaseMessage, HumanMessage
+from utils.metrics import NODE_DURATION
+from utils.tracing import start_span
 
 logger = logging.getLogger(__name__)
 
@@ -61,14 +64,21 @@ class BaseNode:
 
 
 class NodeTimer:
-    """노드 실행 시간 측정 컨텍스트 매니저"""
+    """노드 실행 시간 측정 컨텍스트 매니저 (로그 + agent_node_duration_seconds 메트릭 + node.* 스팬)"""
 
-    def __init__(self, node_name: str):
+    def __init__(self, node_name: str, metric_name: str = None):
         self.node_name = node_name
+        # 메트릭 라벨: MediumCurriculum → medium_curriculum, MediumSQL → medium_sql (약어는 한 단어로)
+        self.metric_name = metric_name or re.sub(
+            r"(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])", "_", node_name
+        ).lower()
         self.start_time = None
+        self._span = None
 
     def __enter__(self):
         self.start_time = time.time()
+        self._span = start_span(f"node.{self.metric_name}")
+        self._span.__enter__()
         logger.info(f"⏱️ {self.node_name} 노드 실행 시작")
         return self
 
@@ -78,6 +88,8 @@ class NodeTimer:
             logger.info(f"✅ {self.node_name} 노드 완료 ({duration:.2f}초)")
         else:
             logger.error(f"❌ {self.node_name} 노드 실패 ({duration:.2f}초): {exc_val}")
+        NODE_DURATION.observe(duration, node=self.metric_name, status="ok" if exc_type is None else "error")
+        self._span.__exit__(exc_type, exc_val, exc_tb)
 
     @property
     def duration(self):
@@ -1,4 +1,5 @@
 import logging
+from utils.metrics import ROUTE_TOTAL
 from .routing_nodes import RoutingNodes
 from .synthesis_nodes import SynthesisNodes
 from .query_route.light_nodes import LightNodes
@@ -14,10 +15,10 @@ class NodeManager:
                  sql_handler=None, vector_handler=None,
                  dept_handler=None, curriculum_handler=None,
                  result_synthesizer=None, conversation_memory=None,
-                 llm_client=None):
+                 llm_client=None, intent_classifier=None):
 
         # Node categories 초기화
-        self.routing = RoutingNodes(query_analyzer, conversation_memory, llm_client)
+        self.routing = RoutingNodes(query_analyzer, conversation_memory, llm_client, intent_classifier)
         self.light = LightNodes(llm_handler)
         self.medium = MediumNodes(sql_handler, vector_handler, dept_handler, curriculum_handler)
         self.heavy = HeavyNodes(
@@ -66,55 +67,61 @@ class NodeManager:
         """조건부 엣지들 반환 (LangGraph 등록용)"""
 
         def route_by_complexity(state: dict) -> str:
-            """복잡도에 따른 세부 라우팅"""
-            # 재라우팅 요청이 있으면 라우트 노드로
-            if state.get("needs_reroute"):
-                return "router"
-
-            complexity = state.get("route", "light")  # 기본값을 light로 변경
-            owner_hint = state.get("owner_hint", "").upper()
-            plan = state.get("plan", []) or []
-
-            # Light 복잡도
-            if complexity == "light":
-                return "light"
-
-            # Medium 복잡도 - owner_hint 우선, plan 보조
-            elif complexity == "medium":
-                # 1. owner_hint 우선 검사
-                if "FAISS_SEARCH" in owner_hint or "VECTOR" in owner_hint:
-                    return "medium_vector"
-                elif "SQL_QUERY" in owner_hint:
-                    return "medium_sql"
-                elif "CURRICULUM" in owner_hint:
-                    return "medium_curriculum"
-                elif "DEPARTMENT_MAPPING" in owner_hint or "MAPPING" in owner_hint:
-                    return "medium_department"
-
-                # 2. plan 기반 검사 (owner_hint가 명확하지 않을 때)
-                elif plan and len(plan) > 0:
-                    first_agent = plan[0].get("agent", "").upper()
-                    if "SQL" in first_agent:
-                        return "medium_sql"
-                    elif "VECTOR" in first_agent or "FAISS" in first_agent or "SEARCH" in first_agent:
-                        return "medium_vector"
-                    elif "CURRICULUM" in first_agent:
-                        return "medium_curriculum"
-                    elif "DEPARTMENT" in first_agent or "MAPPING" in first_agent:
-                        return "medium_department"
-                    else:
-                        return "light"  # 특별한 처리가 필요없으면 light로
-                else:
-                    return "light"  # owner_hint와 plan 모두 없으면 light로
-
-            # Heavy 복잡도
-            elif complexity == "heavy":
-                return "heavy_sequential"
-
-            # 기본값
-            return "light"
+            """복잡도에 따른 세부 라우팅 (결과는 agent_route_total 로 집계)"""
+            route = select_route(state)
+            ROUTE_TOTAL.inc(route=route)
+            return route
 
         return {
             "route_by_complexity": route_by_complexity
         }
 
+
+def select_route(state: dict) -> str:
+    """router 결과(route/owner_hint/plan)로 다음 노드 결정 (benchmarks/intent_eval.py 에서도 사용)"""
+    # 재라우팅 요청이 있으면 라우트 노드로
+    if state.get("needs_reroute"):
+        return "router"
+
+    complexity = state.get("route", "light")  # 기본값을 light로 변경
+    owner_hint = state.get("owner_hint", "").upper()
+    plan = state.get("plan", []) or []
+
+    # Light 복잡도
+    if complexity == "light":
+        return "light"
+
+    # Medium 복잡도 - owner_hint 우선, plan 보조
+    elif complexity == "medium":
+        # 1. owner_hint 우선 검사
+        if "FAISS_SEARCH" in owner_hint or "VECTOR" in owner_hint:
+            return "medium_vector"
+        elif "SQL_QUERY" in owner_hint:
+            return "medium_sql"
+        elif "CURRICULUM" in owner_hint:
+            return "medium_curriculum"
+        elif "DEPARTMENT_MAPPING" in owner_hint or "MAPPING" in owner_hint:
+            return "medium_department"
+
+        # 2. plan 기반 검사 (owner_hint가 명확하지 않을 때)
+        elif plan and len(plan) > 0:
+            first_agent = plan[0].get("agent", "").upper()
+            if "SQL" in first_agent:
+                return "medium_sql"
+            elif "VECTOR" in first_agent or "FAISS" in first_agent or "SEARCH" in first_agent:
+                return "medium_vector"
+            elif "CURRICULUM" in first_agent:
+                return "medium_curriculum"
+            elif "DEPARTMENT" in first_agent or "MAPPING" in first_agent:
+                return "medium_department"
+            else:
+                return "light"  # 특별한 처리가 필요없으면 light로
+        else:
+            return "light"  # owner_hint와 plan 모두 없으면 light로
+
+    # Heavy 복잡도
+    elif complexity == "heavy":
+        return "heavy_sequential"
+
+    # 기본값
+    return "light"
@@ -43,11 +43,26 @@ class MediumNodes(BaseNode):
                 "analysis": analysis
             }
 
-            result = await handler.handle(
-                user_message=user_message,  # 재구성된 쿼리 전달
-                query_analysis=query_analysis,
-                state=state
+            # 스트리밍 요청이면 커리큘럼 결과를 단계별로 바로 전달 (과목 목록 → 그래프)
+            streamed = (
+                handler_type == "curriculum"
+                and state.get("progressive_stream")
+                and state.get("stream_callback") is not None
+                and hasattr(handler, "handle_stream")
             )
+            if streamed:
+                result = await handler.handle_stream(
+                    user_message=user_message,
+                    query_analysis=query_analysis,
+                    on_part=state["stream_callback"],
+                    state=state
+                )
+            else:
+                result = await handler.handle(
+                    user_message=user_message,  # 재구성된 쿼리 전달
+                    query_analysis=query_analysis,
+                    state=state
+                )
 
             # handle 메서드 결과 처리 - utils 함수 사용
             if isinstance(result, dict) and result.get('agent_type') == 'vector_search':
@@ -65,6 +80,8 @@ class MediumNodes(BaseNode):
 
             return self.add_step_time(state, {
                 "final_result": response,
+                "final_streamed": bool(streamed and isinstance(result, dict)
+                                       and result.get("metadata", {}).get("streamed")),
                 "processing_type": f"medium_{handler_type}",
                 "complexity": "medium"
             }, timer)
@@ -3,16 +3,18 @@ from typing import Dict, Any
 from .base_node import BaseNode, NodeTimer
 from .utils import extract_last_question, extract_history_context
 from .route.utils import generate_initial_feedback, generate_routing_feedback
+from utils.metrics import LOCAL_ROUTER
 
 logger = logging.getLogger(__name__)
 
 class RoutingNodes(BaseNode):
     """라우팅 관련 노드들"""
 
-    def __init__(self, query_analyzer, conversation_memory=None, llm_client=None):
+    def __init__(self, query_analyzer, conversation_memory=None, llm_client=None, intent_classifier=None):
         self.query_analyzer = query_analyzer
         self.conversation_memory = conversation_memory
         self.llm_client = llm_client
+        self.intent_classifier = intent_classifier  # 로컬 빠른 경로 (None 이면 항상 LLM 라우터)
 
     async def router_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """라우터 노드 - 복잡도 분석 및 라우팅"""
@@ -51,13 +53,32 @@ class RoutingNodes(BaseNode):
             if initial_msg and state.get("stream_callback"):
                 await state["stream_callback"](initial_msg)
 
-            # 쿼리 분석 (이미 재구성된 쿼리 사용, 히스토리 불필요)
-            analysis_result = await self.query_analyzer.analyze_query_parallel(
-                query_for_analysis.strip(),
-                session_id=session_id,
-                is_reconstructed=is_continuation,
-                history_context=""  # 이미 재구성되었으므로 히스토리 불필요
-            )
+            # 쿼리 분석 (통합 분석기가 이미 했으면 재사용, 아니면 재구성된 쿼리로 분석 - 히스토리 불필요)
+            analysis_result = state.get("precomputed_analysis")
+            if analysis_result:
+                logger.info("♻️ 미리 계산된 분석 결과 재사용 (통합 분석기 또는 추측 라우팅)")
+            else:
+                # 로컬 분류기가 확신하면 라우터 LLM 호출 생략
+                local_decision = None
+                if self.intent_classifier:
+                    local_decision = await self.intent_classifier.classify(query_for_analysis.strip())
+                    LOCAL_ROUTER.inc(
+                        method=local_decision["local_method"] if local_decision else "deferred",
+                        route=local_decision["local_route"] if local_decision else "llm"
+                    )
+
+                if local_decision:
+                    logger.info(f"🧭 로컬 라우팅: {local_decision['local_route']} ({local_decision['local_method']})")
+                    analysis_result = await self.query_analyzer.analyze_with_decision(
+                        query_for_analysis.strip(), local_decision, is_reconstructed=is_continuation
+                    )
+                else:
+                    analysis_result = await self.query_analyzer.analyze_query_parallel(
+                        query_for_analysis.strip(),
+                        session_id=session_id,
+                        is_reconstructed=is_continuation,
+                        history_context=""  # 이미 재구성되었으므로 히스토리 불필요
+                    )
 
             complexity = analysis_result.get('complexity', 'medium')
             plan = analysis_result.get('plan', []) or []
@@ -19,7 +19,7 @@ class SynthesisNodes(BaseNode):
 
     async def synthesis_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """결과 합성 노드 - 실제 LLM 합성 수행 (department는 1000자 제한)"""
-        with NodeTimer("합성") as timer:
+        with NodeTimer("합성", metric_name="synthesis") as timer:
             try:
                 final_result = state.get("final_result")
                 processing_type = state.get("processing_type", "")
@@ -0,0 +1,244 @@
+"""
+하위 서비스(sql/vector/mapping/curriculum) HTTP 전송 계층
+
+- 커넥션 풀 하나를 모든 핸들러가 공유 (keep-alive, 연결 수 제한, 선택적 HTTP/2)
+- 연결 실패/502·503·504 는 지터 백오프로 재시도 (하위 서비스 엔드포인트는 모두 조회용이라 POST 도 재시도 가능)
+- 서비스별 서킷 브레이커: 연속 실패가 쌓이면 즉시 실패, reset_timeout 뒤 요청 하나로 복구 여부 확인 (half-open)
+- 빠른 서비스(mapping)는 헤지: 첫 응답이 늦으면 같은 요청을 하나 더 보내고 먼저 온 응답 사용
+
+LangGraphApp 이 DownstreamPool 을 소유하고 lifespan 종료 시 aclose() 로 닫는다.
+"""
+import asyncio
+import logging
+import random
+import time
+from typing import Dict
+
+import httpx
+
+from config.settings import settings
+from utils.metrics import MetricsTransport, DOWNSTREAM_RETRIES, DOWNSTREAM_HEDGES, CIRCUIT_REJECTIONS
+from utils.recorder import RecordingTransport
+from utils.tracing import TracingTransport
+
+logger = logging.getLogger(__name__)
+
+# 서비스별 정책 - timeout(초), hedge(헤지 여부), retry_status(5xx 응답/연결 중 끊김도 재시도할지)
+# curriculum 은 LLM/렌더링으로 수십 초 걸리므로 요청이 전달되지 않은 연결 실패만 재시도
+# vector 는 요청마다 LLM 프리필터 + 임베딩 호출이라 대부분 hedge_delay 를 넘고, faiss 서비스가 이벤트 루프를
+# 막는 동기 코드라 헤지 요청은 첫 요청 뒤에 줄만 서므로 헤지하지 않음 (OpenAI 비용만 두 배)
+SERVICE_POLICIES = {
+    "sql": {"timeout": 30.0, "hedge": False, "retry_status": True},
+    "vector": {"timeout": 30.0, "hedge": False, "retry_status": True},
+    "mapping": {"timeout": 10.0, "hedge": True, "retry_status": True},
+    "curriculum": {"timeout": 120.0, "hedge": False, "retry_status": False},
+}
+
+# 연결 실패는 요청이 서버에 전달되지 않았으므로 항상 재시도 가능
+# RemoteProtocolError 는 서버가 요청을 받은 뒤일 수 있어 retry_status 서비스에서만 재시도
+CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+RETRYABLE_ERRORS = CONNECT_ERRORS + (httpx.RemoteProtocolError,)
+RETRYABLE_STATUS = (502, 503, 504)
+MAX_BACKOFF_SEC = 2.0
+
+
+class CircuitOpenError(httpx.TransportError):
+    """서킷이 열려 있어 요청을 보내지 않고 즉시 실패"""
+
+
+class CircuitBreaker:
+    """closed → (연속 실패 failure_threshold 회) → open → (reset_timeout 경과) → half_open → 성공 시 closed"""
+
+    def __init__(self, name: str, failure_threshold: int = None, reset_timeout: float = None):
+        self.name = name
+        self.failure_threshold = failure_threshold or settings.circuit_failure_threshold
+        self.reset_timeout = reset_timeout if reset_timeout is not None else settings.circuit_reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_started = 0.0
+
+    def allow(self) -> bool:
+        """요청을 보내도 되는지 - half_open 에서는 탐침 요청 하나만 통과"""
+        if self.state == "closed":
+            return True
+
+        now = time.monotonic()
+        if self.state == "open":
+            if now - self.opened_at < self.reset_timeout:
+                return False
+            self.state = "half_open"
+            logger.info(f"🔌 [{self.name}] 서킷 half-open - 탐침 요청 전송")
+        elif now - self._probe_started < self.reset_timeout:
+            # 탐침 요청이 아직 진행 중 (응답 없이 끝난 탐침은 reset_timeout 뒤 다시 허용)
+            return False
+
+        self._probe_started = now
+        return True
+
+    def record_success(self):
+        if self.state != "closed":
+            logger.info(f"✅ [{self.name}] 서킷 닫힘 - 하위 서비스 복구")
+        self.state = "closed"
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+            logger.warning(f"⚠️ [{self.name}] 서킷 열림 - 연속 실패 {self.failures}회, {self.reset_timeout:.0f}초간 즉시 실패")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+
+def _backoff(attempt: int) -> float:
+    """full jitter 지수 백오프 (초)"""
+    return random.uniform(0, min(MAX_BACKOFF_SEC, settings.downstream_backoff_base * (2 ** attempt)))
+
+
+def _discard(task: asyncio.Task):
+    """헤지에서 진 요청 정리 - 취소하고, 이미 응답이 왔으면 연결 반환"""
+    def _close_response(done: asyncio.Task):
+        if not done.cancelled() and done.exception() is None:
+            asyncio.ensure_future(done.result().aclose())
+
+    task.cancel()
+    task.add_done_callback(_close_response)
+
+
+class ResilientTransport(httpx.AsyncBaseTransport):
+    """서킷 브레이커 + 재시도 + (선택) 헤지 - 공유 커넥션 풀 위에 서비스마다 하나씩"""
+
+    def __init__(self, service: str, transport: httpx.AsyncBaseTransport, hedge: bool = False,
+                 retry_status: bool = True, retries: int = None, hedge_delay: float = None):
+        self.service = service
+        self.breaker = CircuitBreaker(service)
+        self.hedge = hedge
+        self.retry_status = retry_status
+        self.retries = settings.downstream_retries if retries is None else retries
+        self.hedge_delay = settings.downstream_hedge_delay_ms / 1000 if hedge_delay is None else hedge_delay
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        error = None
+        for attempt in range(self.retries + 1):
+            if not self.breaker.allow():
+                CIRCUIT_REJECTIONS.inc(service=self.service)
+                raise CircuitOpenError(f"{self.service} 서킷 열림 - 요청을 보내지 않음", request=request)
+
+            try:
+                response = await (self._send_hedged(request) if self.hedge else self._transport.handle_async_request(request))
+            except RETRYABLE_ERRORS as e:
+                self.breaker.record_failure()
+                if not (self.retry_status or isinstance(e, CONNECT_ERRORS)):
+                    raise
+                error = e
+                reason = type(e).__name__
+            except Exception:
+                self.breaker.record_failure()
+                raise
+            else:
+                if response.status_code < 500:
+                    self.breaker.record_success()
+                    return response
+                self.breaker.record_failure()
+                if not (self.retry_status and response.status_code in RETRYABLE_STATUS and attempt < self.retries):
+                    return response
+                await response.aclose()
+                reason = str(response.status_code)
+
+            if attempt < self.retries:
+                DOWNSTREAM_RETRIES.inc(service=self.service, reason=reason)
+                delay = _backoff(attempt)
+                logger.warning(f"🔁 [{self.service}] 재시도 {attempt + 1}/{self.retries} ({reason}, {delay * 1000:.0f}ms 후)")
+                await asyncio.sleep(delay)
+        raise error
+
+    async def _send_hedged(self, request: httpx.Request) -> httpx.Response:
+        """첫 요청이 hedge_delay 안에 끝나지 않으면 같은 요청을 하나 더 보내 먼저 성공한 쪽 사용"""
+        primary = asyncio.ensure_future(self._transport.handle_async_request(request))
+        pending = {primary}
+        fallback = None  # 둘 다 실패하면 마지막 결과(5xx 응답 또는 예외)를 그대로 전달
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self.hedge_delay)
+            if done:
+                return primary.result()
+
+            hedge = asyncio.ensure_future(self._transport.handle_async_request(request))
+            labels = {primary: "primary", hedge: "hedge"}
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and task.result().status_code < 500:
+                        DOWNSTREAM_HEDGES.inc(service=self.service, winner=labels[task])
+                        for other in (done | pending | {fallback}) - {task, None}:
+                            _discard(other)
+                        pending = set()
+                        return task.result()
+                    if fallback is not None and fallback.exception() is None:
+                        await fallback.result().aclose()
+                    fallback = task
+        except asyncio.CancelledError:
+            for task in pending:
+                _discard(task)
+            raise
+
+        DOWNSTREAM_HEDGES.inc(service=self.service, winner="none")
+        return fallback.result()
+
+    async def aclose(self):
+        # 공유 커넥션 풀은 DownstreamPool 이 닫음
+        pass
+
+
+class DownstreamPool:
+    """하위 서비스 클라이언트 모음 - 커넥션 풀 하나 + 서비스별 전송 계층 (추적 → 메트릭 → 녹화 → 재시도/서킷 → 풀)"""
+
+    def __init__(self, http2: bool = None):
+        http2 = settings.downstream_http2 if http2 is None else http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("⚠️ DOWNSTREAM_HTTP2=true 이지만 h2 패키지가 없어 HTTP/1.1 사용 (pip install httpx[http2])")
+                http2 = False
+
+        self._transport = httpx.AsyncHTTPTransport(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.downstream_max_connections,
+                max_keepalive_connections=settings.downstream_max_keepalive,
+                keepalive_expiry=settings.downstream_keepalive_expiry
+            )
+        )
+        self.transports: Dict[str, ResilientTransport] = {}
+        self.clients: Dict[str, httpx.AsyncClient] = {}
+        logger.info(f"🔗 하위 서비스 커넥션 풀 생성 (http2={http2}, 최대 연결 {settings.downstream_max_connections})")
+
+    def client(self, service: str) -> httpx.AsyncClient:
+        """서비스별 AsyncClient (처음 요청 시 생성, 이후 재사용)"""
+        if service not in self.clients:
+            policy = SERVICE_POLICIES[service]
+            resilient = ResilientTransport(
+                service, self._transport, hedge=policy["hedge"], retry_status=policy["retry_status"]
+            )
+            self.transports[service] = resilient
+            self.clients[service] = httpx.AsyncClient(
+                timeout=httpx.Timeout(policy["timeout"], connect=settings.downstream_connect_timeout),
+                transport=TracingTransport(service, MetricsTransport(service, RecordingTransport(service, resilient)))
+            )
+        return self.clients[service]
+
+    def circuit_states(self) -> Dict[str, str]:
+        return {service: transport.breaker.state for service, transport in self.transports.items()}
+
+    async def aclose(self):
+        for client in self.clients.values():
+            await client.aclose()
+        await self._transport.aclose()
+        logger.info("🔗 하위 서비스 커넥션 풀 종료")
+
+
+def standalone_client(service: str) -> httpx.AsyncClient:
+    """핸들러를 LangGraphApp 밖에서 단독으로 만들 때 쓰는 클라이언트 (자기 풀을 가짐)"""
+    return DownstreamPool().client(service)
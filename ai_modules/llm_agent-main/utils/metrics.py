@@ -0,0 +1,156 @@
+"""
+Prometheus 텍스트 형식 메트릭 (외부 의존성 없음)
+
+- 노드별 실행 시간, 하위 서비스 호출 시간, LLM 모델별 지연/토큰/오류, 캐시 적중률, 라우팅 분포
+- 기록 경로에는 락이 없음: 시리즈는 dict.setdefault 로 한 번 만들고 이후에는 리스트 원소만 증가
+  (이벤트 루프 단일 스레드 기준, executor 스레드와 겹치면 드물게 1건 손실될 수 있음 - 모니터링 용도로 허용)
+"""
+import bisect
+import time
+from typing import Dict, Iterable, Tuple
+
+import httpx
+
+# 지연 버킷 (초) - LLM/하위 서비스 호출이 수 초~수십 초까지 걸리므로 넓게
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: Iterable[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._series: Dict[Tuple, list] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(name, "") for name in self.label_names)
+        series = self._series.get(key) or self._series.setdefault(key, [0])
+        series[0] += amount
+
+    def value(self, **labels) -> float:
+        series = self._series.get(tuple(labels.get(name, "") for name in self.label_names))
+        return series[0] if series else 0
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for key, series in list(self._series.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, key)} {series[0]}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, label_names: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        # 시리즈 = [버킷별 개수..., +Inf 개수, 합계]
+        self._series: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(name, "") for name in self.label_names)
+        series = self._series.get(key) or self._series.setdefault(key, [0] * (len(self.buckets) + 2))
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for key, series in list(self._series.items()):
+            series = list(series)
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                bucket_labels = _format_labels(self.label_names, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            cumulative += series[len(self.buckets)]
+            bucket_labels = _format_labels(self.label_names, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {series[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+
+# === 메트릭 정의 ===
+NODE_DURATION = Histogram("agent_node_duration_seconds", "LangGraph 노드 실행 시간", ("node", "status"))
+DOWNSTREAM_DURATION = Histogram(
+    "agent_downstream_duration_seconds", "하위 서비스 HTTP 호출 시간 (응답 헤더 수신까지)", ("service", "status")
+)
+LLM_DURATION = Histogram("agent_llm_duration_seconds", "LLM 호출 시간", ("model", "status"))
+LLM_TOKENS = Counter("agent_llm_tokens_total", "LLM 사용 토큰 수", ("model", "kind"))
+LLM_ERRORS = Counter("agent_llm_errors_total", "LLM 호출 오류 수", ("model",))
+CACHE_REQUESTS = Counter("agent_cache_requests_total", "캐시 조회 수", ("cache", "result"))
+ROUTE_TOTAL = Counter("agent_route_total", "라우팅 결과 분포", ("route",))
+DOWNSTREAM_RETRIES = Counter("agent_downstream_retries_total", "하위 서비스 재시도 수", ("service", "reason"))
+DOWNSTREAM_HEDGES = Counter("agent_downstream_hedges_total", "하위 서비스 헤지 요청 수 (승자 기준)", ("service", "winner"))
+CIRCUIT_REJECTIONS = Counter("agent_circuit_rejections_total", "서킷 브레이커 열림으로 즉시 실패한 호출 수", ("service",))
+FUSED_ANALYSIS = Counter("agent_fused_analysis_total", "통합 분석기 결과 (ok / fallback)", ("result",))
+LOCAL_ROUTER = Counter("agent_local_router_total", "로컬 의도 분류기 결정 (method=rule/centroid/deferred)", ("method", "route"))
+SPECULATIVE_ROUTING = Counter("agent_speculative_routing_total", "추측 라우팅 결과 (hit / cancelled / error)", ("result",))
+
+_ALL_METRICS = (NODE_DURATION, DOWNSTREAM_DURATION, LLM_DURATION, LLM_TOKENS, LLM_ERRORS, CACHE_REQUESTS, ROUTE_TOTAL,
+                DOWNSTREAM_RETRIES, DOWNSTREAM_HEDGES, CIRCUIT_REJECTIONS, FUSED_ANALYSIS,
+                SPECULATIVE_ROUTING, LOCAL_ROUTER)
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def record_llm_usage(model: str, usage: dict):
+    """LangChain usage_metadata(input_tokens/output_tokens) 기록"""
+    if not usage:
+        return
+    LLM_TOKENS.inc(usage.get("input_tokens", 0), model=model, kind="prompt")
+    LLM_TOKENS.inc(usage.get("output_tokens", 0), model=model, kind="completion")
+
+
+def render_metrics() -> str:
+    """Prometheus 텍스트 형식 (캐시 적중률은 조회 시점에 계산)"""
+    lines = []
+    for metric in _ALL_METRICS:
+        lines.extend(metric.render())
+
+    caches = sorted({key[0] for key in list(CACHE_REQUESTS._series)})
+    if caches:
+        lines.append("# HELP agent_cache_hit_ratio 캐시 적중률")
+        lines.append("# TYPE agent_cache_hit_ratio gauge")
+        for cache in caches:
+            hits = CACHE_REQUESTS.value(cache=cache, result="hit")
+            total = hits + CACHE_REQUESTS.value(cache=cache, result="miss")
+            lines.append(f'agent_cache_hit_ratio{{cache="{_escape(cache)}"}} {hits / total if total else 0}')
+
+    return "\n".join(lines) + "\n"
+
+
+class MetricsTransport(httpx.AsyncBaseTransport):
+    """하위 서비스 호출 시간을 기록하는 httpx 전송 계층 (핸들러 코드는 그대로)"""
+
+    def __init__(self, service: str, transport: httpx.AsyncBaseTransport = None):
+        self.service = service
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start_time = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception:
+            DOWNSTREAM_DURATION.observe(time.perf_counter() - start_time, service=self.service, status="error")
+            raise
+        DOWNSTREAM_DURATION.observe(time.perf_counter() - start_time, service=self.service,
+                                    status=str(response.status_code))
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
@@ -0,0 +1,283 @@
+"""
+트래픽 녹화 - 채팅 요청 하나와 그 처리 중 오간 하위 서비스/LLM 응답을 한 줄(JSONL)로 기록
+
+- TrafficRecorderMiddleware: /v1/chat/completions 요청을 sample_rate 비율로 골라 녹화 (traffic_record_enabled 일 때만)
+- RecordingTransport: 하위 서비스 응답 본문을 흘려보내면서 복사 (NDJSON 은 줄별 도착 시각도 기록)
+- record_llm: LlmClient 가 LLM 응답을 기록 (프롬프트는 해시만 - 재생 시 같은 프롬프트에 같은 응답을 돌려주는 키)
+- 익명화: 세션/채팅 ID 는 해시, 모든 텍스트에서 이메일/전화번호/주민번호/학번 같은 긴 숫자를 치환
+
+녹화 파일은 benchmarks/replay.py 로 새 빌드에 다시 재생한다 (하위 서비스/LLM 은 녹화된 응답으로 대체).
+"""
+import atexit
+import contextvars
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import time
+import uuid
+from typing import Dict, List, Optional
+
+import httpx
+
+from config.settings import settings
+
+RECORDED_PATHS = ("/v1/chat/completions", "/chat/completions", "/api/chat/completions")
+MAX_TEXT_CHARS = 20000
+
+# 순서 중요 (주민번호 → 전화번호 → 이메일 → 긴 숫자)
+SCRUB_PATTERNS = (
+    (re.compile(r"\d{6}-?[1-4]\d{6}"), "<rrn>"),
+    (re.compile(r"01[016789][-\s.]?\d{3,4}[-\s.]?\d{4}"), "<phone>"),
+    (re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)*"), "<email>"),
+    (re.compile(r"\d{8,}"), "<number>"),
+)
+
+_current_recording: contextvars.ContextVar = contextvars.ContextVar("current_recording", default=None)
+_exporter = None
+
+
+def scrub(text: str) -> str:
+    """개인정보로 보이는 문자열 치환 (치환 결과에 다시 적용해도 그대로)"""
+    for pattern, replacement in SCRUB_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def anonymize_id(value) -> Optional[str]:
+    return hashlib.sha256(str(value).encode("utf-8")).hexdigest()[:16] if value else value
+
+
+def prompt_hash(model: str, prompt: str, json_mode: bool = False) -> str:
+    """LLM 응답을 찾는 키 - 익명화된 프롬프트 기준 (재생 때 들어오는 프롬프트도 같은 방식으로 계산)"""
+    key = f"{model}\n{json_mode}\n{scrub(prompt)}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:24]
+
+
+def body_hash(body: str) -> str:
+    return hashlib.sha256(scrub(body).encode("utf-8")).hexdigest()[:24]
+
+
+class Recording:
+    """요청 하나의 녹화 - 처리 중 exchange 가 순서대로 쌓이고 응답 전송이 끝나면 기록"""
+
+    def __init__(self, path: str):
+        self.id = uuid.uuid4().hex
+        self.path = path
+        self.started = time.perf_counter()
+        self.timestamp = time.time()
+        self.exchanges: List[Dict] = []
+
+    def offset_ms(self) -> float:
+        return round((time.perf_counter() - self.started) * 1000, 1)
+
+    def add(self, exchange: Dict) -> Dict:
+        exchange["started_ms"] = self.offset_ms()
+        self.exchanges.append(exchange)
+        return exchange
+
+
+def current_recording() -> Optional[Recording]:
+    return _current_recording.get()
+
+
+def _get_exporter():
+    # 첫 녹화 시 생성 (요청 경로 → 큐 → 리스너 스레드 → 파일)
+    global _exporter
+    if _exporter is None:
+        os.makedirs(os.path.dirname(settings.traffic_record_path) or ".", exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            settings.traffic_record_path, maxBytes=settings.traffic_record_max_mb * 1024 * 1024,
+            backupCount=settings.traffic_record_backups, encoding="utf-8", delay=True
+        )
+        file_handler.setFormatter(logging.Formatter("%(message)s"))
+
+        records = queue.Queue(-1)
+        exporter = logging.getLogger("recorder.exporter")
+        exporter.setLevel(logging.INFO)
+        exporter.propagate = False
+        exporter.addHandler(logging.handlers.QueueHandler(records))
+
+        listener = logging.handlers.QueueListener(records, file_handler)
+        listener.start()
+        atexit.register(listener.stop)
+        _exporter = exporter
+    return _exporter
+
+
+def _anonymize_request(body: bytes) -> Dict:
+    """요청 본문에서 재생에 필요한 필드만 남기고 익명화 (헤더/사용자 정보는 버림)"""
+    try:
+        data = json.loads(body or b"{}")
+    except ValueError:
+        return {}
+    request = {key: data[key] for key in ("model", "stream") if key in data}
+    request["messages"] = [
+        {"role": message.get("role"), "content": scrub(str(message.get("content", "")))}
+        for message in data.get("messages", []) if isinstance(message, dict)
+    ]
+    for key in ("chat_id", "session_id"):
+        if data.get(key):
+            request[key] = anonymize_id(data[key])
+    return request
+
+
+def _line_offsets(chunks: List) -> List[float]:
+    """본문 줄마다 그 줄이 끝난 조각의 도착 시각 (ms) - 재생 때 줄 단위로 같은 간격으로 흘려보냄"""
+    offsets = []
+    for offset_ms, chunk in chunks:
+        offsets.extend([offset_ms] * chunk.count(b"\n"))
+    if chunks and not chunks[-1][1].endswith(b"\n"):
+        offsets.append(chunks[-1][0])
+    return offsets
+
+
+def _decode(body: bytes) -> str:
+    return scrub(body.decode("utf-8", errors="replace"))[:MAX_TEXT_CHARS]
+
+
+class _TeeStream(httpx.AsyncByteStream):
+    """응답 본문을 그대로 흘려보내면서 조각과 도착 시각을 모아 두었다가 닫힐 때 exchange 에 기록"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, exchange: Dict, start: float):
+        self._stream = stream
+        self._exchange = exchange
+        self._start = start
+        self._chunks = []
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            self._chunks.append((round((time.perf_counter() - self._start) * 1000, 1), chunk))
+            yield chunk
+
+    async def aclose(self):
+        self._exchange["response_body"] = _decode(b"".join(chunk for _, chunk in self._chunks))
+        self._exchange["line_offsets_ms"] = _line_offsets(self._chunks)
+        self._exchange["elapsed_ms"] = round((time.perf_counter() - self._start) * 1000, 1)
+        await self._stream.aclose()
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """녹화 중인 요청에서만 하위 서비스 요청/응답 본문을 기록하는 httpx 전송 계층"""
+
+    def __init__(self, service: str, transport: httpx.AsyncBaseTransport):
+        self.service = service
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        recording = current_recording()
+        if recording is None:
+            return await self._transport.handle_async_request(request)
+
+        start = time.perf_counter()
+        request_body = request.content.decode("utf-8", errors="replace")
+        exchange = recording.add({
+            "kind": "downstream",
+            "service": self.service,
+            "method": request.method,
+            "path": request.url.path,
+            "request_hash": body_hash(request_body),
+            "request_body": scrub(request_body)[:MAX_TEXT_CHARS],
+        })
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception as e:
+            exchange["error"] = type(e).__name__
+            exchange["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            raise
+
+        exchange["status"] = response.status_code
+        exchange["content_type"] = response.headers.get("content-type", "")
+        if response.headers.get("content-encoding"):
+            # 압축된 본문은 재생용으로 쓸 수 없어 시간만 기록
+            exchange["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            return response
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_TeeStream(response.stream, exchange, start),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def record_llm(model: str, prompt: str, content: str, elapsed: float, json_mode: bool = False,
+               ttft: float = None, stream: bool = False):
+    """LLM 호출 결과 기록 (녹화 중이 아니면 아무것도 안 함) - 프롬프트 본문은 남기지 않고 해시만"""
+    recording = current_recording()
+    if recording is None:
+        return
+    exchange = {
+        "kind": "llm",
+        "model": model,
+        "json_mode": json_mode,
+        "stream": stream,
+        "prompt_hash": prompt_hash(model, prompt, json_mode),
+        "response": scrub(content or "")[:MAX_TEXT_CHARS],
+        "elapsed_ms": round(elapsed * 1000, 1),
+    }
+    if ttft is not None:
+        exchange["ttft_ms"] = round(ttft * 1000, 1)
+    recording.add(exchange)
+    # add() 는 호출이 끝난 시점을 기록하므로 시작 시각으로 보정
+    exchange["started_ms"] = round(exchange["started_ms"] - exchange["elapsed_ms"], 1)
+
+
+class TrafficRecorderMiddleware:
+    """ASGI 미들웨어 - 채팅 요청을 표본 추출해 녹화 (스트리밍 응답은 본문 전송이 끝날 때 기록)"""
+
+    def __init__(self, app, sample_rate: float = None):
+        self.app = app
+        self.sample_rate = settings.traffic_record_sample_rate if sample_rate is None else sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or scope.get("method") != "POST" or scope.get("path") not in RECORDED_PATHS
+                or random.random() >= self.sample_rate):
+            await self.app(scope, receive, send)
+            return
+
+        recording = Recording(scope["path"])
+        request_parts, response_parts = [], []
+        status_code = 500
+        first_byte_ms = None
+
+        async def receive_and_copy():
+            message = await receive()
+            if message["type"] == "http.request":
+                request_parts.append(message.get("body", b""))
+            return message
+
+        async def send_and_copy(message):
+            nonlocal status_code, first_byte_ms
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body" and message.get("body"):
+                if first_byte_ms is None:
+                    first_byte_ms = recording.offset_ms()
+                response_parts.append(message["body"])
+            await send(message)
+
+        token = _current_recording.set(recording)
+        try:
+            await self.app(scope, receive_and_copy, send_and_copy)
+        finally:
+            _current_recording.reset(token)
+            request = _anonymize_request(b"".join(request_parts))
+            _get_exporter().info(json.dumps({
+                "id": recording.id,
+                "timestamp": recording.timestamp,
+                "path": recording.path,
+                "request": request,
+                "stream": bool(request.get("stream")),
+                "status": status_code,
+                "duration_ms": recording.offset_ms(),
+                "ttft_ms": first_byte_ms,
+                "response": _decode(b"".join(response_parts)),
+                "exchanges": recording.exchanges,
+            }, ensure_ascii=False, default=str))
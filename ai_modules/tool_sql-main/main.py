@@ -3,6 +3,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from controller.sqlController import router as sql_router
+from util.tracing import TraceMiddleware
 
 # FastAPI 앱 생성
 app = FastAPI(
@@ -20,6 +21,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# llm_agent 가 보낸 traceparent 이어받기 (스팬은 TRACE_EXPORT_PATH 에 기록)
+app.add_middleware(TraceMiddleware, service_name="tool_sql")
+
 # 라우터 등록
 app.include_router(sql_router, prefix="/api/v1", tags=["SQL"])
 
@@ -3,6 +3,7 @@ import logging
 from util.langchainLlmClient import LangchainLlmClient
 from util.dbClient import DbClient
 from util.utils import load_prompt, format_result
+from util.tracing import start_span
 
 logger = logging.getLogger(__name__)
 
@@ -38,7 +39,8 @@ class SqlService:
 
         # LLM 호출
         full_prompt = f"{system_prompt}\n\n질문: {query}\n\nSQL 쿼리:"
-        response = self.llm_client.get_llm().invoke(full_prompt)
+        with start_span("llm.text_to_sql", kind="client"):
+            response = self.llm_client.get_llm().invoke(full_prompt)
         sql = response.content.strip()
 
         # 정리
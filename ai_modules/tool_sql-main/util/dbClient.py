@@ -2,6 +2,8 @@ import os
 import pymysql
 from dotenv import load_dotenv
 
+from util.tracing import start_span
+
 load_dotenv()  # 컨테이너/로컬 환경 변수 로드
 
 
@@ -49,7 +51,7 @@ class DbClient:
         if not self.ensure_connection():
             return None
         try:
-            with self.connection.cursor() as cursor:
+            with start_span("db.query", kind="client", db=self.database), self.connection.cursor() as cursor:
                 cursor.execute(query, params)
                 return cursor.fetchall()
         except pymysql.MySQLError: